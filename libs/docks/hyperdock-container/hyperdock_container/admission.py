@@ -0,0 +1,232 @@
+import asyncio
+import contextlib
+import os
+import pathlib
+import threading
+import time
+from typing import Optional
+
+from hyperdock_container.settings import AdmissionSettings
+from hyperpocket.config import pocket_logger
+
+CGROUP_ROOT = pathlib.Path("/sys/fs/cgroup")
+
+
+class AdmissionTimeout(TimeoutError):
+    pass
+
+
+class HostPressure(object):
+    """
+    CPU and memory pressure of the host, or of the cgroup the process runs in.
+    Load average is compared with the cpus available to the cgroup, and memory usage with its memory limit.
+    Readings are cached for `check_interval_seconds`.
+    """
+
+    def __init__(self, max_load_per_cpu: float, max_memory_usage: float, check_interval_seconds: float = 1,
+                 cgroup_root: pathlib.Path = CGROUP_ROOT):
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_memory_usage = max_memory_usage
+        self.check_interval_seconds = check_interval_seconds
+        self.cgroup_root = cgroup_root
+
+        self._checked_at = float("-inf")
+        self._overloaded = False
+        self._lock = threading.Lock()
+
+    def is_overloaded(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval_seconds:
+                self._checked_at = now
+                self._overloaded = self._check()
+            return self._overloaded
+
+    def _check(self) -> bool:
+        if self.max_load_per_cpu > 0 and (load := self.load_per_cpu()) is not None and load > self.max_load_per_cpu:
+            pocket_logger.debug(f"host is overloaded. load per cpu: {load:.2f}")
+            return True
+        if self.max_memory_usage > 0 and (usage := self.memory_usage()) is not None and usage > self.max_memory_usage:
+            pocket_logger.debug(f"host is overloaded. memory usage: {usage:.2f}")
+            return True
+        return False
+
+    def load_per_cpu(self) -> Optional[float]:
+        try:
+            load, _, _ = os.getloadavg()
+        except OSError:
+            return None
+        return load / self.cpu_count()
+
+    def cpu_count(self) -> float:
+        # cgroup v2 cpu quota, "max 100000" if unlimited.
+        quota = _read(self.cgroup_root / "cpu.max")
+        if quota is not None:
+            limit, period = quota.split()
+            if limit != "max":
+                return max(int(limit) / int(period), 1)
+        # cgroup v1
+        limit, period = _read(self.cgroup_root / "cpu" / "cpu.cfs_quota_us"), _read(
+            self.cgroup_root / "cpu" / "cpu.cfs_period_us")
+        if limit is not None and period is not None and int(limit) > 0:
+            return max(int(limit) / int(period), 1)
+        return os.cpu_count() or 1
+
+    def memory_usage(self) -> Optional[float]:
+        for current_file, limit_file in [
+            (self.cgroup_root / "memory.current", self.cgroup_root / "memory.max"),
+            (self.cgroup_root / "memory" / "memory.usage_in_bytes", self.cgroup_root / "memory" / "memory.limit_in_bytes"),
+        ]:
+            current, limit = _read(current_file), _read(limit_file)
+            # v1 reports a huge number instead of "max" when unlimited.
+            if current is not None and limit is not None and limit != "max" and int(limit) < 1 << 60:
+                return int(current) / int(limit)
+
+        meminfo = _read(pathlib.Path("/proc/meminfo"))
+        if meminfo is None:
+            return None
+        values = {}
+        for line in meminfo.splitlines():
+            key, _, value = line.partition(":")
+            values[key] = int(value.split()[0])
+        if "MemTotal" not in values or "MemAvailable" not in values:
+            return None
+        return 1 - values["MemAvailable"] / values["MemTotal"]
+
+
+class AdmissionController(object):
+    """
+    Limits tool containers running at once, globally and per image.
+
+    Invocations over the limits wait in a queue until a slot is released, or fail with `AdmissionTimeout`.
+    While the host is under pressure, no more invocations are admitted until the running ones finish,
+    but one is always admitted when nothing is running, so the throughput degrades instead of stopping.
+    """
+
+    def __init__(self, admission_settings: AdmissionSettings, pressure: Optional[HostPressure] = None):
+        self.settings = admission_settings
+        self.pressure = pressure
+        if self.pressure is None:
+            self.pressure = HostPressure(
+                admission_settings.max_load_per_cpu,
+                admission_settings.max_memory_usage,
+                admission_settings.pressure_check_interval_seconds,
+            )
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._running_per_image: dict[str, int] = {}
+        self._queued = 0
+        self._timeouts = 0
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @contextlib.contextmanager
+    def admit(self, image_tag: str, timeout: Optional[float] = None):
+        self.acquire(image_tag, timeout)
+        try:
+            yield
+        finally:
+            self.release(image_tag)
+
+    @contextlib.asynccontextmanager
+    async def aadmit(self, image_tag: str, timeout: Optional[float] = None):
+        await self.aacquire(image_tag, timeout)
+        try:
+            yield
+        finally:
+            self.release(image_tag)
+
+    def acquire(self, image_tag: str, timeout: Optional[float] = None):
+        deadline = self._deadline(timeout)
+        with self._cond:
+            self._queued += 1
+            try:
+                while not self._try_acquire(image_tag):
+                    remaining = self._remaining(image_tag, deadline)
+                    # host pressure isn't notified, so it's polled.
+                    self._cond.wait(min(remaining, self.settings.pressure_check_interval_seconds))
+            finally:
+                self._queued -= 1
+
+    async def aacquire(self, image_tag: str, timeout: Optional[float] = None):
+        deadline = self._deadline(timeout)
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            self._queued += 1
+        try:
+            while True:
+                with self._cond:
+                    if self._try_acquire(image_tag):
+                        return
+                    remaining = self._remaining(image_tag, deadline)
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    await asyncio.wait_for(waiter, min(remaining, self.settings.pressure_check_interval_seconds))
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._cond:
+                        if (loop, waiter) in self._async_waiters:
+                            self._async_waiters.remove((loop, waiter))
+        finally:
+            with self._cond:
+                self._queued -= 1
+
+    def release(self, image_tag: str):
+        with self._cond:
+            self._running -= 1
+            self._running_per_image[image_tag] -= 1
+            if self._running_per_image[image_tag] == 0:
+                del self._running_per_image[image_tag]
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def metrics(self) -> dict[str, float]:
+        with self._cond:
+            return {
+                "running": self._running,
+                "queued": self._queued,
+                "timeouts": self._timeouts,
+                "overloaded": float(self.pressure.is_overloaded()),
+            }
+
+    def _try_acquire(self, image_tag: str) -> bool:
+        if self.settings.max_containers > 0 and self._running >= self.settings.max_containers:
+            return False
+        running_image = self._running_per_image.get(image_tag, 0)
+        if self.settings.max_containers_per_image > 0 and running_image >= self.settings.max_containers_per_image:
+            return False
+        if self._running > 0 and self.pressure.is_overloaded():
+            return False
+
+        self._running += 1
+        self._running_per_image[image_tag] = running_image + 1
+        return True
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        if timeout is None:
+            timeout = self.settings.queue_timeout_seconds
+        return time.monotonic() + timeout if timeout > 0 else float("inf")
+
+    def _remaining(self, image_tag: str, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._timeouts += 1
+            raise AdmissionTimeout(f"timed out waiting for a container slot of {image_tag}. "
+                                   f"running: {self._running}, queued: {self._queued}")
+        return remaining
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _read(path: pathlib.Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import pathlib
+import platform
+import re
+import shlex
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+import requests
+import toml
+
+from hyperdock_container.runtime import ContainerRuntime
+from hyperdock_container.settings import BuildCacheSettings
+from hyperpocket.config.logger import pocket_logger
+
+WHEEL_FILENAME_PATTERN = re.compile(
+    r"^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-(?P<build>\d[^-]*))?-(?P<python>[^-]+)-(?P<abi>[^-]+)-(?P<platform>[^-]+)\.whl$"
+)
+PYTHON_VERSION_PATTERN = re.compile(r"python:?(\d+)\.(\d+)")
+
+
+class Wheelhouse(object):
+    """
+    A local directory of wheels, used as `--find-links` of the builds.
+
+    It's filled from the wheels the tools ship in `dist/`, and the wheels pinned by their `uv.lock`,
+    so a warmed wheelhouse builds the tools without the package index.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def wheels(self) -> set[str]:
+        if not self.path.exists():
+            return set()
+        return {_normalize_wheel_filename(path.name) for path in self.path.glob("*.whl")}
+
+    def populate(self, tool_path: pathlib.Path, base_image: str, download: bool = True) -> int:
+        """
+        Add the wheels of a tool to the wheelhouse. Wheels already in the wheelhouse are skipped.
+        :return: the number of wheels added
+        """
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            added = self._add_dist(tool_path)
+            if download and (tool_path / "uv.lock").exists():
+                added += self._add_uv_lock(tool_path / "uv.lock", base_image)
+        if added > 0:
+            pocket_logger.info(f"added {added} wheels of {tool_path} to the wheelhouse({self.path}).")
+        return added
+
+    def _add_dist(self, tool_path: pathlib.Path) -> int:
+        existing = self.wheels()
+        added = 0
+        for wheel in (tool_path / "dist").glob("*.whl"):
+            if _normalize_wheel_filename(wheel.name) in existing:
+                continue
+            _atomic_copy(wheel, self.path / wheel.name)
+            added += 1
+        return added
+
+    def _add_uv_lock(self, lock_path: pathlib.Path, base_image: str) -> int:
+        try:
+            lock = toml.load(lock_path)
+        except (OSError, toml.TomlDecodeError) as e:
+            pocket_logger.warning(f"failed to read {lock_path}. {e}")
+            return 0
+
+        existing = self.wheels()
+        added = 0
+        for package in lock.get("package", []):
+            # only packages from an index. local, git and path sources are built from source.
+            if "registry" not in package.get("source", {}):
+                continue
+            wheel = _select_wheel(package.get("wheels", []), base_image)
+            if wheel is None:
+                continue
+            filename = wheel["url"].rsplit("/", 1)[-1]
+            if _normalize_wheel_filename(filename) in existing:
+                continue
+            try:
+                self._download(wheel["url"], wheel.get("hash"), self.path / filename)
+            except Exception as e:
+                pocket_logger.warning(f"failed to download {filename} to the wheelhouse. {e}")
+                continue
+            existing.add(_normalize_wheel_filename(filename))
+            added += 1
+        return added
+
+    def _download(self, url: str, expected_hash: Optional[str], dest: pathlib.Path):
+        with requests.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(dir=self.path, suffix=".part", delete=False) as f:
+                try:
+                    for chunk in response.iter_content(chunk_size=1 << 16):
+                        digest.update(chunk)
+                        f.write(chunk)
+                except Exception:
+                    os.unlink(f.name)
+                    raise
+        if expected_hash is not None and expected_hash != f"sha256:{digest.hexdigest()}":
+            os.unlink(f.name)
+            raise ValueError(f"hash mismatch of {url}")
+        os.replace(f.name, dest)
+
+
+class BuildCache(object):
+    """
+    Package caches shared by the builds of every tool.
+
+    pip and uv caches live in a volume mounted to the build containers, so a rebuild doesn't download
+    the packages again. The caches are shared, not baked into the images.
+    """
+
+    def __init__(self, cache_settings: BuildCacheSettings):
+        self.settings = cache_settings
+        self.wheelhouse: Optional[Wheelhouse] = None
+        if self.settings.wheelhouse:
+            self.wheelhouse = Wheelhouse(pathlib.Path(self.settings.wheelhouse).expanduser().resolve())
+
+    def prepare(self, runtime: ContainerRuntime, tool_path: Optional[pathlib.Path], base_image: str,
+                build_cmd: str) -> tuple[str, dict]:
+        """
+        Wrap a build command to use the caches.
+        :return: the build command, and the arguments to create the build container with
+        """
+        if not self.settings.enabled or build_cmd is None:
+            return build_cmd, {}
+
+        if self.wheelhouse is not None and tool_path is not None:
+            self.wheelhouse.populate(tool_path, base_image, download=not self.settings.offline)
+        wheelhouse_path = self.wheelhouse.path if self.wheelhouse is not None else None
+        mount = runtime.build_cache_mount(self.settings.volume, wheelhouse_path)
+        if mount is None:
+            return build_cmd, {}
+
+        cache_dir, wheelhouse_dir, create_kwargs = mount
+        envs = self.build_envs(cache_dir, wheelhouse_dir)
+        # exported in the command rather than set on the container, so they don't end up in the committed image.
+        exports = " ".join(f"{key}={shlex.quote(value)}" for key, value in envs.items())
+        return f"export {exports}; {build_cmd}", create_kwargs
+
+    def build_envs(self, cache_dir: str, wheelhouse_dir: Optional[str]) -> dict[str, str]:
+        envs = {
+            "PIP_CACHE_DIR": f"{cache_dir}/pip",
+            "UV_CACHE_DIR": f"{cache_dir}/uv",
+            # the cache is on another filesystem(volume) than the virtualenv, so uv can't hardlink.
+            "UV_LINK_MODE": "copy",
+            "npm_config_cache": f"{cache_dir}/npm",
+        }
+        if wheelhouse_dir is not None:
+            envs["PIP_FIND_LINKS"] = wheelhouse_dir
+            envs["UV_FIND_LINKS"] = wheelhouse_dir
+        if self.settings.offline:
+            envs["PIP_NO_INDEX"] = "1"
+            envs["UV_OFFLINE"] = "1"
+            envs["npm_config_offline"] = "true"
+        return envs
+
+
+def _normalize_wheel_filename(filename: str) -> str:
+    match = WHEEL_FILENAME_PATTERN.match(filename)
+    if match is None:
+        return filename.lower()
+    name = re.sub(r"[-_.]+", "_", match["name"]).lower()
+    return f"{name}-{match['version']}-{match['python']}-{match['abi']}-{match['platform']}.whl".lower()
+
+
+def _python_version(base_image: str) -> Optional[tuple[int, int]]:
+    match = PYTHON_VERSION_PATTERN.search(base_image)
+    if match is None:
+        return None
+    return int(match[1]), int(match[2])
+
+
+def _select_wheel(wheels: list[dict], base_image: str) -> Optional[dict]:
+    """
+    Pick a wheel of a locked package the build container can install. Pure python wheels are preferred.
+    Platform wheels are picked only if the python version of the base image is known.
+    """
+    python_version = _python_version(base_image)
+    libc = "musllinux" if "alpine" in base_image else "manylinux"
+    machine = platform.machine().lower().replace("amd64", "x86_64").replace("arm64", "aarch64")
+    platform_wheel = None
+    for wheel in wheels:
+        match = WHEEL_FILENAME_PATTERN.match(wheel.get("url", "").rsplit("/", 1)[-1])
+        if match is None:
+            continue
+        pythons = match["python"].split(".")
+        platforms = match["platform"].split(".")
+        if "any" in platforms and any(python.startswith("py3") for python in pythons):
+            return wheel
+        if python_version is None or platform_wheel is not None:
+            continue
+        cpython = f"cp{python_version[0]}{python_version[1]}"
+        abis = match["abi"].split(".")
+        if cpython not in pythons and not ("abi3" in abis and any(python.startswith("cp3") for python in pythons)):
+            continue
+        if any(re.match(rf"^{libc}.*_{machine}$", plat) for plat in platforms):
+            platform_wheel = wheel
+    return platform_wheel
+
+
+def _atomic_copy(source: pathlib.Path, dest: pathlib.Path):
+    with tempfile.NamedTemporaryFile(dir=dest.parent, suffix=".part", delete=False) as f:
+        tmp_path = f.name
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, dest)
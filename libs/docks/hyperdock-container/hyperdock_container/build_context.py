@@ -0,0 +1,215 @@
+import collections
+import hashlib
+import io
+import os
+import pathlib
+import re
+import tarfile
+import threading
+from typing import Iterable, Iterator, Optional
+
+# not part of the tool package, and never sent to the image.
+EXCLUDED_DIRECTORIES = {".git", "__pycache__", ".venv", ".mypy_cache", ".pytest_cache"}
+IGNORE_FILES = (".dockerignore", ".gitignore")
+
+# (size, mtime, digest) by path, so unchanged files aren't read again on every load.
+# the least recently used paths are evicted over the limit.
+MAX_FILE_DIGESTS = 65536
+_file_digests: collections.OrderedDict[str, tuple[int, int, str]] = collections.OrderedDict()
+_file_digests_lock = threading.Lock()
+
+
+class IgnoreRules(object):
+    """
+    `.gitignore`/`.dockerignore` patterns of a tool directory.
+
+    Patterns follow the gitignore rules: `!` negates, a trailing `/` matches only directories,
+    and a pattern without a slash matches at any depth. `.dockerignore` patterns are always anchored
+    at the tool directory, like docker does. Ignore files of sub directories aren't read.
+    """
+
+    def __init__(self):
+        self._rules: list[tuple[bool, bool, re.Pattern]] = []
+
+    @classmethod
+    def from_directory(cls, tool_path: pathlib.Path) -> "IgnoreRules":
+        rules = cls()
+        for ignore_file in IGNORE_FILES:
+            path = tool_path / ignore_file
+            if path.is_file():
+                anchored = ignore_file == ".dockerignore"
+                for line in path.read_text().splitlines():
+                    rules.add(line, anchored=anchored)
+        return rules
+
+    def add(self, pattern: str, anchored: bool = False):
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            return
+
+        negate = pattern.startswith("!")
+        if negate:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith("/")
+        pattern = pattern.strip("/") if dir_only else pattern
+        if "/" in pattern:
+            anchored = True
+        pattern = pattern.lstrip("/")
+        if not pattern:
+            return
+
+        prefix = "" if anchored else "(?:.*/)?"
+        self._rules.append((negate, dir_only, re.compile(f"^{prefix}{_translate(pattern)}$")))
+
+    def is_ignored(self, relative_path: str, is_dir: bool) -> bool:
+        ignored = False
+        for negate, dir_only, regex in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                ignored = not negate
+        return ignored
+
+
+def _translate(pattern: str) -> str:
+    regex, i = "", 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "(?:/.*)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and (end := pattern.find("]", i + 1)) != -1:
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            regex += f"[{body}]"
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+def iter_build_context_files(tool_path: pathlib.Path) -> Iterator[tuple[str, pathlib.Path]]:
+    """
+    Files of the build context, in a stable order, without the ignored ones.
+
+    Yields:
+        tuple[str, pathlib.Path]: posix path relative to the tool directory, and the file path
+    """
+    rules = IgnoreRules.from_directory(tool_path)
+    for root, dirs, files in os.walk(tool_path):
+        root_path = pathlib.Path(root)
+        relative_root = root_path.relative_to(tool_path).as_posix()
+        relative_root = "" if relative_root == "." else f"{relative_root}/"
+
+        dirs[:] = sorted(
+            d for d in dirs
+            if d not in EXCLUDED_DIRECTORIES and not rules.is_ignored(f"{relative_root}{d}", is_dir=True)
+        )
+        for file_name in sorted(files):
+            relative_path = f"{relative_root}{file_name}"
+            if not rules.is_ignored(relative_path, is_dir=False):
+                yield relative_path, root_path / file_name
+
+
+class BuildContextCache(object):
+    """
+    In-memory tar archives of tool directories, keyed by the content hash of their build context.
+    Rebuilding an unchanged tool reuses the archive, and nothing is written to disk.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._archives: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_archive(self, tool_path: pathlib.Path) -> bytes:
+        files = list(iter_build_context_files(tool_path))
+        key = hash_files(files)
+        with self._lock:
+            if (archive := self._archives.get(key)) is not None:
+                self._archives.move_to_end(key)
+                return archive
+
+        archive = make_archive(files)
+        with self._lock:
+            if key not in self._archives and len(archive) <= self.max_bytes:
+                self._archives[key] = archive
+                self._size += len(archive)
+                while self._size > self.max_bytes:
+                    _, evicted = self._archives.popitem(last=False)
+                    self._size -= len(evicted)
+        return archive
+
+
+def make_archive(files: list[tuple[str, pathlib.Path]]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        added_dirs = set()
+        for relative_path, path in files:
+            # parent directories first, so they're created with sane permissions.
+            parents = relative_path.split("/")[:-1]
+            for idx in range(1, len(parents) + 1):
+                parent = "/".join(parents[:idx])
+                if parent not in added_dirs:
+                    added_dirs.add(parent)
+                    tar.add(path.parents[len(parents) - idx], arcname=parent, recursive=False, filter=_reset_owner)
+            tar.add(path, arcname=relative_path, recursive=False, filter=_reset_owner)
+    return buffer.getvalue()
+
+
+def _reset_owner(tarinfo: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ""
+    return tarinfo
+
+
+def hash_files(files: Iterable[tuple[str, pathlib.Path]]) -> str:
+    """
+    Content hash of the files, from their relative paths and contents.
+    """
+    digest = hashlib.sha256()
+    for relative_path, path in files:
+        digest.update(relative_path.encode())
+        digest.update(b"\0")
+        digest.update(_hash_file(path).encode())
+    return digest.hexdigest()
+
+
+def _hash_file(file_path: pathlib.Path) -> str:
+    stat = file_path.stat()
+    path, version = str(file_path), (stat.st_size, stat.st_mtime_ns)
+    with _file_digests_lock:
+        if (cached := _file_digests.get(path)) is not None and cached[:2] == version:
+            _file_digests.move_to_end(path)
+            return cached[2]
+
+    file_hash = hashlib.sha256()
+    with file_path.open("rb") as f:
+        while chunk := f.read(1 << 16):
+            file_hash.update(chunk)
+    file_digest = file_hash.hexdigest()
+
+    with _file_digests_lock:
+        # a changed file replaces the digest of its old content.
+        _file_digests[path] = (*version, file_digest)
+        _file_digests.move_to_end(path)
+        while len(_file_digests) > MAX_FILE_DIGESTS:
+            _file_digests.popitem(last=False)
+    return file_digest
+
+
+build_context_cache = BuildContextCache()
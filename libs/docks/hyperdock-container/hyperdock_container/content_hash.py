@@ -0,0 +1,23 @@
+import hashlib
+import json
+import pathlib
+
+from hyperdock_container.build_context import hash_files, iter_build_context_files
+
+
+def hash_tool_directory(tool_path: pathlib.Path, build_config: dict) -> str:
+    """
+    Content hash of a tool directory and its build configuration.
+    Files ignored by the build context don't change the hash.
+
+    Args:
+        tool_path (pathlib.Path): tool directory
+        build_config (dict): the part of pocket.json the built image depends on
+
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(build_config, sort_keys=True).encode())
+    digest.update(hash_files(iter_build_context_files(tool_path)).encode())
+    return digest.hexdigest()
@@ -1,23 +1,39 @@
+import concurrent.futures
 import json
 import pathlib
-from typing import Any, Union
+import threading
+import time
+from typing import Any, Callable, Optional, Union
 from urllib.parse import urlparse
 
-import git
 from pydantic import BaseModel
 from typing_extensions import override
 
-from hyperdock_container.runtime import ContainerRuntime
+from hyperdock_container.admission import AdmissionController
+from hyperdock_container.build_cache import BuildCache
+from hyperdock_container.content_hash import hash_tool_directory
+from hyperdock_container.family import ToolFamilyRegistry, read_dependencies
+from hyperdock_container.git_store import GitToolStore
+from hyperdock_container.image_gc import ImageLifecycleManager
+from hyperdock_container.lazy import LazyTool
+from hyperdock_container.lockfile import ToolLock, ToolLockAuth, ToolLockfile
+from hyperdock_container.pool import ContainerPoolManager, PooledContainer
+from hyperdock_container.runtime import AsyncContainerRuntime, ContainerRuntime
+from hyperdock_container.serve import RequestNotSentError
+from hyperdock_container.settings import settings as dock_settings
+from hyperdock_container.watch import ToolChanges, ToolWatcher, WatchedTool
 from hyperpocket.auth import AuthProvider
 from hyperpocket.config import pocket_logger, settings
 from hyperpocket.tool import ToolAuth
-from hyperpocket.tool.dock import Dock
+from hyperpocket.tool.dock import Dock, LoadStage
 from hyperpocket.tool.function import FunctionTool
 from hyperpocket.util.git_parser import GitParser
-from hyperpocket.util.short_hashing_str import short_hashing_str
 
 ContainerToolLike = Union[str, tuple]
 
+# a warm invocation whose request never reached the tool, run in a one-shot container instead.
+_NOT_SENT = object()
+
 
 class DockArguments(BaseModel):
     request_tool_path: str
@@ -26,10 +42,46 @@ class DockArguments(BaseModel):
     runtime_arguments: dict
     tool_source: str
     image_tag_postfix: str
+    git_sha: Optional[str] = None
+    pocket_config: Optional[dict] = None
+
+
+class ResolvedSource(BaseModel):
+    request_tool_path: str
+    tool_source: str
+    tool_vars: dict
+    runtime_arguments: dict
+    tool_path: Optional[pathlib.Path] = None
+
+    # github sources
+    base_repo: Optional[str] = None
+    branch_name: Optional[str] = None
+    directory_path: Optional[str] = None
+    git_sha: Optional[str] = None
+    base_tool_path: Optional[pathlib.Path] = None
 
 
 class ContainerDock(Dock[ContainerToolLike]):
     runtime: ContainerRuntime = ContainerRuntime.get_runtime_from_settings()
+    async_runtime: AsyncContainerRuntime = AsyncContainerRuntime(runtime, dock_settings().async_max_workers)
+    pool_manager: ContainerPoolManager = ContainerPoolManager(runtime, dock_settings().warm_pool)
+    admission: AdmissionController = AdmissionController(dock_settings().admission)
+    image_lifecycle: ImageLifecycleManager = ImageLifecycleManager(
+        runtime, dock_settings().image_gc, in_use=pool_manager.image_tags
+    )
+
+    build_cache: BuildCache = BuildCache(dock_settings().build_cache)
+    families: ToolFamilyRegistry = ToolFamilyRegistry(dock_settings().family)
+    git_store: GitToolStore = GitToolStore()
+    _lazy_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=dock_settings().lazy.build_workers, thread_name_prefix="hyperdock-lazy-dock"
+    )
+
+    watched_tools: dict[str, WatchedTool] = {}
+
+    _locks: dict[tuple[str, str], threading.Lock] = {}
+    _locks_lock = threading.Lock()
+    _present_base_images: set[str] = set()
 
     @override
     def dock(self, tool_like: ContainerToolLike, dock_vars: dict[str, str] = None,
@@ -40,6 +92,13 @@ class ContainerDock(Dock[ContainerToolLike]):
 
     def load(self, tool_like: ContainerToolLike, dock_vars: dict = None, runtime_arguments: dict = None, *args,
              **kwargs) -> DockArguments:
+        return self.fetch(self.resolve(tool_like, dock_vars=dock_vars, runtime_arguments=runtime_arguments))
+
+    def resolve(self, tool_like: ContainerToolLike, dock_vars: dict = None,
+                runtime_arguments: dict = None) -> ResolvedSource:
+        """
+        Resolve the source of a tool. github urls are pinned to a git sha.
+        """
         pocket_logger.info(f"start loading source... {tool_like}")
 
         if dock_vars is None:
@@ -47,71 +106,148 @@ class ContainerDock(Dock[ContainerToolLike]):
         if runtime_arguments is None:
             runtime_arguments = {}
 
-        if not isinstance(tool_like, ContainerToolLike):
-            raise AttributeError(f"not supported container tool_like: {tool_like}")
-
-        if isinstance(tool_like, tuple) and len(tool_like) == 2:
-            req_path, inline_tool_vars = tool_like
-        elif isinstance(tool_like, str):
-            req_path, inline_tool_vars = tool_like, dict()
-        else:
-            raise AttributeError(f"not supported container tool_like: {tool_like}")
-
-        tool_path = None
-        tool_source = None
-        image_tag_postfix = None
+        req_path, inline_tool_vars = self._split_tool_like(tool_like)
+        source = ResolvedSource(
+            request_tool_path=req_path,
+            tool_source="",
+            tool_vars=dock_vars | inline_tool_vars,
+            runtime_arguments=runtime_arguments,
+        )
         # sources: local
         if pathlib.Path(req_path).expanduser().exists():
-            tool_source = "local"
-            tool_path = pathlib.Path(req_path).expanduser().resolve()
-            image_tag_postfix = short_hashing_str(f"{str(tool_path)}-none")
+            source.tool_source = "local"
+            source.tool_path = pathlib.Path(req_path).expanduser().resolve()
 
         # sources: github
         elif req_path.startswith("https://github.com"):
-            tool_source = "github"
-            base_repo, branch_name, directory_path, git_sha = GitParser.parse_repo_url(req_path)
-            cleaned_base_repo = base_repo[8:]
-            last_directory_name = directory_path.split("/")[-1]  # usually tool name
-            base_tool_path = settings.toolpkg_path / last_directory_name / cleaned_base_repo / git_sha
-            tool_path = base_tool_path / directory_path
-            image_tag_postfix = short_hashing_str(f"{self.normalize_url(req_path)}-{git_sha}")
-
-            # NOTE(moon): supporting overwriting it?
-            if tool_path.expanduser().exists():
-                pocket_logger.debug(
-                    f"skip git pull. tool directory already exists in {tool_path.expanduser().resolve()}")
-            else:
-                repo = git.Repo.clone_from(
-                    base_repo,
-                    base_tool_path,
-                    branch=branch_name,
-                    depth=1,
-                    no_checkout=True,
-                    filter="blob:none"
-                )
-
-                if directory_path:
-                    repo.git.sparse_checkout("init", "--no-cone")
-                    repo.git.sparse_checkout("set", directory_path)
-                repo.git.checkout()
+            source.tool_source = "github"
+            source.base_repo, source.branch_name, source.directory_path, source.git_sha = \
+                GitParser.parse_repo_url(req_path)
+            cleaned_base_repo = source.base_repo[8:]
+            last_directory_name = source.directory_path.split("/")[-1]  # usually tool name
+            source.base_tool_path = settings.toolpkg_path / last_directory_name / cleaned_base_repo / source.git_sha
+            source.tool_path = source.base_tool_path / source.directory_path
         else:
             raise RuntimeError(f"not supported container tool_like {tool_like}")
+        return source
+
+    def fetch(self, source: ResolvedSource) -> DockArguments:
+        """
+        Check out the source of a github tool, and read its pocket.json.
+        """
+        if source.tool_source == "github":
+            self.git_store.checkout(
+                source.base_repo, source.branch_name, source.git_sha, source.directory_path, source.base_tool_path
+            )
+
+        with (source.tool_path / "pocket.json").open("r") as f:
+            pocket_config = json.load(f)
+        image_tag_postfix = self.get_image_tag_postfix(source.tool_path, pocket_config)
 
-        pocket_logger.info(f"end loading source. tool_path: {str(tool_path)}")
+        pocket_logger.info(f"end loading source. tool_path: {str(source.tool_path)}")
         return DockArguments(
-            tool_path=tool_path,
-            tool_source=tool_source,
-            request_tool_path=req_path,
-            tool_vars=dock_vars | inline_tool_vars,
-            runtime_arguments=runtime_arguments,
-            image_tag_postfix=image_tag_postfix
+            tool_path=source.tool_path,
+            tool_source=source.tool_source,
+            request_tool_path=source.request_tool_path,
+            tool_vars=source.tool_vars,
+            runtime_arguments=source.runtime_arguments,
+            image_tag_postfix=image_tag_postfix,
+            git_sha=source.git_sha,
+            pocket_config=pocket_config,
+        )
+
+    def prepare_base_image(self, dock_args: DockArguments) -> DockArguments:
+        """
+        Pull the base image of a tool, unless the tool image is already built.
+        """
+        pocket_config = self._pocket_config(dock_args)
+        if not self.runtime.list_image(name=self._image_name(dock_args)):
+            self.ensure_base_image(self.get_base_image(pocket_config))
+        return dock_args
+
+    def load_stages(self) -> list[LoadStage]:
+        """
+        resolve refs -> fetch sources -> pull base images -> build -> register.
+        Tools of the same repository, base image or image never run a stage at the same time.
+        With lazy docking, tools are registered right after the refs are resolved, from their pocket.json only.
+        """
+        loader_settings = dock_settings().loader
+        if dock_settings().lazy.enabled:
+            return [
+                LoadStage(name="resolve", func=self.resolve, max_workers=loader_settings.resolve_workers,
+                          key=self._repository_key),
+                LoadStage(name="register", func=self.dock_lazy_source, max_workers=loader_settings.fetch_workers),
+            ]
+
+        def _build(dock_args: DockArguments) -> DockArguments:
+            self.build(dock_args)
+            return dock_args
+
+        return [
+            LoadStage(name="resolve", func=self.resolve, max_workers=loader_settings.resolve_workers,
+                      key=self._repository_key),
+            LoadStage(name="fetch", func=self.fetch, max_workers=loader_settings.fetch_workers,
+                      key=lambda source: (source.base_repo, source.git_sha) if source.base_repo else None),
+            LoadStage(name="pull", func=self.prepare_base_image, max_workers=loader_settings.pull_workers,
+                      key=lambda dock_args: self.get_base_image(self._pocket_config(dock_args))),
+            LoadStage(name="build", func=_build, max_workers=loader_settings.build_workers,
+                      key=self._image_name),
+            LoadStage(name="register", func=self._dock, max_workers=loader_settings.register_workers),
+        ]
+
+    @classmethod
+    def _split_tool_like(cls, tool_like: ContainerToolLike) -> tuple[str, dict]:
+        if not isinstance(tool_like, ContainerToolLike):
+            raise AttributeError(f"not supported container tool_like: {tool_like}")
+
+        if isinstance(tool_like, tuple) and len(tool_like) == 2:
+            return tool_like
+        elif isinstance(tool_like, str):
+            return tool_like, dict()
+        raise AttributeError(f"not supported container tool_like: {tool_like}")
+
+    @classmethod
+    def _repository_key(cls, tool_like: ContainerToolLike) -> Optional[str]:
+        req_path, _ = cls._split_tool_like(tool_like)
+        if not req_path.startswith("https://github.com"):
+            return None
+        return GitParser._split_repo_url(req_path)[0]
+
+    @classmethod
+    def _lock_auth(cls, pocket_config: dict) -> Optional[ToolLockAuth]:
+        if (_auth := pocket_config.get("auth")) is None:
+            return None
+        return ToolLockAuth(
+            auth_provider=_auth["auth_provider"],
+            auth_handler=_auth.get("auth_handler"),
+            scopes=_auth.get("scopes", []),
         )
 
+    @classmethod
+    def _tool_auth(cls, lock_auth: Optional[ToolLockAuth]) -> Optional[ToolAuth]:
+        if lock_auth is None:
+            return None
+        return ToolAuth(
+            auth_provider=AuthProvider.get_auth_provider(lock_auth.auth_provider),
+            auth_handler=lock_auth.auth_handler,
+            scopes=lock_auth.scopes,
+        )
+
+    @classmethod
+    def _pocket_config(cls, dock_args: DockArguments) -> dict:
+        if dock_args.pocket_config is None:
+            with (dock_args.tool_path / "pocket.json").open("r") as f:
+                dock_args.pocket_config = json.load(f)
+        return dock_args.pocket_config
+
+    @classmethod
+    def _image_name(cls, dock_args: DockArguments) -> str:
+        return f"hyperpocket:{cls._pocket_config(dock_args)['tool']['name']}-{dock_args.image_tag_postfix}"
+
     def build(self, dock_args: DockArguments, *args, **kwargs) -> str:
         pocket_logger.info(f"start building container dock... {dock_args.request_tool_path}")
 
-        with (dock_args.tool_path / "pocket.json").open("r") as f:
-            pocket_config = json.load(f)
+        pocket_config = self._pocket_config(dock_args)
 
         tool_name = pocket_config["tool"]["name"]
         entrypoint = pocket_config["entrypoint"]
@@ -119,98 +255,501 @@ class ContainerDock(Dock[ContainerToolLike]):
         base_image = self.get_base_image(pocket_config)
         image_tag = f"{tool_name}-{dock_args.image_tag_postfix}"
 
-        if not self.runtime.list_image(name=base_image):
-            pocket_logger.debug(f"base image({base_image}) doesn't exist. pull {base_image}.")
-            self.runtime.pull(base_image)
+        # concurrent loaders of the same tool wait on a single build.
+        with self._lock_for(("build", image_tag)):
+            # a freshly docked image isn't the least recently used one.
+            self.image_lifecycle.touch(f"hyperpocket:{image_tag}")
+            if self.runtime.list_image(name=f"hyperpocket:{image_tag}"):
+                pocket_logger.debug("built image already exists. skip build.")
+                return f"hyperpocket:{image_tag}"
+
+            self.ensure_base_image(base_image)
+            # tools of a family are thin layers on the family image with their shared dependencies.
+            build_base_image = self.ensure_family_image(dock_args, base_image, build_cmd) or base_image
+            return self._build_image(dock_args, build_base_image, build_cmd, image_tag)
+
+    def ensure_base_image(self, base_image: str):
+        """
+        Pull the base image if it doesn't exist. Concurrent pulls of the same image are deduplicated.
+        """
+        if base_image in self._present_base_images:
+            return
+
+        with self._lock_for(("pull", base_image)):
+            if base_image in self._present_base_images:
+                return
+            if not self.runtime.list_image(name=base_image):
+                pocket_logger.debug(f"base image({base_image}) doesn't exist. pull {base_image}.")
+                self.runtime.pull(base_image)
+            self._present_base_images.add(base_image)
+
+    def ensure_family_image(self, dock_args: DockArguments, base_image: str, build_cmd: str) -> Optional[str]:
+        """
+        Build the image of the tool's family, if the tool has one.
+
+        Returns:
+            Optional[str]: the family image to build the tool on, None to build on the base image.
+        """
+        installer = self._installer(build_cmd)
+        if not self.runtime.layered_images or installer is None:
+            return None
+
+        tool_name = self._pocket_config(dock_args)["tool"]["name"]
+        dependencies = read_dependencies(dock_args.tool_path)
+        family = self.families.assign(tool_name, base_image, installer, dependencies)
+        if family is None:
+            return None
+
+        family_image = f"hyperpocket:{family.image_tag}"
+        with self._lock_for(("build", family.image_tag)):
+            self.image_lifecycle.touch(family_image)
+            if self.runtime.list_image(name=family_image):
+                return family_image
+
+            pocket_logger.info(f"start building family image of {family.members}. image_tag: {family.image_tag}")
+            try:
+                return self._commit_build(base_image, family.build_command, family.image_tag, {})
+            except Exception as e:
+                pocket_logger.warning(f"failed to build family image {family.image_tag}, build on {base_image}. {e}")
+                return None
 
-        if self.runtime.list_image(name=f"hyperpocket:{image_tag}"):
-            pocket_logger.debug("built image already exists. skip build.")
-            return f"hyperpocket:{image_tag}"
+    @classmethod
+    def _installer(cls, build_cmd: Optional[str]) -> Optional[str]:
+        if not build_cmd:
+            return None
+        command = build_cmd.split()[0]
+        if command == "uv":
+            return "uv"
+        if command in ("pip", "pip3", "python", "python3"):
+            return "pip"
+        return None
+
+    def _build_image(self, dock_args: DockArguments, base_image: str, build_cmd: str, image_tag: str) -> str:
+        try:
+            return self._commit_build(base_image, build_cmd, image_tag, dock_args.runtime_arguments,
+                                      tool_path=dock_args.tool_path)
+        finally:
+            pocket_logger.info(f"end building dock. {dock_args.request_tool_path}. image_tag: {image_tag}")
 
+    def _commit_build(self, base_image: str, build_cmd: Optional[str], image_tag: str, runtime_arguments: dict,
+                      tool_path: Optional[pathlib.Path] = None) -> str:
+        build_cmd, cache_arguments = self.build_cache.prepare(self.runtime, tool_path, base_image, build_cmd)
+        create_arguments = cache_arguments | runtime_arguments
+        cache_volumes, volumes = cache_arguments.get("volumes"), runtime_arguments.get("volumes")
+        if isinstance(cache_volumes, dict) and isinstance(volumes, dict):
+            create_arguments["volumes"] = cache_volumes | volumes
         container_id = self.runtime.create(
             base_image,
             workdir="/tool",
-            command=build_cmd,
+            command=build_cmd if build_cmd is not None else "true",
             envs=dict(),
-            **dock_args.runtime_arguments
+            **create_arguments
         )
 
         try:
-            self.runtime.put_archive(container_id, dock_args.tool_path, "/tool")
+            if tool_path is not None:
+                self.runtime.put_archive(container_id, tool_path, "/tool")
             if build_cmd is not None:
                 self.runtime.run(container_id)
             self.runtime.commit(container_id, "hyperpocket", image_tag)
             return f"hyperpocket:{image_tag}"
-        except Exception as e:
-            raise e
         finally:
             self.runtime.stop(container_id)
             self.runtime.remove(container_id)
-            pocket_logger.info(f"end building dock. {dock_args.request_tool_path}. image_tag: {image_tag}")
 
     def _dock(self, dock_args: DockArguments, *args, **kwargs):
-        with (dock_args.tool_path / "pocket.json").open("r") as f:
-            pocket_config = json.load(f)
+        if dock_settings().watch.enabled and dock_args.tool_source == "local":
+            return self._dock_watched(dock_args)
+        return self.dock_locked(self.lock(dock_args))
+
+    def lock(self, dock_args: DockArguments) -> ToolLock:
+        """
+        Pin a loaded tool, from its pocket.json and dock arguments.
+        """
+        pocket_config = self._pocket_config(dock_args)
 
         # 1. tool section
         tool_config = pocket_config["tool"]
         name = tool_config["name"]
-        description = tool_config.get("description", "")
-        json_schema = tool_config.get("inputSchema", {})
         image_tag = f"{name}-{dock_args.image_tag_postfix}"
 
         # 2. variable section
         default_tool_vars = pocket_config.get("variables", {})
-        tool_vars = default_tool_vars | dock_args.tool_vars
 
         # 3. auth section
-        auth = None
-        if (_auth := pocket_config.get("auth")) is not None:
-            auth_provider = _auth["auth_provider"]
-            auth_handler = _auth.get("auth_handler")
-            scopes = _auth.get("scopes", [])
-            auth = ToolAuth(
-                auth_provider=AuthProvider.get_auth_provider(auth_provider),
-                auth_handler=auth_handler,
-                scopes=scopes,
-            )
+        auth = self._lock_auth(pocket_config)
 
         if pocket_config.get("entrypoint", {}).get("run") is None:
             raise ValueError("entrypoint.run is required in pocket tool configuration")
 
-        run_command = pocket_config["entrypoint"]["run"]
-        tool_image = f"hyperpocket:{image_tag}"
+        return ToolLock(
+            request_tool_path=dock_args.request_tool_path,
+            tool_source=dock_args.tool_source,
+            git_sha=dock_args.git_sha,
+            name=name,
+            description=tool_config.get("description", ""),
+            json_schema=tool_config.get("inputSchema", {}),
+            auth=auth,
+            tool_vars=default_tool_vars | dock_args.tool_vars,
+            image_tag=f"hyperpocket:{image_tag}",
+            run_command=pocket_config["entrypoint"]["run"],
+            # optional persistent mode. one-shot `run` is still used when there's no warm container.
+            serve_command=pocket_config["entrypoint"].get("serve"),
+            # resource limits of pocket.json are defaults, runtime arguments of the caller take precedence.
+            runtime_arguments=self.get_resource_arguments(pocket_config) | dock_args.runtime_arguments,
+        )
 
-        def _invoke(body: Any, envs: dict, **kwargs) -> str:
-            container_id = self.runtime.create(
-                image_tag=tool_image,
-                workdir="/tool",
-                command=run_command,
-                envs=envs,
-                stdin_open=True,
-                **dock_args.runtime_arguments
-            )
+    def prebuild(self, tool_likes: list[ContainerToolLike], dock_vars: dict = None, runtime_arguments: dict = None,
+                 max_workers: int = 8) -> ToolLockfile:
+        """
+        Resolve the tools to pinned shas and build their images in parallel.
+
+        Returns:
+            ToolLockfile: lockfile of the tools, in the given order
+        """
+        def _prebuild(tool_like: ContainerToolLike) -> ToolLock:
+            dock_args = self.load(tool_like, dock_vars=dock_vars, runtime_arguments=runtime_arguments)
+            self.build(dock_args)
+            return self.lock(dock_args)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-prebuild") as executor:
+            return ToolLockfile(tools=list(executor.map(_prebuild, tool_likes)))
+
+    def dock_lockfile(self, lockfile: Union[str, pathlib.Path, ToolLockfile]) -> list[FunctionTool]:
+        """
+        Register prebuilt tools of a lockfile. The images should already be built by `prebuild`.
+        """
+        if not isinstance(lockfile, ToolLockfile):
+            lockfile = ToolLockfile.load(lockfile)
+        return [self.dock_locked(tool_lock) for tool_lock in lockfile.tools]
+
+    def dock_locked(self, tool_lock: ToolLock) -> FunctionTool:
+        auth = self._tool_auth(tool_lock.auth)
+
+        run_command = tool_lock.run_command
+        tool_image = tool_lock.image_tag
+        runtime_arguments = tool_lock.runtime_arguments
+        self.image_lifecycle.touch(tool_image)
+        # the tool stays registered, so its image must outlive the garbage collection even without a warm pool.
+        self.image_lifecycle.pin(tool_image)
+        pool = self.pool_manager.get_pool(
+            tool_image, create_kwargs=runtime_arguments, serve_command=tool_lock.serve_command
+        )
+
+        def _checkout():
+            if pool is None:
+                return None
+            container = pool.checkout()
+            # refill in the background, a miss falls back to a one-shot container.
+            self.pool_manager.notify()
+            return container
+
+        def _invoke_warm(container: PooledContainer, body: Any, envs: dict) -> Any:
+            # once the request reached the tool, a failure is raised rather than retried,
+            # the tool may have had side effects already.
             try:
-                return self.runtime.run(container_id, stdin_str=json.dumps(body))
-            finally:
-                self.runtime.stop(container_id)
-                self.runtime.remove(container_id)
+                if container.process is not None:
+                    result = container.process.call(body, envs)
+                else:
+                    result = self.runtime.exec(
+                        container.container_id, run_command, envs=envs, workdir="/tool", stdin_str=json.dumps(body)
+                    )
+            except RequestNotSentError as e:
+                pocket_logger.warning(f"failed to send to warm container {container.container_id}. {e}")
+                pool.checkin(container, healthy=False)
+                return _NOT_SENT
+            except BaseException:
+                pool.checkin(container, healthy=False)
+                raise
+            pool.checkin(container)
+            return result
+
+        def _invoke(body: Any, envs: dict, **kwargs) -> str:
+            self.image_lifecycle.touch(tool_image)
+            with self.admission.admit(tool_image):
+                if (container := _checkout()) is not None:
+                    if (result := _invoke_warm(container, body, envs)) is not _NOT_SENT:
+                        return result
+
+                container_id = self.runtime.create(
+                    image_tag=tool_image,
+                    workdir="/tool",
+                    command=run_command,
+                    envs=envs,
+                    stdin_open=True,
+                    **runtime_arguments
+                )
+                try:
+                    return self.runtime.run(container_id, stdin_str=json.dumps(body))
+                finally:
+                    self.runtime.stop(container_id)
+                    self.runtime.remove(container_id)
 
         async def _ainvoke(body: Any, envs: dict, **kwargs) -> str:
-            return _invoke(body, envs, **kwargs)
+            self.image_lifecycle.touch(tool_image)
+            async with self.admission.aadmit(tool_image):
+                if (container := _checkout()) is not None:
+                    result = await self.async_runtime.call(_invoke_warm, container, body, envs)
+                    if result is not _NOT_SENT:
+                        return result
+
+                container_id = await self.async_runtime.create(
+                    image_tag=tool_image,
+                    workdir="/tool",
+                    command=run_command,
+                    envs=envs,
+                    stdin_open=True,
+                    **runtime_arguments
+                )
+                try:
+                    return await self.async_runtime.run(container_id, stdin_str=json.dumps(body))
+                finally:
+                    await self.async_runtime.stop(container_id)
+                    await self.async_runtime.remove(container_id)
 
         tool = FunctionTool.from_func(
             func=_invoke,
             afunc=_ainvoke,
             auth=auth,
-            name=name,
-            description=description,
-            json_schema=json_schema,
-            tool_vars=tool_vars,
+            name=tool_lock.name,
+            description=tool_lock.description,
+            json_schema=tool_lock.json_schema,
+            tool_vars=tool_lock.tool_vars,
             keep_structured_arguments=True,
         )
         return tool
 
+    def dock_lazy(self, tool_like: ContainerToolLike, dock_vars: dict = None,
+                  runtime_arguments: dict = None) -> FunctionTool:
+        """
+        Register a tool from its pocket.json only. The tool is checked out and built in the background,
+        or on its first invocation.
+        """
+        return self.dock_lazy_source(self.resolve(tool_like, dock_vars=dock_vars, runtime_arguments=runtime_arguments))
+
+    def dock_lazy_source(self, source: ResolvedSource, background_build: Optional[bool] = None) -> FunctionTool:
+        pocket_config = self.read_pocket_config(source)
+        tool_config = pocket_config["tool"]
+        if pocket_config.get("entrypoint", {}).get("run") is None:
+            raise ValueError("entrypoint.run is required in pocket tool configuration")
+
+        def _load() -> FunctionTool:
+            dock_args = self.fetch(source)
+            self.build(dock_args)
+            return self._dock(dock_args)
+
+        lazy_tool = LazyTool(tool_config["name"], _load, self._lazy_executor)
+        if background_build is None:
+            background_build = dock_settings().lazy.background_build
+        if background_build:
+            lazy_tool.start()
+
+        def _invoke(body: Any, envs: dict, **kwargs) -> str:
+            return lazy_tool.get().func(body=body, envs=envs, **kwargs)
+
+        async def _ainvoke(body: Any, envs: dict, **kwargs) -> str:
+            return await (await lazy_tool.aget()).afunc(body=body, envs=envs, **kwargs)
+
+        tool = FunctionTool.from_func(
+            func=_invoke,
+            afunc=_ainvoke,
+            auth=self._tool_auth(self._lock_auth(pocket_config)),
+            name=tool_config["name"],
+            description=tool_config.get("description", ""),
+            json_schema=tool_config.get("inputSchema", {}),
+            tool_vars=pocket_config.get("variables", {}) | source.tool_vars,
+            keep_structured_arguments=True,
+        )
+        return tool
+
+    def dock_watch(self, tool_like: ContainerToolLike, dock_vars: dict = None, runtime_arguments: dict = None,
+                   on_reload: Callable[[FunctionTool], None] = None) -> FunctionTool:
+        """
+        Dock a local tool, and reload it whenever its directory changes.
+
+        Source only changes are copied onto the image of the last full build, and dependency or build config
+        changes rebuild the tool. The docked tool stays the same object, so a running pocket picks up the reloaded
+        image without a restart. Source only reloads rely on the tool running its code from `/tool`,
+        like `python -m` or an editable install does.
+        """
+        dock_args = self.load(tool_like, dock_vars=dock_vars, runtime_arguments=runtime_arguments)
+        self.build(dock_args)
+        return self._dock_watched(dock_args, on_reload)
+
+    def _dock_watched(self, dock_args: DockArguments,
+                      on_reload: Callable[[FunctionTool], None] = None) -> FunctionTool:
+        if dock_args.tool_source != "local":
+            raise ValueError(f"only local tools can be watched. {dock_args.request_tool_path}")
+
+        tool_lock = self.lock(dock_args)
+        watched = WatchedTool(self.dock_locked(tool_lock), tool_lock, dependency_image=tool_lock.image_tag,
+                              build_config=self._build_config(self._pocket_config(dock_args)))
+        source = ResolvedSource(
+            request_tool_path=dock_args.request_tool_path,
+            tool_source=dock_args.tool_source,
+            tool_vars=dock_args.tool_vars,
+            runtime_arguments=dock_args.runtime_arguments,
+            tool_path=dock_args.tool_path,
+        )
+
+        def _invoke(body: Any, envs: dict, **kwargs) -> str:
+            return watched.tool.func(body=body, envs=envs, **kwargs)
+
+        async def _ainvoke(body: Any, envs: dict, **kwargs) -> str:
+            return await watched.tool.afunc(body=body, envs=envs, **kwargs)
+
+        tool = FunctionTool.from_func(
+            func=_invoke,
+            afunc=_ainvoke,
+            auth=self._tool_auth(tool_lock.auth),
+            name=tool_lock.name,
+            description=tool_lock.description,
+            json_schema=tool_lock.json_schema,
+            tool_vars=tool_lock.tool_vars,
+            keep_structured_arguments=True,
+        )
+
+        def _on_change(changes: ToolChanges):
+            reloaded = self.reload(watched, source, changes)
+            tool.description = reloaded.description
+            tool.argument_json_schema = reloaded.argument_json_schema
+            tool.default_tool_vars = reloaded.default_tool_vars
+            if on_reload is not None:
+                on_reload(tool)
+
+        if (previous := self.watched_tools.get(tool_lock.name)) is not None:
+            previous.stop()
+        self.watched_tools[tool_lock.name] = watched
+        watched.watcher = ToolWatcher(dock_args.tool_path, _on_change, dock_settings().watch)
+        watched.watcher.start()
+        return tool
+
+    def stop_watching(self):
+        """
+        Stop reloading the watched tools. The tools keep their last image.
+        """
+        for watched in self.watched_tools.values():
+            watched.stop()
+        self.watched_tools.clear()
+
+    def reload(self, watched: WatchedTool, source: ResolvedSource, changes: ToolChanges) -> FunctionTool:
+        """
+        Rebuild a watched tool and swap it in.
+        """
+        started_at = time.perf_counter()
+        if watched.pending_changes is not None:
+            watched.pending_changes.merge(changes)
+            changes = watched.pending_changes
+
+        try:
+            dock_args = self.fetch(source)
+            build_config = self._build_config(self._pocket_config(dock_args))
+            full_build = (
+                not self.runtime.layered_images
+                or bool(changes.deleted)
+                or changes.dependencies_changed
+                or build_config != watched.build_config
+            )
+            if full_build:
+                image = self.build(dock_args)
+                watched.dependency_image = image
+                watched.build_config = build_config
+            else:
+                image = self._build_source_layer(dock_args, watched.dependency_image)
+
+            tool_lock = self.lock(dock_args).model_copy(update={"image_tag": image})
+            reloaded = self.dock_locked(tool_lock)
+        except Exception:
+            watched.pending_changes = changes
+            raise
+        watched.pending_changes = None
+        previous = watched.swap(reloaded, tool_lock)
+        self.image_lifecycle.unpin(previous.image_tag)
+        if previous.image_tag != image:
+            self.pool_manager.retire(previous.image_tag)
+
+        pocket_logger.info(f"reloaded {tool_lock.name} in {time.perf_counter() - started_at:.2f}s. "
+                           f"({'full build' if full_build else 'source only'}) image_tag: {image}")
+        return reloaded
+
+    def _build_source_layer(self, dock_args: DockArguments, dependency_image: str) -> str:
+        # tagged apart from the full builds, a normal dock of the tool never picks the source only image.
+        image_tag = f"{self._pocket_config(dock_args)['tool']['name']}-{dock_args.image_tag_postfix}-dev"
+        with self._lock_for(("build", image_tag)):
+            self.image_lifecycle.touch(f"hyperpocket:{image_tag}")
+            if self.runtime.list_image(name=f"hyperpocket:{image_tag}"):
+                return f"hyperpocket:{image_tag}"
+            return self._commit_build(dependency_image, None, image_tag, dock_args.runtime_arguments,
+                                      tool_path=dock_args.tool_path)
+
+    def read_pocket_config(self, source: ResolvedSource) -> dict:
+        """
+        Read pocket.json of a source without checking out the tool. Only the blob of pocket.json is fetched.
+        """
+        if source.tool_source == "github" and not source.tool_path.exists():
+            pocket_json_path = f"{source.directory_path}/pocket.json" if source.directory_path else "pocket.json"
+            return json.loads(
+                self.git_store.read_file(source.base_repo, source.branch_name, source.git_sha, pocket_json_path)
+            )
+
+        with (source.tool_path / "pocket.json").open("r") as f:
+            return json.load(f)
+
+    def pool_metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Returns:
+            dict[str, dict[str, float]]: warm pool hit rate and checkout latency per tool image.
+        """
+        return self.pool_manager.metrics()
+
+    def admission_metrics(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: running and queued invocations, queue timeouts and whether the host is overloaded.
+        """
+        return self.admission.metrics()
+
+    @classmethod
+    def get_resource_arguments(cls, pocket_config: dict) -> dict:
+        """
+        Container resource limits from the `resources` section of pocket.json.
+
+        {"resources": {"cpus": 0.5, "memory": "512m"}}
+        """
+        resources = pocket_config.get("resources", {})
+        arguments = {}
+        if (cpus := resources.get("cpus")) is not None:
+            arguments["nano_cpus"] = int(float(cpus) * 1e9)
+        if (memory := resources.get("memory")) is not None:
+            arguments["mem_limit"] = memory
+        return arguments
+
+    @classmethod
+    def get_image_tag_postfix(cls, tool_path: pathlib.Path, pocket_config: dict = None) -> str:
+        """
+        Content-addressed image tag postfix, from the tool directory and the build configuration of its pocket.json.
+        Editing a tool changes its image tag, so the tool is rebuilt.
+        """
+        if pocket_config is None:
+            with (tool_path / "pocket.json").open("r") as f:
+                pocket_config = json.load(f)
+
+        return hash_tool_directory(tool_path, cls._build_config(pocket_config))[:16]
+
+    @classmethod
+    def _build_config(cls, pocket_config: dict) -> dict:
+        return {
+            "baseImage": cls.get_base_image(pocket_config),
+            "build": pocket_config.get("entrypoint", {}).get("build"),
+        }
+
+    @classmethod
+    def _lock_for(cls, key: tuple[str, str]) -> threading.Lock:
+        with cls._locks_lock:
+            if (lock := cls._locks.get(key)) is None:
+                lock = cls._locks[key] = threading.Lock()
+            return lock
+
     @classmethod
     def get_base_image(cls, pocket_config: dict) -> str:
         if (base_image := pocket_config.get("baseImage")) is not None:
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import pathlib
+import shlex
+import threading
+import uuid
+from typing import Optional
+
+import toml
+from pydantic import BaseModel
+
+from hyperdock_container.settings import FamilySettings
+from hyperpocket.config import pocket_logger
+from hyperpocket.config.settings import POCKET_ROOT
+
+VENV_PATH = "/tool/.venv"
+
+
+class ToolFamily(BaseModel):
+    """
+    Tools built on the same base image with overlapping dependencies.
+    Their shared dependencies are installed once into the family image, and the tool images are built on top of it.
+    """
+    base_image: str
+    installer: str  # "pip" or "uv"
+    dependencies: list[str]  # requirements shared by every member, sorted
+    members: list[str]
+
+    @property
+    def image_tag(self) -> str:
+        content = json.dumps([self.base_image, self.installer, self.dependencies])
+        return f"family-{hashlib.sha256(content.encode()).hexdigest()[:16]}"
+
+    @property
+    def build_command(self) -> str:
+        requirements = " ".join(shlex.quote(dependency) for dependency in self.dependencies)
+        if self.installer == "uv":
+            # `uv sync` of the tools keeps the project virtualenv, and only installs what's missing.
+            return f"uv venv {VENV_PATH} && uv pip install --python {VENV_PATH}/bin/python {requirements}"
+        return f"pip install {requirements}"
+
+
+class ToolFamilyRegistry(object):
+    """
+    Dependencies of every tool built on the machine, grouped into families by overlap.
+
+    Every tool recorded on the machine is grouped greedily in name order. A tool joins the first family whose shared
+    dependencies overlap its own by `min_overlap`(jaccard). The grouping doesn't depend on the order the tools are
+    recorded in, but it does on which tools are recorded, so the family of a tool and its image tag can change
+    as other tools are docked.
+    """
+
+    def __init__(self, family_settings: FamilySettings, path: pathlib.Path = POCKET_ROOT / "tool_families.json"):
+        self.settings = family_settings
+        self.path = path
+        self._lock = threading.Lock()
+
+    def assign(self, tool_name: str, base_image: str, installer: str,
+               dependencies: set[str]) -> Optional[ToolFamily]:
+        """
+        Record the dependencies of a tool, and find its family.
+        :return: None if the tool has no family with enough members.
+        """
+        if not self.settings.enabled or not dependencies:
+            return None
+
+        member = {"base_image": base_image, "installer": installer, "dependencies": sorted(dependencies)}
+        with self._lock:
+            members = self._load()
+            if members.get(tool_name) != member:
+                members[tool_name] = member
+                self._write(members)
+
+        for family in self.group(members):
+            if tool_name in family.members:
+                return family
+        return None
+
+    def group(self, members: dict[str, dict]) -> list[ToolFamily]:
+        families: list[tuple[ToolFamily, set[str]]] = []
+        for name in sorted(members):
+            member = members[name]
+            dependencies = set(member["dependencies"])
+            for family, shared in families:
+                if (family.base_image, family.installer) != (member["base_image"], member["installer"]):
+                    continue
+                if _overlap(shared, dependencies) >= self.settings.min_overlap:
+                    shared &= dependencies
+                    family.members.append(name)
+                    break
+            else:
+                family = ToolFamily(base_image=member["base_image"], installer=member["installer"],
+                                    dependencies=[], members=[name])
+                families.append((family, dependencies))
+
+        grouped = []
+        for family, shared in families:
+            if len(family.members) < self.settings.min_members or not shared:
+                continue
+            family.dependencies = sorted(shared)
+            grouped.append(family)
+        return grouped
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with self.path.open("r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, members: dict[str, dict]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(members, f)
+        os.replace(tmp_path, self.path)
+
+
+def read_dependencies(tool_path: pathlib.Path) -> set[str]:
+    """
+    Dependencies of a python tool. Pinned versions from `uv.lock` if exists, otherwise the requirements of
+    `pyproject.toml`. The tool itself and its local or git dependencies are left out.
+    """
+    try:
+        if (tool_path / "uv.lock").exists():
+            lock = toml.load(tool_path / "uv.lock")
+            return {
+                f"{package['name']}=={package['version']}"
+                for package in lock.get("package", [])
+                if "registry" in package.get("source", {}) and _installable_on_linux(package)
+            }
+        if (tool_path / "pyproject.toml").exists():
+            pyproject = toml.load(tool_path / "pyproject.toml")
+            return {
+                dependency.strip() for dependency in pyproject.get("project", {}).get("dependencies", [])
+                if "@" not in dependency
+            }
+    except (OSError, toml.TomlDecodeError) as e:
+        pocket_logger.warning(f"failed to read dependencies of {tool_path}. {e}")
+    return set()
+
+
+def _installable_on_linux(package: dict) -> bool:
+    # locked for every platform, e.g. `pywin32` is in the lock of a tool that runs on linux.
+    if package.get("sdist") is not None or not package.get("wheels"):
+        return True
+    platforms = [wheel["url"].rsplit("-", 1)[-1] for wheel in package["wheels"]]
+    return any(platform == "any.whl" or "linux" in platform for platform in platforms)
+
+
+def _overlap(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
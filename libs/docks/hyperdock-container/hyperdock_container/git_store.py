@@ -0,0 +1,143 @@
+import pathlib
+import shutil
+import tempfile
+import threading
+import uuid
+from typing import Optional
+
+import git
+
+from hyperpocket.config import pocket_logger
+from hyperpocket.config.settings import git_store_path
+
+
+class GitToolStore(object):
+    """
+    Shared git object store of tool repositories.
+
+    Every repository is kept as a single bare, shallow, blob-less clone under `POCKET_ROOT/git`.
+    Tools of the same repository and sha share one fetch, and each tool directory is checked out from the store
+    into its own directory, so only the blobs of the checked out directories are downloaded.
+    """
+
+    def __init__(self, root: pathlib.Path = git_store_path):
+        self.root = root
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def checkout(
+        self,
+        repo_url: str,
+        branch_name: str,
+        git_sha: str,
+        directory_path: Optional[str],
+        dest: pathlib.Path,
+    ) -> pathlib.Path:
+        """
+        Check out a directory of the repository at the sha into dest.
+
+        Args:
+            repo_url (str): repository url
+            branch_name (str): branch the sha is resolved from. it's fetched first, then the sha itself if needed.
+            git_sha (str): commit sha
+            directory_path (Optional[str]): directory to check out. the whole tree if empty.
+            dest (pathlib.Path): destination directory
+
+        Returns:
+            pathlib.Path: the checked out directory, `dest / directory_path`
+        """
+        tool_path = dest / directory_path if directory_path else dest
+        with self._lock(str(dest)):
+            if tool_path.exists():
+                pocket_logger.debug(f"skip git checkout. tool directory already exists in {tool_path}")
+                return tool_path
+
+            store = self.fetch(repo_url, branch_name, git_sha)
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp_dest = dest.parent / f".{dest.name}.{uuid.uuid4().hex}"
+            tmp_dest.mkdir()
+            try:
+                # a private index, so concurrent checkouts from the same store don't contend on its index lock.
+                with tempfile.TemporaryDirectory() as index_dir:
+                    git.cmd.Git().execute(
+                        [
+                            "git", f"--git-dir={store}", f"--work-tree={tmp_dest}",
+                            "checkout", git_sha, "--", directory_path or ".",
+                        ],
+                        env={"GIT_INDEX_FILE": str(pathlib.Path(index_dir) / "index")},
+                    )
+                # other directories of the repository may already be checked out in dest.
+                tool_path.parent.mkdir(parents=True, exist_ok=True)
+                _rename_unless_exists(tmp_dest / directory_path if directory_path else tmp_dest, tool_path)
+            finally:
+                shutil.rmtree(tmp_dest, ignore_errors=True)
+
+        return tool_path
+
+    def read_file(self, repo_url: str, branch_name: str, git_sha: str, path: str) -> str:
+        """
+        Read a file of the repository at the sha, without checking it out. Only the blob of the file is downloaded.
+        """
+        store = self.fetch(repo_url, branch_name, git_sha)
+        return git.Repo(store).git.show(f"{git_sha}:{path}")
+
+    def fetch(self, repo_url: str, branch_name: str, git_sha: str) -> pathlib.Path:
+        """
+        Make sure the commit is in the store of the repository. Concurrent fetches of a repository share one fetch.
+
+        Returns:
+            pathlib.Path: path of the bare repository
+        """
+        store = self.store_path(repo_url)
+        with self._lock(str(store)):
+            if not store.exists():
+                pocket_logger.info(f"clone {repo_url}({branch_name}) into the shared git store.")
+                tmp_store = store.with_name(f".{store.name}.{uuid.uuid4().hex}")
+                args = ["--bare", "--filter=blob:none", "--depth=1"]
+                if branch_name != "HEAD":
+                    args += ["--branch", branch_name]
+                try:
+                    git.Repo.clone_from(repo_url, tmp_store, multi_options=args)
+                    _rename_unless_exists(tmp_store, store)
+                finally:
+                    shutil.rmtree(tmp_store, ignore_errors=True)
+
+            repo = git.Repo(store)
+            if not self._has_commit(repo, git_sha):
+                pocket_logger.info(f"fetch {repo_url}({branch_name}) into the shared git store.")
+                ref = "HEAD" if branch_name == "HEAD" else f"refs/heads/{branch_name}"
+                repo.git.fetch("--depth=1", "--filter=blob:none", "origin", f"+{ref}:refs/remotes/origin/{branch_name}")
+                if not self._has_commit(repo, git_sha):
+                    # the branch moved since the sha is resolved.
+                    repo.git.fetch("--depth=1", "--filter=blob:none", "origin", git_sha)
+            # keeps the commit out of gc.
+            repo.git.update_ref(f"refs/pocket/{git_sha}", git_sha)
+        return store
+
+    def store_path(self, repo_url: str) -> pathlib.Path:
+        return self.root / f"{repo_url.split('://', 1)[-1].strip('/')}.git"
+
+    @staticmethod
+    def _has_commit(repo: git.Repo, git_sha: str) -> bool:
+        try:
+            repo.git.cat_file("-e", f"{git_sha}^{{commit}}")
+            return True
+        except git.GitCommandError:
+            return False
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            if (lock := self._locks.get(key)) is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+
+def _rename_unless_exists(source: pathlib.Path, target: pathlib.Path):
+    # another process may have created the target meanwhile, the locks are only shared within a process.
+    try:
+        source.rename(target)
+    except OSError:
+        if not target.exists():
+            raise
+        pocket_logger.debug(f"{target} is already created by another process. use the existing one.")
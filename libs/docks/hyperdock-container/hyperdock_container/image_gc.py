@@ -0,0 +1,185 @@
+import atexit
+import collections
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from hyperdock_container.runtime import ContainerRuntime
+from hyperdock_container.settings import ImageGCSettings
+from hyperpocket.config import pocket_logger
+from hyperpocket.config.settings import POCKET_ROOT
+
+IMAGE_REPOSITORY = "hyperpocket"
+
+
+class ImageUsageStore(object):
+    """
+    Last use times of tool images, shared by every process on the machine.
+    Uses are recorded in memory and merged into a json file on flush, the latest time wins.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._pending: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, image_tag: str):
+        with self._lock:
+            self._pending[image_tag] = time.time()
+
+    def load(self) -> dict[str, float]:
+        try:
+            with self.path.open("r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self) -> dict[str, float]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        usage = self.load()
+        if pending:
+            for image_tag, used_at in pending.items():
+                usage[image_tag] = max(usage.get(image_tag, 0), used_at)
+            self._write(usage)
+        return usage
+
+    def forget(self, image_tags: list[str]):
+        usage = self.load()
+        for image_tag in image_tags:
+            usage.pop(image_tag, None)
+        self._write(usage)
+
+    def _write(self, usage: dict[str, float]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(usage, f)
+        os.replace(tmp_path, self.path)
+
+
+class ImageLifecycleManager(object):
+    """
+    Evicts least recently used `hyperpocket:*` images once the image count or their disk usage is over the budget.
+
+    Images of the tools docked in this process or used by a warm pool are never evicted, and images that fail to be
+    removed(e.g. a container still runs it) are skipped. If enabled, the collection runs periodically on a background
+    thread, started on the first recorded use.
+    """
+
+    def __init__(
+        self,
+        runtime: ContainerRuntime,
+        gc_settings: ImageGCSettings,
+        in_use: Optional[Callable[[], set[str]]] = None,
+        usage_path: pathlib.Path = POCKET_ROOT / "image_usage.json",
+    ):
+        self.runtime = runtime
+        self.settings = gc_settings
+        self.in_use = in_use or set
+        self.usage = ImageUsageStore(usage_path)
+        # images of the docked tools, counted per dock.
+        self._pinned: collections.Counter[str] = collections.Counter()
+        self._pinned_lock = threading.Lock()
+
+        self._collect_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def touch(self, image_tag: str):
+        """
+        Record a use of the image.
+        """
+        self.usage.touch(image_tag)
+        if self.settings.enabled and self._thread is None:
+            self._ensure_thread()
+
+    def pin(self, image_tag: str):
+        """
+        Never evict the image, until it's unpinned as many times.
+        """
+        with self._pinned_lock:
+            self._pinned[image_tag] += 1
+
+    def unpin(self, image_tag: str):
+        with self._pinned_lock:
+            self._pinned[image_tag] -= 1
+            if self._pinned[image_tag] <= 0:
+                del self._pinned[image_tag]
+
+    def pinned(self) -> set[str]:
+        with self._pinned_lock:
+            return set(self._pinned)
+
+    def collect(self, dry_run: bool = False) -> list[str]:
+        """
+        Evict least recently used images until they're within the budget.
+
+        Args:
+            dry_run (bool): only returns the images to evict.
+
+        Returns:
+            list[str]: evicted image tags
+        """
+        with self._collect_lock:
+            usage = self.usage.flush()
+            disk_usage = self.runtime.image_disk_usage(IMAGE_REPOSITORY)
+            in_use = self.in_use() | self.pinned()
+
+            image_count = len(disk_usage)
+            total_bytes = sum(disk_usage.values())
+            evicted = []
+            # images without a recorded use are the oldest.
+            for image_tag in sorted(disk_usage, key=lambda tag: usage.get(tag, 0)):
+                if not self._over_budget(image_count, total_bytes):
+                    break
+                if image_tag in in_use:
+                    continue
+
+                if not dry_run:
+                    try:
+                        self.runtime.remove_image(image_tag)
+                    except Exception as e:
+                        pocket_logger.debug(f"skip evicting image {image_tag}. {e}")
+                        continue
+                pocket_logger.info(f"evict image {image_tag}. last used at {usage.get(image_tag)}")
+                evicted.append(image_tag)
+                image_count -= 1
+                total_bytes -= disk_usage[image_tag]
+
+            if evicted and not dry_run:
+                self.usage.forget(evicted)
+            return evicted
+
+    def close(self):
+        self._stopped.set()
+        try:
+            self.usage.flush()
+        except OSError as e:
+            pocket_logger.debug(f"failed to flush image usage. {e}")
+
+    def _over_budget(self, image_count: int, total_bytes: int) -> bool:
+        return (
+            (self.settings.max_images > 0 and image_count > self.settings.max_images)
+            or (self.settings.max_disk_bytes > 0 and total_bytes > self.settings.max_disk_bytes)
+        )
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="hyperdock-image-gc")
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while not self._stopped.wait(self.settings.interval_seconds):
+            try:
+                self.collect()
+            except Exception as e:
+                pocket_logger.warning(f"failed to collect tool images. {e}")
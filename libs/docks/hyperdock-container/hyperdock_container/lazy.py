@@ -0,0 +1,40 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Callable, Optional
+
+from hyperpocket.tool.function import FunctionTool
+
+
+class LazyTool(object):
+    """
+    Docks a tool on first use. Concurrent first callers share a single dock, and a failed dock is retried
+    by the next caller.
+    """
+
+    def __init__(self, name: str, load: Callable[[], FunctionTool], executor: concurrent.futures.Executor):
+        self.name = name
+        self._load = load
+        self._executor = executor
+        self._future: Optional[concurrent.futures.Future] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> concurrent.futures.Future:
+        """
+        Start docking in the background, if it's not started yet.
+        """
+        with self._lock:
+            if self._future is None or (self._future.done() and self._future.exception() is not None):
+                self._future = self._executor.submit(self._load)
+            return self._future
+
+    @property
+    def loaded(self) -> bool:
+        with self._lock:
+            return self._future is not None and self._future.done() and self._future.exception() is None
+
+    def get(self) -> FunctionTool:
+        return self.start().result()
+
+    async def aget(self) -> FunctionTool:
+        return await asyncio.wrap_future(self.start())
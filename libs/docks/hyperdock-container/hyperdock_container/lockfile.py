@@ -0,0 +1,53 @@
+import os
+import pathlib
+import uuid
+from typing import Optional, Union
+
+from pydantic import BaseModel, Field
+
+LOCKFILE_VERSION = 1
+
+
+class ToolLockAuth(BaseModel):
+    auth_provider: str
+    auth_handler: Optional[str] = None
+    scopes: list[str] = Field(default_factory=list)
+
+
+class ToolLock(BaseModel):
+    """
+    A docked tool, pinned to its git sha and built image.
+    Everything needed to register the tool, so it's registered without git, builds or reading pocket.json.
+    """
+    request_tool_path: str
+    tool_source: str
+    git_sha: Optional[str] = None
+
+    name: str
+    description: str = ""
+    json_schema: dict = Field(default_factory=dict)
+    auth: Optional[ToolLockAuth] = None
+    tool_vars: dict = Field(default_factory=dict)
+
+    image_tag: str
+    run_command: str
+    serve_command: Optional[str] = None
+    runtime_arguments: dict = Field(default_factory=dict)
+
+
+class ToolLockfile(BaseModel):
+    version: int = LOCKFILE_VERSION
+    tools: list[ToolLock] = Field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Union[str, pathlib.Path]) -> "ToolLockfile":
+        lockfile = cls.model_validate_json(pathlib.Path(path).read_text())
+        if lockfile.version != LOCKFILE_VERSION:
+            raise ValueError(f"unsupported lockfile version {lockfile.version}. prebuild the tools again.")
+        return lockfile
+
+    def dump(self, path: Union[str, pathlib.Path]):
+        path = pathlib.Path(path)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(self.model_dump_json(indent=2))
+        os.replace(tmp_path, path)
@@ -0,0 +1,97 @@
+import codecs
+import tempfile
+from typing import Iterable, Optional
+
+from hyperdock_container.settings import OutputOverflow, OutputSettings
+from hyperpocket.config import pocket_logger
+
+STDOUT = 1
+STDERR = 2
+
+
+class BoundedStream(object):
+    """
+    Output stream of a container, decoded incrementally and capped at `max_bytes`.
+    Bytes over the cap are dropped, or spilled to a temp file, and a marker is appended to the captured text.
+    """
+
+    def __init__(self, name: str, max_bytes: int, overflow: OutputOverflow):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self.size = 0
+        self.overflowed_bytes = 0
+        self.spill_path: Optional[str] = None
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._chunks: list[str] = []
+        self._spill_file = None
+
+    def write(self, data: Optional[bytes]):
+        if not data:
+            return
+
+        remaining = self.max_bytes - self.size
+        if remaining > 0:
+            head = data[:remaining]
+            self._chunks.append(self._decoder.decode(head))
+            self.size += len(head)
+            data = data[remaining:]
+
+        if data:
+            self.overflowed_bytes += len(data)
+            if self.overflow == OutputOverflow.SPILL:
+                if self._spill_file is None:
+                    self._spill_file = tempfile.NamedTemporaryFile(
+                        mode="wb", prefix=f"hyperdock-{self.name}-", suffix=".log", delete=False
+                    )
+                    self.spill_path = self._spill_file.name
+                self._spill_file.write(data)
+
+    def getvalue(self) -> str:
+        if self._spill_file is not None:
+            self._spill_file.close()
+        text = "".join(self._chunks) + self._decoder.decode(b"", final=True)
+        if self.overflowed_bytes:
+            if self.spill_path is not None:
+                text += f"\n...[{self.name} truncated. the remaining {self.overflowed_bytes} bytes are in {self.spill_path}]"
+            else:
+                text += f"\n...[{self.name} truncated. {self.overflowed_bytes} bytes over the {self.max_bytes} bytes limit]"
+        return text
+
+
+class OutputCapture(object):
+    """
+    Separately captured stdout and stderr of a container or an exec.
+    """
+
+    def __init__(self, output_settings: OutputSettings):
+        self.stdout = BoundedStream("stdout", output_settings.max_bytes, output_settings.overflow)
+        self.stderr = BoundedStream("stderr", output_settings.max_bytes, output_settings.overflow)
+
+    def feed_frames(self, frames: Iterable[tuple[int, bytes]]):
+        """
+        Capture multiplexed (stream, data) frames.
+        """
+        for stream, data in frames:
+            (self.stderr if stream == STDERR else self.stdout).write(data)
+
+    def feed_demuxed(self, chunks: Iterable[tuple[Optional[bytes], Optional[bytes]]]):
+        """
+        Capture demultiplexed (stdout, stderr) chunks.
+        """
+        for stdout, stderr in chunks:
+            self.stdout.write(stdout)
+            self.stderr.write(stderr)
+
+    def result(self, exit_code: int) -> str:
+        """
+        The tool result. stderr is only returned along with stdout when the process failed.
+        """
+        stdout = self.stdout.getvalue()
+        stderr = self.stderr.getvalue()
+        if exit_code != 0 and stderr:
+            return f"{stdout}{stderr}"
+        if stderr:
+            pocket_logger.debug(f"stderr: {stderr}")
+        return stdout
@@ -0,0 +1,322 @@
+import atexit
+import collections
+import threading
+import time
+from typing import Optional
+
+from hyperdock_container.runtime import ContainerRuntime
+from hyperdock_container.serve import ToolServeProcess
+from hyperdock_container.settings import WarmPoolSettings
+from hyperpocket.config import pocket_logger
+
+# keeps a pooled container alive until the tool command is executed in it.
+IDLE_COMMAND = "exec tail -f /dev/null"
+
+
+class PooledContainer(object):
+    container_id: str
+    created_at: float
+    last_used_at: float
+    uses: int
+    process: Optional[ToolServeProcess]
+
+    def __init__(self, container_id: str, process: Optional[ToolServeProcess] = None):
+        self.container_id = container_id
+        self.process = process
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.uses = 0
+
+
+class ContainerPool(object):
+    """
+    Warm containers of a single tool image.
+
+    Containers are created and started in the background by `ContainerPoolManager`,
+    `checkout` only hands out an idle container and never waits for one to be created.
+    When no idle container is left, the caller falls back to a one-shot container.
+    If the tool declares `entrypoint.serve`, the resident tool process is started along with the container.
+
+    A warm container serves up to `max_uses` invocations, so files one invocation leaves behind are seen by
+    the next ones. Tools that rely on a fresh filesystem per call should keep the pool disabled.
+    """
+
+    def __init__(
+        self,
+        runtime: ContainerRuntime,
+        image_tag: str,
+        pool_settings: WarmPoolSettings,
+        create_kwargs: dict = None,
+        serve_command: Optional[str] = None,
+        latency_samples: int = 1024,
+    ):
+        self.runtime = runtime
+        self.image_tag = image_tag
+        self.settings = pool_settings
+        self.create_kwargs = create_kwargs or {}
+        self.serve_command = serve_command
+
+        self._lock = threading.Lock()
+        self._idle: collections.deque[PooledContainer] = collections.deque()
+        self._retired: list[PooledContainer] = []
+        self._checked_out = 0
+        self._creating = 0
+        self._closed = False
+        self._last_health_checked_at = time.monotonic()
+
+        self._hits = 0
+        self._misses = 0
+        self._checkout_latencies: collections.deque[float] = collections.deque(maxlen=latency_samples)
+
+    def checkout(self) -> Optional[PooledContainer]:
+        """
+        Take an idle container out of the pool.
+
+        Returns:
+            Optional[PooledContainer]: the container, or None if there's no idle container.
+        """
+        started_at = time.perf_counter()
+        with self._lock:
+            container = self._idle.pop() if self._idle else None
+            if container is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._checked_out += 1
+            self._checkout_latencies.append(time.perf_counter() - started_at)
+        return container
+
+    def checkin(self, container: PooledContainer, healthy: bool = True):
+        """
+        Return a checked out container. Unhealthy or worn out containers are retired and removed in the background.
+        """
+        container.uses += 1
+        container.last_used_at = time.monotonic()
+        with self._lock:
+            self._checked_out -= 1
+            closed = self._closed
+            if not closed:
+                if (
+                    not healthy
+                    or container.uses >= self.settings.max_uses
+                    or (container.process is not None and container.process.closed)
+                ):
+                    self._retired.append(container)
+                else:
+                    self._idle.append(container)
+        if closed:
+            # a closed pool isn't maintained anymore.
+            self._dispose(container)
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: pool size, hit rate and checkout latency(seconds) over the recent checkouts.
+        """
+        with self._lock:
+            latencies = sorted(self._checkout_latencies)
+            total = self._hits + self._misses
+            return {
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "checkout_latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                "checkout_latency_p99": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+            }
+
+    def maintain(self):
+        """
+        Remove retired, idle timed-out and unhealthy containers, then refill the pool up to `min_size` idle containers.
+        Called from the pool manager's background thread.
+        """
+        now = time.monotonic()
+        with self._lock:
+            discarded, self._retired = self._retired, []
+            while (
+                len(self._idle) > self.settings.min_size
+                and now - self._idle[0].last_used_at > self.settings.idle_timeout_seconds
+            ):
+                discarded.append(self._idle.popleft())
+
+            to_check = []
+            if now - self._last_health_checked_at >= self.settings.health_check_interval_seconds:
+                self._last_health_checked_at = now
+                to_check = list(self._idle)
+
+        for container in to_check:
+            if not self._is_healthy(container):
+                with self._lock:
+                    if container in self._idle:
+                        self._idle.remove(container)
+                        discarded.append(container)
+
+        for container in discarded:
+            self._dispose(container)
+
+        while self._reserve_slot():
+            container = None
+            try:
+                container = self._create()
+            except Exception as e:
+                pocket_logger.warning(f"failed to create warm container of {self.image_tag}. {e}")
+            with self._lock:
+                self._creating -= 1
+                if container is not None and not self._closed:
+                    self._idle.append(container)
+                    container = None
+            if container is not None:
+                self._dispose(container)
+                return
+            if self._closed:
+                return
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            discarded = list(self._idle) + self._retired
+            self._idle.clear()
+            self._retired = []
+
+        for container in discarded:
+            self._dispose(container)
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            total = len(self._idle) + self._checked_out + self._creating
+            if (
+                self._closed
+                or len(self._idle) + self._creating >= self.settings.min_size
+                or total >= self.settings.max_size
+            ):
+                return False
+            self._creating += 1
+            return True
+
+    def _create(self) -> PooledContainer:
+        container_id = self.runtime.create(
+            image_tag=self.image_tag,
+            workdir="/tool",
+            command=IDLE_COMMAND,
+            envs=dict(),
+            **({"init": True} | self.create_kwargs),
+        )
+        process = None
+        try:
+            self.runtime.start(container_id)
+            if self.serve_command is not None:
+                process = ToolServeProcess(
+                    self.runtime.attach_exec(container_id, self.serve_command, envs=dict(), workdir="/tool"),
+                    timeout_seconds=self.settings.serve_timeout_seconds,
+                )
+        except Exception:
+            self._dispose(PooledContainer(container_id))
+            raise
+        pocket_logger.debug(f"warm container {container_id} of {self.image_tag} is ready.")
+        return PooledContainer(container_id, process)
+
+    def _is_healthy(self, container: PooledContainer) -> bool:
+        if container.process is not None and container.process.closed:
+            return False
+        try:
+            return self.runtime.is_running(container.container_id)
+        except Exception as e:
+            pocket_logger.warning(f"failed to check warm container {container.container_id}. {e}")
+            return False
+
+    def _dispose(self, container: PooledContainer):
+        try:
+            if container.process is not None:
+                container.process.close()
+            self.runtime.stop(container.container_id)
+            self.runtime.remove(container.container_id)
+        except Exception as e:
+            pocket_logger.warning(f"failed to remove warm container {container.container_id}. {e}")
+
+
+class ContainerPoolManager(object):
+    """
+    Owns the warm pools of every docked image and maintains them on a single background thread.
+    """
+
+    def __init__(self, runtime: ContainerRuntime, pool_settings: WarmPoolSettings):
+        self.runtime = runtime
+        self.settings = pool_settings
+        self._pools: dict[str, ContainerPool] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def get_pool(
+        self, image_tag: str, create_kwargs: dict = None, serve_command: Optional[str] = None
+    ) -> Optional[ContainerPool]:
+        """
+        Get the warm pool of the image, creating it on first use. Returns None if the warm pool is disabled.
+        """
+        if not self.settings.enabled or self.settings.max_size <= 0:
+            return None
+
+        with self._lock:
+            pool = self._pools.get(image_tag)
+            if pool is None:
+                pool = ContainerPool(self.runtime, image_tag, self.settings, create_kwargs, serve_command)
+                self._pools[image_tag] = pool
+                self._ensure_thread()
+        self._wakeup.set()
+        return pool
+
+    def retire(self, image_tag: str):
+        """
+        Close the warm pool of an image that's not docked anymore. Checked out containers are removed on checkin.
+        """
+        with self._lock:
+            pool = self._pools.pop(image_tag, None)
+        if pool is not None:
+            pool.close()
+
+    def image_tags(self) -> set[str]:
+        """
+        Images of the warm pools.
+        """
+        with self._lock:
+            return set(self._pools)
+
+    def notify(self):
+        """
+        Wake up the background thread to refill the pools and remove retired containers.
+        """
+        self._wakeup.set()
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            pools = list(self._pools.items())
+        return {image_tag: pool.metrics() for image_tag, pool in pools}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            pools = list(self._pools.values())
+            self._pools.clear()
+        self._wakeup.set()
+        for pool in pools:
+            pool.close()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="hyperdock-warm-pool")
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.settings.maintenance_interval_seconds)
+            self._wakeup.clear()
+            with self._lock:
+                pools = list(self._pools.values())
+            for pool in pools:
+                try:
+                    pool.maintain()
+                except Exception as e:
+                    pocket_logger.warning(f"failed to maintain warm pool of {pool.image_tag}. {e}")
@@ -1,3 +1,4 @@
-from hyperdock_container.runtime.runtime import ContainerRuntime
+from hyperdock_container.runtime.runtime import ContainerProcess, ContainerRuntime
+from hyperdock_container.runtime.async_runtime import AsyncContainerRuntime
 
-__all__ = ["ContainerRuntime"]
+__all__ = ["AsyncContainerRuntime", "ContainerProcess", "ContainerRuntime"]
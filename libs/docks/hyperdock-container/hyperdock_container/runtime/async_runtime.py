@@ -0,0 +1,78 @@
+import asyncio
+import concurrent.futures
+import functools
+import pathlib
+from typing import Callable, Optional, TypeVar
+
+from hyperdock_container.runtime.runtime import ContainerProcess, ContainerRuntime
+
+T = TypeVar("T")
+
+
+class AsyncContainerRuntime(object):
+    """
+    Coroutine counterpart of a `ContainerRuntime`.
+
+    Blocking runtime calls run on a dedicated thread pool, so the event loop stays responsive
+    while many containers run in parallel, and container work doesn't starve the loop's default executor.
+    """
+
+    def __init__(self, runtime: ContainerRuntime, max_workers: int = 32):
+        self.runtime = runtime
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hyperdock-runtime"
+        )
+
+    async def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a blocking function on the runtime thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def create(self, image_tag: str, workdir: str, command: str, envs: dict, **kwargs) -> str:
+        return await self.call(self.runtime.create, image_tag, workdir, command, envs, **kwargs)
+
+    async def start(self, container_id: str) -> None:
+        await self.call(self.runtime.start, container_id)
+
+    async def stop(self, container_id: str) -> None:
+        await self.call(self.runtime.stop, container_id)
+
+    async def wait(self, container_id: str) -> int:
+        return await self.call(self.runtime.wait, container_id)
+
+    async def logs(self, container_id: str) -> str:
+        return await self.call(self.runtime.logs, container_id)
+
+    async def remove(self, container_id: str) -> None:
+        await self.call(self.runtime.remove, container_id)
+
+    async def pull(self, image_tag: str) -> str:
+        return await self.call(self.runtime.pull, image_tag)
+
+    async def list_image(self, name: str = None) -> list[tuple[str, list[str]]]:
+        return await self.call(self.runtime.list_image, name)
+
+    async def run(self, container_id: str, stdin_str: Optional[str] = None) -> str:
+        return await self.call(self.runtime.run, container_id, stdin_str)
+
+    async def exec(
+        self, container_id: str, command: str, envs: dict, workdir: str, stdin_str: Optional[str] = None
+    ) -> str:
+        return await self.call(self.runtime.exec, container_id, command, envs, workdir, stdin_str)
+
+    async def attach_exec(self, container_id: str, command: str, envs: dict, workdir: str) -> ContainerProcess:
+        return await self.call(self.runtime.attach_exec, container_id, command, envs, workdir)
+
+    async def is_running(self, container_id: str) -> bool:
+        return await self.call(self.runtime.is_running, container_id)
+
+    async def put_archive(self, container_id: str, source: pathlib.Path, dest: str) -> None:
+        await self.call(self.runtime.put_archive, container_id, source, dest)
+
+    async def commit(self, container_id: str, repository: str, tag: str) -> str:
+        return await self.call(self.runtime.commit, container_id, repository, tag)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -1,66 +1,124 @@
-import os
 import pathlib
-import tarfile
-import tempfile
+import socket
 from typing import Optional
 
 import docker as docker_sdk
+from docker.models.containers import Container
+from docker.utils.socket import STDOUT, frames_iter, next_frame_header, read_exactly
 
-from hyperdock_container.runtime import ContainerRuntime
-from hyperdock_container.settings import DockerRuntimeSettings
+from hyperdock_container.build_context import build_context_cache
+from hyperdock_container.output import BoundedStream, OutputCapture
+from hyperdock_container.runtime import ContainerProcess, ContainerRuntime
+from hyperdock_container.settings import DockerRuntimeSettings, OutputSettings
 from hyperpocket.config.logger import pocket_logger
 
+BUILD_CACHE_PATH = "/hyperpocket-cache"
+WHEELHOUSE_PATH = "/wheelhouse"
+
+
+class DockerContainerProcess(ContainerProcess):
+    def __init__(self, container_id: str, sock):
+        self.container_id = container_id
+        self._sock = sock
+        self._raw_sock = getattr(sock, "_sock", sock)
+
+    def write(self, data: bytes) -> None:
+        self._raw_sock.sendall(data)
+
+    def read(self) -> bytes:
+        while True:
+            stream, size = next_frame_header(self._sock)
+            if size < 0:
+                return b""
+            data = read_exactly(self._sock, size)
+            if stream == STDOUT:
+                return data
+            pocket_logger.debug(f"[{self.container_id[:12]}] {data.decode('utf-8', errors='replace').rstrip()}")
+
+    def close(self) -> None:
+        try:
+            # unblocks a read waiting on the socket in another thread.
+            self._raw_sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
 
 class DockerContainerRuntime(ContainerRuntime):
     _client: docker_sdk.DockerClient
     settings: DockerRuntimeSettings
 
-    def __init__(self, docker_settings: DockerRuntimeSettings):
+    def __init__(self, docker_settings: DockerRuntimeSettings, output_settings: Optional[OutputSettings] = None):
         self.settings = docker_settings
         if self.settings is None:
             self.settings = DockerRuntimeSettings()
+        self.output_settings = output_settings
+        if self.output_settings is None:
+            self.output_settings = OutputSettings()
+        # container handles from create, so every operation doesn't look the container up again.
+        self._containers: dict[str, Container] = {}
 
     @property
     def client(self):
         if not hasattr(self, "_client"):
             self._client = docker_sdk.DockerClient(base_url=self.settings.base_url,
-                                                   credstore_env=self.settings.credstore_env)
+                                                   credstore_env=self.settings.credstore_env,
+                                                   max_pool_size=self.settings.max_pool_size)
         return self._client
 
     def __getstate__(self):
         state = self.__dict__.copy()
-        del state["_client"]
+        state.pop("_client", None)
+        state["_containers"] = {}
         return state
 
+    def _container(self, container_id: str) -> Container:
+        container = self._containers.get(container_id)
+        if container is None:
+            container = self.client.containers.get(container_id)
+            self._containers[container_id] = container
+        return container
+
     def create(self, image_tag: str, workdir: str, command: str, envs: dict, **kwargs) -> str:
         pocket_logger.debug(f"Creating container from image: {image_tag}")
         command = ["/bin/sh", "-c", command]
         container = self.client.containers.create(
             image=image_tag, command=command, working_dir=workdir, environment=envs, **kwargs)
+        self._containers[container.id] = container
         pocket_logger.debug(f"Container created: {container.id}")
         return container.id
 
     def start(self, container_id: str) -> None:
         pocket_logger.debug(f"Starting container: {container_id}")
-        container = self.client.containers.get(container_id)
+        container = self._container(container_id)
         container.start()
         pocket_logger.debug(f"Container started: {container_id}")
 
     def stop(self, container_id: str) -> None:
         pocket_logger.debug(f"Stopping container: {container_id}")
-        container = self.client.containers.get(container_id)
+        container = self._container(container_id)
         container.stop()
         pocket_logger.debug(f"Container stopped: {container_id}")
 
     def remove(self, container_id: str) -> None:
         pocket_logger.debug(f"Removing container: {container_id}")
-        container = self.client.containers.get(container_id)
+        container = self._containers.pop(container_id, None) or self.client.containers.get(container_id)
         container.remove()
         pocket_logger.debug(f"Container removed: {container_id}")
 
+    def wait(self, container_id: str) -> int:
+        result = self._container(container_id).wait()
+        return result.get("StatusCode", 0)
+
+    def logs(self, container_id: str) -> str:
+        output = BoundedStream("logs", self.output_settings.max_bytes, self.output_settings.overflow)
+        for chunk in self._container(container_id).logs(stream=True):
+            output.write(chunk)
+        return output.getvalue()
+
     def commit(self, container_id: str, repository: str, tag: str) -> str:
         pocket_logger.debug(f"Committing container: {container_id} to image: {repository}/{tag}")
-        container = self.client.containers.get(container_id)
+        container = self._container(container_id)
         image = container.commit(repository=repository, tag=tag)
         pocket_logger.debug(f"Container committed: {container_id} to image: {repository}/{tag} ({image.short_id})")
         return image.id
@@ -78,23 +136,71 @@ class DockerContainerRuntime(ContainerRuntime):
         images = self.client.images.list(name=name)
         return [(image.id, image.tags) for image in images]
 
+    def remove_image(self, image_tag: str) -> None:
+        pocket_logger.debug(f"Removing image: {image_tag}")
+        self.client.images.remove(image_tag)
+        pocket_logger.debug(f"Image removed: {image_tag}")
+
+    def image_disk_usage(self, repository: str) -> dict[str, int]:
+        usage = {}
+        for image in self.client.df().get("Images") or []:
+            # SharedSize is -1 if docker didn't compute it.
+            size = image["Size"] - max(image.get("SharedSize", 0), 0)
+            for tag in image.get("RepoTags") or []:
+                if tag.startswith(f"{repository}:"):
+                    usage[tag] = size
+        return usage
+
+    def exec(self, container_id: str, command: str, envs: dict, workdir: str, stdin_str: Optional[str] = None) -> str:
+        pocket_logger.debug(f"Executing command in container: {container_id}")
+        exec_id = self.client.api.exec_create(
+            container_id, ["/bin/sh", "-c", command], stdin=stdin_str is not None, environment=envs, workdir=workdir
+        )["Id"]
+        output = OutputCapture(self.output_settings)
+        sock = self.client.api.exec_start(exec_id, socket=True)
+        try:
+            if stdin_str is not None:
+                raw_sock = getattr(sock, "_sock", sock)
+                raw_sock.sendall(stdin_str.encode("utf-8"))
+                raw_sock.shutdown(socket.SHUT_WR)
+            output.feed_frames(frames_iter(sock, tty=False))
+        finally:
+            sock.close()
+        exit_code = self.client.api.exec_inspect(exec_id).get("ExitCode") or 0
+        pocket_logger.debug(f"Command executed in container: {container_id}")
+        return output.result(exit_code)
+
+    def attach_exec(self, container_id: str, command: str, envs: dict, workdir: str) -> ContainerProcess:
+        pocket_logger.debug(f"Attaching command in container: {container_id}")
+        exec_id = self.client.api.exec_create(
+            container_id, ["/bin/sh", "-c", command], stdin=True, environment=envs, workdir=workdir
+        )["Id"]
+        return DockerContainerProcess(container_id, self.client.api.exec_start(exec_id, socket=True))
+
+    def is_running(self, container_id: str) -> bool:
+        try:
+            return self.client.api.inspect_container(container_id)["State"]["Running"]
+        except docker_sdk.errors.NotFound:
+            return False
+
+    def build_cache_mount(self, volume: str,
+                          wheelhouse: Optional[pathlib.Path] = None) -> Optional[tuple[str, Optional[str], dict]]:
+        # a named volume is created by docker on first use, and outlives the build containers.
+        volumes = {volume: {"bind": BUILD_CACHE_PATH, "mode": "rw"}}
+        wheelhouse_dir = None
+        if wheelhouse is not None:
+            volumes[str(wheelhouse)] = {"bind": WHEELHOUSE_PATH, "mode": "ro"}
+            wheelhouse_dir = WHEELHOUSE_PATH
+        return BUILD_CACHE_PATH, wheelhouse_dir, {"volumes": volumes}
+
     def put_archive(self, container_id: str, source: pathlib.Path, dest: str) -> None:
         pocket_logger.debug(f"Putting archive to container: {container_id}")
-        fd, archive_file = tempfile.mkstemp(suffix=".tar")
-        os.close(fd)
-        tar = tarfile.open(archive_file, mode="w")
-        tar.add(source, arcname="")
-        tar.close()
-
-        container = self.client.containers.get(container_id)
-        with open(archive_file, "rb") as f:
-            container.put_archive(dest, f)
-
-        os.remove(archive_file)
-        pocket_logger.debug(f"Archive put to container: {container_id}")
+        archive = build_context_cache.get_archive(source)
+        self._container(container_id).put_archive(dest, archive)
+        pocket_logger.debug(f"Archive put to container: {container_id} ({len(archive)} bytes)")
 
     def run(self, container_id: str, stdin_str: Optional[str] = None, **kwargs) -> str:
-        container = self.client.containers.get(container_id)
+        container = self._container(container_id)
         if stdin_str is not None:
             sock = container.attach_socket(params={"stdin": 1, "stream": 1})
             container.start()
@@ -106,8 +212,11 @@ class DockerContainerRuntime(ContainerRuntime):
             sock.close()
         else:
             container.start()
-        container.wait()
+
+        # streamed until the container exits, the replayed logs cover output written before attaching.
+        output = OutputCapture(self.output_settings)
+        output.feed_demuxed(container.attach(stdout=True, stderr=True, stream=True, logs=True, demux=True))
+        exit_code = self.wait(container_id)
         container.stop()
-        log = container.logs()
         pocket_logger.debug(f"Command executed in container: {container.id}")
-        return log.decode("utf-8")
+        return output.result(exit_code)
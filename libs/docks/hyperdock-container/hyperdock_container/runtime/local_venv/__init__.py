@@ -0,0 +1,3 @@
+from hyperdock_container.runtime.local_venv.runtime_local_venv import LocalVenvContainerRuntime
+
+__all__ = ["LocalVenvContainerRuntime"]
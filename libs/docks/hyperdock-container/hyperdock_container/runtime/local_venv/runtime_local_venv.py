@@ -0,0 +1,367 @@
+import io
+import json
+import os
+import pathlib
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tarfile
+import threading
+import uuid
+from typing import Optional
+
+from hyperdock_container.build_context import build_context_cache
+from hyperdock_container.output import BoundedStream, OutputCapture
+from hyperdock_container.runtime import ContainerProcess, ContainerRuntime
+from hyperdock_container.settings import LocalVenvRuntimeSettings, OutputSettings
+from hyperpocket.config.logger import pocket_logger
+from hyperpocket.config.settings import POCKET_ROOT
+
+VENV_DIRECTORY = ".venv"
+# host environment variables passed to the tool processes, the others are isolated like in a docker container.
+HOST_ENVS = ("PATH", "HOME", "LANG")
+
+
+class LocalContainer(object):
+    """
+    A "container" of the local runtime, a directory with its own virtualenv and the processes running in it.
+    """
+
+    def __init__(self, container_id: str, layer_path: pathlib.Path, workdir: str, command: str, envs: dict,
+                 committed: bool):
+        self.container_id = container_id
+        self.layer_path = layer_path
+        self.workdir = workdir
+        self.command = command
+        self.envs = envs
+        # the layer belongs to an image, so it's kept when the container is removed.
+        self.committed = committed
+        self.process: Optional[subprocess.Popen] = None
+        self.output: Optional[OutputCapture] = None
+
+
+class LocalVenvContainerProcess(ContainerProcess):
+    def __init__(self, container_id: str, process: subprocess.Popen):
+        self.container_id = container_id
+        self._process = process
+        threading.Thread(target=self._log_stderr, daemon=True).start()
+
+    def write(self, data: bytes) -> None:
+        self._process.stdin.write(data)
+        self._process.stdin.flush()
+
+    def read(self) -> bytes:
+        return self._process.stdout.read1(1 << 16)
+
+    def close(self) -> None:
+        _terminate(self._process)
+
+    def _log_stderr(self):
+        for line in self._process.stderr:
+            pocket_logger.debug(f"[{self.container_id[:12]}] {line.decode('utf-8', errors='replace').rstrip()}")
+
+
+class LocalVenvContainerRuntime(ContainerRuntime):
+    """
+    Runs tools as local subprocesses, without docker.
+
+    An image is a directory with the tool files and an isolated virtualenv, built by running `entrypoint.build`
+    with the virtualenv activated. Image tags are content-addressed, so a built image is reused until the tool changes.
+    Base images aren't pulled, the virtualenv is created from the local python(or by uv, if available).
+    Containers created from a built image run in the image directory itself, so they share its files.
+    """
+
+    # containers of a built image share its directory, a build on top of it would change the image itself.
+    layered_images = False
+
+    def __init__(self, local_venv_settings: LocalVenvRuntimeSettings, output_settings: Optional[OutputSettings] = None):
+        self.settings = local_venv_settings
+        if self.settings is None:
+            self.settings = LocalVenvRuntimeSettings()
+        self.output_settings = output_settings
+        if self.output_settings is None:
+            self.output_settings = OutputSettings()
+
+        self.root = pathlib.Path(self.settings.root) if self.settings.root else POCKET_ROOT / "venv"
+        self._containers: dict[str, LocalContainer] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_containers"] = {}
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def create(self, image_tag: str, workdir: str, command: str, envs: dict, **kwargs) -> str:
+        pocket_logger.debug(f"Creating local container from image: {image_tag}")
+        container_id = uuid.uuid4().hex
+        if (image := self._read_image(image_tag)) is not None:
+            container = LocalContainer(container_id, pathlib.Path(image["layer"]), workdir, command, envs,
+                                       committed=True)
+        else:
+            layer_path = self.root / "layers" / container_id
+            layer_path.mkdir(parents=True)
+            try:
+                self._create_venv(layer_path / VENV_DIRECTORY, image_tag)
+            except Exception:
+                shutil.rmtree(layer_path, ignore_errors=True)
+                raise
+            container = LocalContainer(container_id, layer_path, workdir, command, envs, committed=False)
+
+        with self._lock:
+            self._containers[container_id] = container
+        pocket_logger.debug(f"Local container created: {container_id}")
+        return container_id
+
+    def start(self, container_id: str) -> None:
+        container = self._container(container_id)
+        container.process = self._popen(container, container.command, container.envs, container.workdir,
+                                        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+        pocket_logger.debug(f"Local container started: {container_id}")
+
+    def stop(self, container_id: str) -> None:
+        container = self._container(container_id)
+        if container.process is not None:
+            _terminate(container.process, self.settings.stop_timeout_seconds)
+        pocket_logger.debug(f"Local container stopped: {container_id}")
+
+    def remove(self, container_id: str) -> None:
+        with self._lock:
+            container = self._containers.pop(container_id, None)
+        if container is None:
+            return
+        if container.process is not None:
+            _terminate(container.process, self.settings.stop_timeout_seconds)
+        if not container.committed:
+            shutil.rmtree(container.layer_path, ignore_errors=True)
+        pocket_logger.debug(f"Local container removed: {container_id}")
+
+    def wait(self, container_id: str) -> int:
+        container = self._container(container_id)
+        if container.process is None:
+            return 0
+        return container.process.wait()
+
+    def logs(self, container_id: str) -> str:
+        container = self._container(container_id)
+        if container.output is None:
+            return ""
+        return container.output.stdout.getvalue()
+
+    def commit(self, container_id: str, repository: str, tag: str) -> str:
+        container = self._container(container_id)
+        name = f"{repository}:{tag}"
+        image_path = self._image_path(name)
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = image_path.with_name(f".{image_path.name}.{uuid.uuid4().hex}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"id": container_id, "name": name, "layer": str(container.layer_path)}, f)
+        os.replace(tmp_path, image_path)
+        container.committed = True
+        pocket_logger.debug(f"Local container committed: {container_id} to image: {name}")
+        return container_id
+
+    def pull(self, image_tag: str) -> str:
+        # base images are provided by the local python.
+        pocket_logger.debug(f"skip pulling {image_tag}. the local runtime builds on the local python.")
+        return image_tag
+
+    def list_image(self, name: str = None) -> list[tuple[str, list[str]]]:
+        if name is not None:
+            image = self._read_image(name)
+            return [] if image is None else [(image["id"], [name])]
+
+        return [(image["id"], [name]) for name, image in self._images()]
+
+    def remove_image(self, image_tag: str) -> None:
+        if (image := self._read_image(image_tag)) is None:
+            return
+        self._image_path(image_tag).unlink(missing_ok=True)
+        layer = image["layer"]
+        # the layer is kept while another tag refers to it.
+        if not any(other["layer"] == layer for _, other in self._images()):
+            shutil.rmtree(layer, ignore_errors=True)
+        pocket_logger.debug(f"Local image removed: {image_tag}")
+
+    def image_disk_usage(self, repository: str) -> dict[str, int]:
+        usage = {}
+        for name, image in self._images():
+            if name.startswith(f"{repository}:"):
+                usage[name] = _directory_size(pathlib.Path(image["layer"]))
+        return usage
+
+    def run(self, container_id: str, stdin_str: Optional[str] = None, **kwargs) -> str:
+        container = self._container(container_id)
+        container.process = self._popen(container, container.command, container.envs, container.workdir)
+        container.output = self._communicate(container.process, stdin_str)
+        exit_code = container.process.wait()
+        pocket_logger.debug(f"Command executed in local container: {container_id}")
+        return container.output.result(exit_code)
+
+    def exec(self, container_id: str, command: str, envs: dict, workdir: str, stdin_str: Optional[str] = None) -> str:
+        container = self._container(container_id)
+        process = self._popen(container, command, container.envs | envs, workdir)
+        output = self._communicate(process, stdin_str)
+        exit_code = process.wait()
+        pocket_logger.debug(f"Command executed in local container: {container_id}")
+        return output.result(exit_code)
+
+    def attach_exec(self, container_id: str, command: str, envs: dict, workdir: str) -> ContainerProcess:
+        container = self._container(container_id)
+        return LocalVenvContainerProcess(container_id, self._popen(container, command, container.envs | envs, workdir))
+
+    def is_running(self, container_id: str) -> bool:
+        with self._lock:
+            container = self._containers.get(container_id)
+        return container is not None and container.process is not None and container.process.poll() is None
+
+    def put_archive(self, container_id: str, source: pathlib.Path, dest: str) -> None:
+        container = self._container(container_id)
+        dest_path = self._host_path(container, dest)
+        dest_path.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(fileobj=io.BytesIO(build_context_cache.get_archive(source))) as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(dest_path, filter="data")
+            else:
+                tar.extractall(dest_path)
+        pocket_logger.debug(f"Archive put to local container: {container_id}")
+
+    def build_cache_mount(self, volume: str,
+                          wheelhouse: Optional[pathlib.Path] = None) -> Optional[tuple[str, Optional[str], dict]]:
+        # builds run on the host, so the cache is a plain directory.
+        cache_path = self.root / "cache" / volume
+        cache_path.mkdir(parents=True, exist_ok=True)
+        return str(cache_path), str(wheelhouse) if wheelhouse is not None else None, {}
+
+    def _container(self, container_id: str) -> LocalContainer:
+        with self._lock:
+            if (container := self._containers.get(container_id)) is None:
+                raise KeyError(f"local container {container_id} doesn't exist")
+            return container
+
+    def _popen(self, container: LocalContainer, command: str, envs: dict, workdir: str,
+               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE) -> subprocess.Popen:
+        venv_path = container.layer_path / VENV_DIRECTORY
+        env = {k: os.environ[k] for k in HOST_ENVS if k in os.environ} | {
+            "VIRTUAL_ENV": str(venv_path),
+            "PATH": os.pathsep.join([str(venv_path / "bin"), os.environ.get("PATH", "")]),
+        } | {k: str(v) for k, v in envs.items()}
+        cwd = self._host_path(container, workdir)
+        cwd.mkdir(parents=True, exist_ok=True)
+        return subprocess.Popen(
+            ["/bin/sh", "-c", command], cwd=cwd, env=env, stdin=stdin, stdout=stdout, stderr=stderr,
+            start_new_session=True,
+        )
+
+    def _communicate(self, process: subprocess.Popen, stdin_str: Optional[str]) -> OutputCapture:
+        output = OutputCapture(self.output_settings)
+        readers = [
+            threading.Thread(target=_drain, args=(process.stdout, output.stdout), daemon=True),
+            threading.Thread(target=_drain, args=(process.stderr, output.stderr), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            if stdin_str is not None:
+                process.stdin.write(stdin_str.encode("utf-8"))
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+        for reader in readers:
+            reader.join()
+        return output
+
+    def _create_venv(self, venv_path: pathlib.Path, base_image: str):
+        python = self.settings.python
+        if python is None and (match := re.match(r"^python:(\d+\.\d+)", base_image)) is not None:
+            python = match.group(1)
+
+        uv = shutil.which("uv") if self.settings.use_uv else None
+        if uv is not None:
+            # seeded with pip, so `pip install` of build commands installs into the virtualenv.
+            command = [uv, "venv", "--seed", "--quiet", str(venv_path)]
+            if python is not None:
+                command += ["--python", python]
+        else:
+            command = [python if python is not None and os.sep in python else sys.executable,
+                       "-m", "venv", str(venv_path)]
+        pocket_logger.debug(f"create virtualenv {venv_path}. {' '.join(command)}")
+        subprocess.run(command, check=True, capture_output=True)
+
+    def _host_path(self, container: LocalContainer, path: str) -> pathlib.Path:
+        return container.layer_path / path.lstrip("/")
+
+    def _image_path(self, name: str) -> pathlib.Path:
+        repository, tag = _split_name(name)
+        return self.root / "images" / repository.replace("/", "_") / f"{tag}.json"
+
+    def _images(self) -> list[tuple[str, dict]]:
+        images = []
+        for image_path in sorted((self.root / "images").glob("*/*.json")):
+            if (image := self._load_image(image_path)) is not None:
+                images.append((image["name"], image))
+        return images
+
+    def _read_image(self, name: str) -> Optional[dict]:
+        image = self._load_image(self._image_path(name))
+        # "a/b" and "a_b" share the image path, the stored name tells them apart.
+        if image is None or image["name"] != ":".join(_split_name(name)):
+            return None
+        return image
+
+    @staticmethod
+    def _load_image(image_path: pathlib.Path) -> Optional[dict]:
+        try:
+            with image_path.open("r") as f:
+                image = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if "name" not in image or not pathlib.Path(image["layer"]).exists():
+            return None
+        return image
+
+
+def _split_name(name: str) -> tuple[str, str]:
+    if ":" not in name.rsplit("/", 1)[-1]:
+        name += ":latest"
+    repository, tag = name.rsplit(":", 1)
+    return repository, tag
+
+
+def _directory_size(path: pathlib.Path) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            try:
+                size += os.lstat(os.path.join(root, file_name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _drain(pipe, stream: BoundedStream):
+    while chunk := pipe.read1(1 << 16):
+        stream.write(chunk)
+    pipe.close()
+
+
+def _terminate(process: subprocess.Popen, timeout: float = 10):
+    if process.poll() is not None:
+        return
+    try:
+        # the whole process group, tools may spawn their own subprocesses.
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
@@ -5,7 +5,37 @@ from typing import Optional
 from hyperdock_container.settings import settings, ContainerRuntimeType
 
 
+class ContainerProcess:
+    """
+    A process executed in a running container, attached to its stdin and stdout.
+    """
+
+    @abc.abstractmethod
+    def write(self, data: bytes) -> None:
+        """
+        Write to stdin of the process
+        :param data:
+        :return:
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read(self) -> bytes:
+        """
+        Read the next chunk of stdout of the process
+        :return: stdout chunk, empty bytes if the process exited
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+
 class ContainerRuntime:
+    # images built from another built image keep its layers, so tools can share a family image.
+    layered_images: bool = True
+
     @abc.abstractmethod
     def create(self, image_tag: str, workdir: str, command: str, envs: dict, **kwargs) -> str:
         """
@@ -36,6 +66,24 @@ class ContainerRuntime:
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def wait(self, container_id: str) -> int:
+        """
+        Wait until a container exits
+        :param container_id:
+        :return: exit code
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def logs(self, container_id: str) -> str:
+        """
+        Get logs of a container
+        :param container_id:
+        :return: logs
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def remove(self, container_id: str) -> None:
         """
@@ -62,6 +110,24 @@ class ContainerRuntime:
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def remove_image(self, image_tag: str) -> None:
+        """
+        Remove an image
+        :param image_tag:
+        :return:
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def image_disk_usage(self, repository: str) -> dict[str, int]:
+        """
+        Disk usage of the images of a repository, without the layers shared with other images
+        :param repository:
+        :return: image tag to bytes
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def run(self, container_id: str, stdin_str: Optional[str] = None) -> str:
         """
@@ -72,6 +138,40 @@ class ContainerRuntime:
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def exec(self, container_id: str, command: str, envs: dict, workdir: str, stdin_str: Optional[str] = None) -> str:
+        """
+        Execute a command in a running container
+        :param container_id:
+        :param command:
+        :param envs:
+        :param workdir:
+        :param stdin_str:
+        :return: stdout_str of the command
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def attach_exec(self, container_id: str, command: str, envs: dict, workdir: str) -> ContainerProcess:
+        """
+        Execute a command in a running container and keep attached to it
+        :param container_id:
+        :param command:
+        :param envs:
+        :param workdir:
+        :return: attached process
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def is_running(self, container_id: str) -> bool:
+        """
+        Check whether a container is running
+        :param container_id:
+        :return:
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def put_archive(self, container_id: str, source: pathlib.Path, dest: str) -> None:
         """
@@ -94,9 +194,23 @@ class ContainerRuntime:
         """
         raise NotImplementedError
 
+    def build_cache_mount(self, volume: str,
+                          wheelhouse: Optional[pathlib.Path] = None) -> Optional[tuple[str, Optional[str], dict]]:
+        """
+        Mount the shared build cache to build containers
+        :param volume: name of the cache volume
+        :param wheelhouse: host directory of wheels
+        :return: cache directory and wheelhouse directory as seen by the build, and the arguments of `create`.
+            None if the runtime can't mount a cache.
+        """
+        return None
+
     @classmethod
     def get_runtime_from_settings(cls) -> "ContainerRuntime":
         if settings().runtime == ContainerRuntimeType.DOCKER:
             from hyperdock_container.runtime.docker import DockerContainerRuntime
-            return DockerContainerRuntime(settings().docker)
+            return DockerContainerRuntime(settings().docker, settings().output)
+        if settings().runtime == ContainerRuntimeType.LOCAL_VENV:
+            from hyperdock_container.runtime.local_venv import LocalVenvContainerRuntime
+            return LocalVenvContainerRuntime(settings().local_venv, settings().output)
         raise ValueError(f"Unsupported runtime: {settings().runtime}")
@@ -0,0 +1,96 @@
+import json
+import struct
+import threading
+from typing import Any, Optional
+
+from hyperdock_container.runtime import ContainerProcess
+
+FRAME_HEADER = struct.Struct(">I")
+
+
+def encode_frame(message: Any) -> bytes:
+    payload = json.dumps(message).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class RequestNotSentError(ConnectionError):
+    """
+    The request never reached the tool process, so it can be sent again elsewhere without running the tool twice.
+    """
+
+
+class ToolServeProcess(object):
+    """
+    Client of a resident tool process, started from `entrypoint.serve` of pocket.json.
+
+    Requests(`{"body": ..., "envs": ...}`) and responses(`{"result": ...}` or `{"error": ...}`)
+    are length-prefixed json frames over stdin and stdout of the process, one request at a time.
+    A call waiting longer than `timeout_seconds` for the response closes the process.
+    """
+
+    def __init__(self, process: ContainerProcess, timeout_seconds: Optional[float] = None):
+        self.process = process
+        self.timeout_seconds = timeout_seconds
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def call(self, body: Any, envs: dict) -> str:
+        with self._lock:
+            if self.closed:
+                raise RequestNotSentError("tool process is closed")
+            try:
+                self.process.write(encode_frame({"body": body, "envs": envs}))
+            except Exception as e:
+                # the tool process only handles a request once its whole frame is read.
+                self._close()
+                raise RequestNotSentError(f"failed to send the request to the tool process. {e}") from e
+
+            timed_out = threading.Event()
+            timer = None
+            if self.timeout_seconds is not None:
+                timer = threading.Timer(self.timeout_seconds, self._expire, args=(timed_out,))
+                timer.daemon = True
+                timer.start()
+            try:
+                (size,) = FRAME_HEADER.unpack(self._read_exactly(FRAME_HEADER.size))
+                response = json.loads(self._read_exactly(size))
+            except Exception as e:
+                # the stream is out of sync once a request failed half way.
+                self._close()
+                if timed_out.is_set():
+                    raise TimeoutError(f"tool process didn't respond in {self.timeout_seconds}s") from e
+                raise
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+        if "error" in response:
+            return response["error"]
+        return response["result"]
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if not self.closed:
+            self.closed = True
+            self.process.close()
+
+    def _expire(self, timed_out: threading.Event):
+        # the call holds the lock while it's blocked on the read, closing the process unblocks it.
+        timed_out.set()
+        self.closed = True
+        self.process.close()
+
+    def _read_exactly(self, n: int) -> bytes:
+        while len(self._buffer) < n:
+            chunk = self.process.read()
+            if not chunk:
+                raise ConnectionError("tool process exited")
+            self._buffer += chunk
+
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
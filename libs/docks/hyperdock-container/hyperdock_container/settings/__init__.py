@@ -8,16 +8,115 @@ from hyperpocket.config.settings import config
 
 class ContainerRuntimeType(enum.Enum):
     DOCKER = "docker"
+    LOCAL_VENV = "local_venv"
 
 
 class DockerRuntimeSettings(BaseModel):
     base_url: Optional[str] = None
     credstore_env: dict = None
+    max_pool_size: int = 32  # http connections to the docker daemon
+
+
+class LocalVenvRuntimeSettings(BaseModel):
+    root: Optional[str] = None  # images and containers directory. `POCKET_ROOT/venv` if None
+    use_uv: bool = True  # create virtualenvs with uv, if it's installed
+    python: Optional[str] = None  # python version or executable. from the base image tag if None
+    stop_timeout_seconds: float = 10
+
+
+class WarmPoolSettings(BaseModel):
+    # opt-in. every docked tool keeps `min_size` idle containers running, not counted by the admission limits,
+    # and the invocations served by a warm container share its filesystem, unlike a one-shot container per call.
+    enabled: bool = False
+    min_size: int = 1  # idle containers kept ready per image
+    max_size: int = 4  # containers per image, including checked out ones
+    idle_timeout_seconds: float = 300
+    max_uses: int = 100  # a container is recycled after serving this many invocations
+    serve_timeout_seconds: Optional[float] = 300  # a resident tool process not responding in time is closed
+    health_check_interval_seconds: float = 30
+    maintenance_interval_seconds: float = 5
+
+
+class OutputOverflow(enum.Enum):
+    TRUNCATE = "truncate"
+    SPILL = "spill"  # write the rest of the output to a temp file
+
+
+class OutputSettings(BaseModel):
+    max_bytes: int = 1024 * 1024  # per stream
+    overflow: OutputOverflow = OutputOverflow.TRUNCATE
+
+
+class AdmissionSettings(BaseModel):
+    max_containers: int = 16  # tool invocations running at once. unlimited if 0
+    max_containers_per_image: int = 4  # unlimited if 0
+    queue_timeout_seconds: float = 60  # wait forever if 0
+    max_load_per_cpu: float = 2.0  # 1 minute load average per cpu. not checked if 0
+    max_memory_usage: float = 0.9  # used / limit of memory. not checked if 0
+    pressure_check_interval_seconds: float = 1
+
+
+class ImageGCSettings(BaseModel):
+    # collect in the background. opt-in, the images docked by other processes on the machine aren't known
+    # to this one, so it may evict them. `hyperpocket devtool gc-images` collects on demand.
+    enabled: bool = False
+    max_images: int = 50  # `hyperpocket:*` images kept. unlimited if 0
+    max_disk_bytes: int = 10 * 1024 ** 3  # disk usage of `hyperpocket:*` images. unlimited if 0
+    interval_seconds: float = 600
+
+
+class LoaderSettings(BaseModel):
+    # concurrency of each stage of `Pocket.load_tools`
+    resolve_workers: int = 8
+    fetch_workers: int = 8
+    pull_workers: int = 2
+    build_workers: int = 4
+    register_workers: int = 8
+
+
+class LazyDockSettings(BaseModel):
+    enabled: bool = False  # register tools from pocket.json, and build them later
+    background_build: bool = True  # start building right after registering. on first invocation if False
+    build_workers: int = 2
+
+
+class BuildCacheSettings(BaseModel):
+    # share pip/uv/npm caches between builds. opt-in, the builds resolve packages from the caches and the wheelhouse
+    # before the package index, so a tool may build differently than on its own.
+    enabled: bool = False
+    volume: str = "hyperpocket-build-cache"  # docker volume of the caches
+    wheelhouse: Optional[str] = None  # directory of wheels from the tools' dist/ and uv.lock. not used if None
+    offline: bool = False  # build from the caches and the wheelhouse only, without the package index
+
+
+class FamilySettings(BaseModel):
+    # build tools with overlapping dependencies on a shared family image. opt-in, the family of a tool depends on
+    # the other tools docked on the machine, so its image can change as they're docked.
+    enabled: bool = False
+    min_overlap: float = 0.5  # jaccard similarity of the dependencies to join a family
+    min_members: int = 2  # tools of a family, before its image is built
+
+
+class WatchSettings(BaseModel):
+    enabled: bool = False  # reload local path tools on file changes. for development
+    interval_seconds: float = 0.5
+    debounce_seconds: float = 0.2  # wait for the changes to settle before reloading
 
 
 class HyperdockSettings(BaseModel):
     runtime: ContainerRuntimeType = ContainerRuntimeType.DOCKER
     docker: Optional[DockerRuntimeSettings] = None
+    local_venv: Optional[LocalVenvRuntimeSettings] = None
+    warm_pool: WarmPoolSettings = WarmPoolSettings()
+    output: OutputSettings = OutputSettings()
+    admission: AdmissionSettings = AdmissionSettings()
+    image_gc: ImageGCSettings = ImageGCSettings()
+    loader: LoaderSettings = LoaderSettings()
+    lazy: LazyDockSettings = LazyDockSettings()
+    build_cache: BuildCacheSettings = BuildCacheSettings()
+    family: FamilySettings = FamilySettings()
+    watch: WatchSettings = WatchSettings()
+    async_max_workers: int = 32  # threads running blocking runtime calls of `AsyncContainerRuntime`
 
 
 DOCK_NAME = "container"
@@ -29,6 +128,17 @@ def settings():
 
 __all__ = [
     "settings",
+    "AdmissionSettings",
+    "BuildCacheSettings",
     "DockerRuntimeSettings",
+    "FamilySettings",
     "HyperdockSettings",
+    "ImageGCSettings",
+    "LazyDockSettings",
+    "LoaderSettings",
+    "LocalVenvRuntimeSettings",
+    "OutputOverflow",
+    "OutputSettings",
+    "WarmPoolSettings",
+    "WatchSettings",
 ]
@@ -0,0 +1,121 @@
+import pathlib
+import threading
+from typing import Callable, Optional
+
+from hyperdock_container.build_context import iter_build_context_files
+from hyperdock_container.lockfile import ToolLock
+from hyperdock_container.settings import WatchSettings
+from hyperpocket.config import pocket_logger
+from hyperpocket.tool.function import FunctionTool
+
+# files a build installs dependencies from. a change to them rebuilds the dependency layer.
+DEPENDENCY_FILES = {
+    "pyproject.toml", "uv.lock", "requirements.txt", "setup.py", "setup.cfg",
+    "package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml",
+}
+
+
+class ToolChanges(object):
+    def __init__(self, modified: set[str], deleted: set[str]):
+        self.modified = modified  # added or modified, relative to the tool directory
+        self.deleted = deleted
+
+    def __bool__(self):
+        return bool(self.modified or self.deleted)
+
+    def merge(self, other: "ToolChanges"):
+        self.modified = (self.modified | other.modified) - other.deleted
+        self.deleted = (self.deleted | other.deleted) - other.modified
+
+    @property
+    def dependencies_changed(self) -> bool:
+        return any(path in DEPENDENCY_FILES for path in self.modified | self.deleted)
+
+
+class ToolWatcher(object):
+    """
+    Polls the build context of a local tool directory, and calls `on_change` once the changes settle.
+
+    Polling only stats the files, so it's cheap enough for a tool directory and doesn't need a file system
+    notification library. Files ignored by the build context never trigger a reload.
+    """
+
+    def __init__(self, tool_path: pathlib.Path, on_change: Callable[[ToolChanges], None],
+                 watch_settings: WatchSettings):
+        self.tool_path = tool_path
+        self.on_change = on_change
+        self.settings = watch_settings
+        self._snapshot = self.snapshot()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for relative_path, path in iter_build_context_files(self.tool_path):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[relative_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> ToolChanges:
+        """
+        Changes since the last poll.
+        """
+        snapshot = self.snapshot()
+        previous, self._snapshot = self._snapshot, snapshot
+        return ToolChanges(
+            modified={path for path, stat in snapshot.items() if previous.get(path) != stat},
+            deleted=set(previous) - set(snapshot),
+        )
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name=f"hyperdock-watch-{self.tool_path.name}")
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.settings.interval_seconds):
+            if not (changes := self.poll()):
+                continue
+            # an editor or a formatter usually writes several files at once.
+            while not self._stopped.wait(self.settings.debounce_seconds) and (more := self.poll()):
+                changes.merge(more)
+            if self._stopped.is_set():
+                return
+            try:
+                self.on_change(changes)
+            except Exception as e:
+                pocket_logger.warning(f"failed to reload {self.tool_path}. keep the previous image. {e}")
+
+
+class WatchedTool(object):
+    """
+    The docked tool of a watched directory. A reload swaps the tool at once, invocations already running
+    finish on the previous image.
+    """
+
+    def __init__(self, tool: FunctionTool, tool_lock: ToolLock, dependency_image: str, build_config: dict):
+        self.tool = tool
+        self.tool_lock = tool_lock
+        # the last full build. source only changes are copied onto it.
+        self.dependency_image = dependency_image
+        self.build_config = build_config
+        # changes of a failed reload, retried with the next ones.
+        self.pending_changes: Optional[ToolChanges] = None
+        self.watcher: Optional[ToolWatcher] = None
+        self._lock = threading.Lock()
+
+    def swap(self, tool: FunctionTool, tool_lock: ToolLock) -> ToolLock:
+        with self._lock:
+            previous, self.tool, self.tool_lock = self.tool_lock, tool, tool_lock
+        return previous
+
+    def stop(self):
+        if self.watcher is not None:
+            self.watcher.stop()
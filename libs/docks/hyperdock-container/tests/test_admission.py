@@ -0,0 +1,125 @@
+import asyncio
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+
+from hyperdock_container.admission import AdmissionController, AdmissionTimeout, HostPressure
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.settings import AdmissionSettings
+
+
+class FakeHostPressure(HostPressure):
+    def __init__(self):
+        super().__init__(max_load_per_cpu=0, max_memory_usage=0)
+        self.overloaded = False
+
+    def is_overloaded(self) -> bool:
+        return self.overloaded
+
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.pressure = FakeHostPressure()
+        self.controller = AdmissionController(
+            AdmissionSettings(max_containers=2, max_containers_per_image=1, queue_timeout_seconds=0.2,
+                              pressure_check_interval_seconds=0.01),
+            self.pressure,
+        )
+
+    def test_per_image_limit(self):
+        self.controller.acquire("a")
+
+        with self.assertRaises(AdmissionTimeout):
+            self.controller.acquire("a")
+        self.controller.acquire("b")
+
+        self.assertEqual(self.controller.metrics()["running"], 2)
+        self.assertEqual(self.controller.metrics()["timeouts"], 1)
+
+    def test_global_limit(self):
+        self.controller.acquire("a")
+        self.controller.acquire("b")
+
+        with self.assertRaises(AdmissionTimeout):
+            self.controller.acquire("c")
+
+    def test_queued_until_released(self):
+        self.controller.acquire("a")
+        threading.Timer(0.05, self.controller.release, args=("a",)).start()
+
+        with self.controller.admit("a", timeout=1):
+            self.assertEqual(self.controller.metrics()["running"], 1)
+        self.assertEqual(self.controller.metrics()["running"], 0)
+
+    def test_host_pressure(self):
+        self.pressure.overloaded = True
+        # nothing is running, so one is admitted anyway.
+        self.controller.acquire("a")
+
+        with self.assertRaises(AdmissionTimeout):
+            self.controller.acquire("b")
+
+        self.pressure.overloaded = False
+        self.controller.acquire("b")
+
+    def test_async_queued_until_released(self):
+        async def _run():
+            self.controller.acquire("a")
+            asyncio.get_running_loop().call_later(0.05, self.controller.release, "a")
+            started = time.monotonic()
+            async with self.controller.aadmit("a", timeout=1):
+                return time.monotonic() - started
+
+        waited = asyncio.run(_run())
+
+        self.assertGreater(waited, 0.03)
+        self.assertEqual(self.controller.metrics()["running"], 0)
+
+    def test_async_timeout(self):
+        async def _run():
+            self.controller.acquire("a")
+            async with self.controller.aadmit("a"):
+                pass
+
+        with self.assertRaises(AdmissionTimeout):
+            asyncio.run(_run())
+        self.assertEqual(self.controller.metrics()["queued"], 0)
+
+
+class TestHostPressure(unittest.TestCase):
+    def setUp(self):
+        self.cgroup_dir = tempfile.TemporaryDirectory()
+        self.cgroup_root = pathlib.Path(self.cgroup_dir.name)
+        self.pressure = HostPressure(max_load_per_cpu=2, max_memory_usage=0.9, cgroup_root=self.cgroup_root)
+
+    def tearDown(self):
+        self.cgroup_dir.cleanup()
+
+    def test_cgroup_v2(self):
+        (self.cgroup_root / "cpu.max").write_text("200000 100000\n")
+        (self.cgroup_root / "memory.max").write_text("1000\n")
+        (self.cgroup_root / "memory.current").write_text("950\n")
+
+        self.assertEqual(self.pressure.cpu_count(), 2)
+        self.assertAlmostEqual(self.pressure.memory_usage(), 0.95)
+        self.assertTrue(self.pressure.is_overloaded())
+
+    def test_unlimited_cgroup(self):
+        (self.cgroup_root / "cpu.max").write_text("max 100000\n")
+        (self.cgroup_root / "memory.max").write_text("max\n")
+        (self.cgroup_root / "memory.current").write_text("950\n")
+
+        self.assertGreaterEqual(self.pressure.cpu_count(), 1)
+        # falls back to /proc/meminfo
+        usage = self.pressure.memory_usage()
+        self.assertTrue(usage is None or 0 <= usage <= 1)
+
+
+class TestResourceArguments(unittest.TestCase):
+    def test_resources(self):
+        arguments = ContainerDock.get_resource_arguments({"resources": {"cpus": 0.5, "memory": "512m"}})
+
+        self.assertEqual(arguments, {"nano_cpus": 500_000_000, "mem_limit": "512m"})
+        self.assertEqual(ContainerDock.get_resource_arguments({}), {})
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from hyperdock_container.runtime import AsyncContainerRuntime
+from tests.test_container_pool import FakeContainerRuntime
+
+
+class SlowContainerRuntime(FakeContainerRuntime):
+    def run(self, container_id, stdin_str=None):
+        time.sleep(0.2)
+        return f"{threading.current_thread().name}:{stdin_str}"
+
+
+class TestAsyncContainerRuntime(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.async_runtime = AsyncContainerRuntime(SlowContainerRuntime(), max_workers=8)
+
+    async def asyncTearDown(self):
+        self.async_runtime.shutdown()
+
+    async def test_runs_on_runtime_threads(self):
+        container_id = await self.async_runtime.create("hyperpocket:test", "/tool", "run", {})
+        await self.async_runtime.start(container_id)
+
+        result = await self.async_runtime.run(container_id, stdin_str="body")
+
+        self.assertTrue(result.startswith("hyperdock-runtime"))
+        self.assertTrue(result.endswith(":body"))
+        self.assertTrue(await self.async_runtime.is_running(container_id))
+
+    async def test_loop_stays_responsive(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        started_at = time.monotonic()
+        results = await asyncio.gather(
+            *[self.async_runtime.run(f"container-{i}", stdin_str=str(i)) for i in range(8)]
+        )
+        elapsed = time.monotonic() - started_at
+        ticker_task.cancel()
+
+        self.assertEqual(len(results), 8)
+        self.assertLess(elapsed, 0.2 * 4)
+        self.assertGreater(ticks, 5)
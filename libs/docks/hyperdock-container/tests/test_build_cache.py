@@ -0,0 +1,132 @@
+import pathlib
+import platform
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from hyperdock_container.build_cache import BuildCache, Wheelhouse, _select_wheel
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.runtime.local_venv import LocalVenvContainerRuntime
+from hyperdock_container.settings import BuildCacheSettings, LocalVenvRuntimeSettings
+from tests.test_dock_build import BuildingContainerRuntime
+
+UV_LOCK = """
+version = 1
+
+[[package]]
+name = "get-message"
+version = "0.1.0"
+source = { editable = "." }
+
+[[package]]
+name = "slack-sdk"
+version = "3.33.4"
+source = { registry = "https://pypi.org/simple" }
+wheels = [
+    { url = "https://files.pythonhosted.org/packages/ab/cd/slack_sdk-3.33.4-py2.py3-none-any.whl", hash = "sha256:00" },
+]
+"""
+
+
+class MountingContainerRuntime(BuildingContainerRuntime):
+    def build_cache_mount(self, volume, wheelhouse=None):
+        return "/hyperpocket-cache", None, {"volumes": {volume: {"bind": "/hyperpocket-cache", "mode": "rw"}}}
+
+
+class TestWheelhouse(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.work_path = pathlib.Path(self.work_dir.name)
+        self.tool_path = self.work_path / "tool"
+        (self.tool_path / "dist").mkdir(parents=True)
+        (self.tool_path / "dist" / "get_message-0.1.0-py3-none-any.whl").write_bytes(b"wheel")
+        (self.tool_path / "dist" / "get_message-0.1.0.tar.gz").write_bytes(b"sdist")
+        (self.tool_path / "uv.lock").write_text(UV_LOCK)
+        self.wheelhouse = Wheelhouse(self.work_path / "wheelhouse")
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_populate_from_dist(self):
+        self.assertEqual(self.wheelhouse.populate(self.tool_path, "python:3.11-slim", download=False), 1)
+        self.assertEqual(self.wheelhouse.populate(self.tool_path, "python:3.11-slim", download=False), 0)
+        self.assertEqual(self.wheelhouse.wheels(), {"get_message-0.1.0-py3-none-any.whl"})
+
+    def test_populate_from_uv_lock(self):
+        def _download(url, expected_hash, dest):
+            dest.write_bytes(b"wheel")
+
+        with patch.object(Wheelhouse, "_download", side_effect=_download) as download:
+            self.wheelhouse.populate(self.tool_path, "python:3.11-slim")
+            self.wheelhouse.populate(self.tool_path, "python:3.11-slim")
+
+        # only registry packages, and only once.
+        self.assertEqual(download.call_count, 1)
+        self.assertIn("slack_sdk-3.33.4-py2.py3-none-any.whl", self.wheelhouse.wheels())
+
+    def test_select_wheel(self):
+        machine = platform.machine().lower().replace("amd64", "x86_64").replace("arm64", "aarch64")
+        wheels = [
+            {"url": f"https://example.com/pydantic_core-2.27.2-cp310-cp310-manylinux_2_17_{machine}.whl"},
+            {"url": f"https://example.com/pydantic_core-2.27.2-cp311-cp311-manylinux_2_17_{machine}.whl"},
+            {"url": "https://example.com/pydantic_core-2.27.2-cp311-cp311-win_amd64.whl"},
+        ]
+
+        self.assertEqual(_select_wheel(wheels, "ghcr.io/astral-sh/uv:python3.11-bookworm-slim"), wheels[1])
+        self.assertIsNone(_select_wheel(wheels, "node:20"))
+
+
+class TestBuildCache(unittest.TestCase):
+    def test_runtime_without_cache(self):
+        build_cache = BuildCache(BuildCacheSettings(enabled=True))
+
+        build_cmd, arguments = build_cache.prepare(BuildingContainerRuntime(), pathlib.Path("."), "python:3.11",
+                                                   "pip install .")
+
+        self.assertEqual(build_cmd, "pip install .")
+        self.assertEqual(arguments, {})
+
+    def test_local_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            runtime = LocalVenvContainerRuntime(LocalVenvRuntimeSettings(root=tmp_dir))
+            build_cache = BuildCache(BuildCacheSettings(enabled=True, volume="test-cache", offline=True))
+
+            build_cmd, arguments = build_cache.prepare(runtime, pathlib.Path(tmp_dir), "python:3.11",
+                                                       "pip install .")
+
+            cache_path = pathlib.Path(tmp_dir) / "cache" / "test-cache"
+            self.assertTrue(cache_path.is_dir())
+            self.assertIn(f"PIP_CACHE_DIR={cache_path}/pip", build_cmd)
+            self.assertIn("UV_OFFLINE=1", build_cmd)
+            self.assertTrue(build_cmd.endswith("; pip install ."))
+            self.assertEqual(arguments, {})
+
+    def test_disabled(self):
+        build_cache = BuildCache(BuildCacheSettings(enabled=False))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            runtime = LocalVenvContainerRuntime(LocalVenvRuntimeSettings(root=tmp_dir))
+            build_cmd, _ = build_cache.prepare(runtime, pathlib.Path(tmp_dir), "python:3.11", "pip install .")
+
+        self.assertEqual(build_cmd, "pip install .")
+
+
+class TestDockBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.dock = ContainerDock()
+        self.dock.runtime = MountingContainerRuntime()
+        self.dock.build_cache = BuildCache(BuildCacheSettings(enabled=True, volume="test-cache"))
+
+    def test_cache_volume_without_runtime_volumes(self):
+        self.dock._commit_build("python:3.11", "pip install .", "test-tool", {})
+
+        self.assertEqual(self.dock.runtime.create_kwargs,
+                         [{"volumes": {"test-cache": {"bind": "/hyperpocket-cache", "mode": "rw"}}}])
+
+    def test_cache_volume_merged_with_runtime_volumes(self):
+        volumes = {"/data": {"bind": "/data", "mode": "ro"}}
+
+        self.dock._commit_build("python:3.11", "pip install .", "test-tool", {"volumes": volumes})
+
+        self.assertEqual(self.dock.runtime.create_kwargs[0]["volumes"],
+                         {"test-cache": {"bind": "/hyperpocket-cache", "mode": "rw"}, **volumes})
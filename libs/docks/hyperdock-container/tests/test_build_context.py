@@ -0,0 +1,94 @@
+import collections
+import io
+import pathlib
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from hyperdock_container import build_context
+from hyperdock_container.build_context import (
+    BuildContextCache,
+    IgnoreRules,
+    iter_build_context_files,
+)
+
+
+class TestIgnoreRules(unittest.TestCase):
+    def test_gitignore_patterns(self):
+        rules = IgnoreRules()
+        for pattern in ["venv", "dist/", "*.log", "!keep.log", "/uv.lock", "docs/**/*.md"]:
+            rules.add(pattern)
+
+        self.assertTrue(rules.is_ignored("venv", is_dir=True))
+        self.assertTrue(rules.is_ignored("sub/venv", is_dir=True))
+        self.assertTrue(rules.is_ignored("dist", is_dir=True))
+        self.assertFalse(rules.is_ignored("dist", is_dir=False))
+        self.assertTrue(rules.is_ignored("a/b/debug.log", is_dir=False))
+        self.assertFalse(rules.is_ignored("keep.log", is_dir=False))
+        self.assertTrue(rules.is_ignored("uv.lock", is_dir=False))
+        self.assertFalse(rules.is_ignored("sub/uv.lock", is_dir=False))
+        self.assertTrue(rules.is_ignored("docs/a/b/readme.md", is_dir=False))
+        self.assertTrue(rules.is_ignored("docs/readme.md", is_dir=False))
+
+    def test_dockerignore_patterns_are_anchored(self):
+        rules = IgnoreRules()
+        rules.add("*.log", anchored=True)
+
+        self.assertTrue(rules.is_ignored("debug.log", is_dir=False))
+        self.assertFalse(rules.is_ignored("sub/debug.log", is_dir=False))
+
+
+class TestBuildContext(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tmp_dir.name)
+        for path in ["pocket.json", "tool/__main__.py", "dist/tool.whl", ".venv/bin/python",
+                     "tool/__pycache__/main.pyc", "uv.lock"]:
+            (self.tool_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.tool_path / path).write_text(path)
+        (self.tool_path / ".gitignore").write_text("dist/\n")
+        (self.tool_path / ".dockerignore").write_text("uv.lock\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_ignored_files_are_excluded(self):
+        files = [relative_path for relative_path, _ in iter_build_context_files(self.tool_path)]
+
+        self.assertEqual(files, [".dockerignore", ".gitignore", "pocket.json", "tool/__main__.py"])
+
+    def test_archive(self):
+        archive = BuildContextCache().get_archive(self.tool_path)
+
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            names = tar.getnames()
+            main = tar.extractfile("tool/__main__.py").read()
+
+        self.assertEqual(names, [".dockerignore", ".gitignore", "pocket.json", "tool", "tool/__main__.py"])
+        self.assertEqual(main, b"tool/__main__.py")
+
+    def test_unchanged_tool_reuses_archive(self):
+        cache = BuildContextCache()
+
+        first = cache.get_archive(self.tool_path)
+        (self.tool_path / "dist" / "tool.whl").write_text("rebuilt wheel")
+        second = cache.get_archive(self.tool_path)
+        (self.tool_path / "tool" / "__main__.py").write_text("changed")
+        third = cache.get_archive(self.tool_path)
+
+        self.assertIs(first, second)
+        self.assertIsNot(second, third)
+
+    def test_file_digests_are_bounded(self):
+        files = [self.tool_path / "pocket.json", self.tool_path / "tool" / "__main__.py", self.tool_path / "uv.lock"]
+
+        with patch.object(build_context, "MAX_FILE_DIGESTS", 2), \
+                patch.object(build_context, "_file_digests", collections.OrderedDict()):
+            for file_path in files:
+                build_context._hash_file(file_path)
+            (self.tool_path / "uv.lock").write_text("changed lock")
+            changed = build_context._hash_file(self.tool_path / "uv.lock")
+
+            self.assertEqual(list(build_context._file_digests), [str(path) for path in files[1:]])
+            self.assertEqual(build_context._file_digests[str(files[2])][2], changed)
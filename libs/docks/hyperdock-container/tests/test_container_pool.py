@@ -0,0 +1,193 @@
+import itertools
+import unittest
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.lockfile import ToolLock
+from hyperdock_container.pool import ContainerPool, ContainerPoolManager
+from hyperdock_container.runtime import ContainerRuntime
+from hyperdock_container.serve import RequestNotSentError
+from hyperdock_container.settings import WarmPoolSettings
+
+
+class FakeContainerRuntime(ContainerRuntime):
+    def __init__(self):
+        self._ids = itertools.count()
+        self.running: set[str] = set()
+        self.removed: list[str] = []
+        self.create_kwargs: list[dict] = []
+
+    def create(self, image_tag, workdir, command, envs, **kwargs):
+        self.create_kwargs.append(kwargs)
+        return f"{image_tag}-{next(self._ids)}"
+
+    def start(self, container_id):
+        self.running.add(container_id)
+
+    def stop(self, container_id):
+        self.running.discard(container_id)
+
+    def wait(self, container_id):
+        self.running.discard(container_id)
+        return 0
+
+    def logs(self, container_id):
+        return ""
+
+    def remove(self, container_id):
+        self.removed.append(container_id)
+
+    def is_running(self, container_id):
+        return container_id in self.running
+
+    def exec(self, container_id, command, envs, workdir, stdin_str=None):
+        return f"{container_id}:{stdin_str}"
+
+    def pull(self, image_tag):
+        raise NotImplementedError
+
+    def list_image(self, name=None):
+        raise NotImplementedError
+
+    def run(self, container_id, stdin_str=None):
+        raise NotImplementedError
+
+    def put_archive(self, container_id, source, dest):
+        raise NotImplementedError
+
+    def commit(self, container_id, repository, tag):
+        raise NotImplementedError
+
+
+class TestContainerPool(unittest.TestCase):
+    def setUp(self):
+        self.runtime = FakeContainerRuntime()
+        self.settings = WarmPoolSettings(min_size=2, max_size=3, max_uses=2)
+        self.pool = ContainerPool(self.runtime, "hyperpocket:test", self.settings, {"network": "none"})
+
+    def test_maintain_fills_min_size(self):
+        self.pool.maintain()
+
+        self.assertEqual(self.pool.metrics()["idle"], 2)
+        self.assertEqual(len(self.runtime.running), 2)
+        self.assertEqual(self.runtime.create_kwargs[0], {"init": True, "network": "none"})
+
+    def test_checkout_never_creates(self):
+        container = self.pool.checkout()
+
+        self.assertIsNone(container)
+        self.assertEqual(len(self.runtime.create_kwargs), 0)
+        self.assertEqual(self.pool.metrics()["misses"], 1)
+
+    def test_checkout_and_checkin(self):
+        self.pool.maintain()
+
+        container = self.pool.checkout()
+        self.pool.checkin(container)
+        metrics = self.pool.metrics()
+
+        self.assertIsNotNone(container)
+        self.assertEqual(metrics["hits"], 1)
+        self.assertEqual(metrics["hit_rate"], 1.0)
+        self.assertEqual(metrics["idle"], 2)
+        self.assertGreater(metrics["checkout_latency_avg"], 0)
+
+    def test_max_size_bounds_refill(self):
+        self.pool.maintain()
+        self.pool.checkout()
+        self.pool.checkout()
+
+        self.pool.maintain()
+        metrics = self.pool.metrics()
+
+        self.assertEqual(metrics["checked_out"], 2)
+        self.assertEqual(metrics["idle"], 1)
+
+    def test_container_is_recycled_after_max_uses(self):
+        self.pool.maintain()
+
+        for _ in range(2):
+            container = self.pool.checkout()
+            self.pool.checkin(container)
+        self.pool.maintain()
+
+        self.assertEqual(self.runtime.removed, [container.container_id])
+        self.assertEqual(self.pool.metrics()["idle"], 2)
+
+    def test_unhealthy_container_is_replaced(self):
+        self.settings.health_check_interval_seconds = 0
+        self.pool.maintain()
+        dead = next(iter(self.runtime.running))
+        self.runtime.running.discard(dead)
+
+        self.pool.maintain()
+
+        self.assertIn(dead, self.runtime.removed)
+        self.assertEqual(len(self.runtime.running), 2)
+
+    def test_idle_timeout_shrinks_to_min_size(self):
+        self.pool.maintain()
+        first, second = self.pool.checkout(), self.pool.checkout()
+        self.pool.maintain()
+        self.pool.checkin(first)
+        self.pool.checkin(second)
+        self.settings.idle_timeout_seconds = 0
+
+        self.pool.maintain()
+
+        self.assertEqual(self.pool.metrics()["idle"], 2)
+        self.assertEqual(len(self.runtime.removed), 1)
+
+    def test_close_removes_containers(self):
+        self.pool.maintain()
+
+        self.pool.close()
+
+        self.assertEqual(len(self.runtime.removed), 2)
+        self.assertEqual(len(self.runtime.running), 0)
+
+    def test_disabled_pool(self):
+        manager = ContainerPoolManager(self.runtime, WarmPoolSettings(enabled=False))
+
+        self.assertIsNone(manager.get_pool("hyperpocket:test"))
+
+
+class WarmInvokeContainerRuntime(FakeContainerRuntime):
+    def __init__(self, exec_error: Exception):
+        super().__init__()
+        self.exec_error = exec_error
+        self.cold_runs: list[str] = []
+
+    def exec(self, container_id, command, envs, workdir, stdin_str=None):
+        raise self.exec_error
+
+    def run(self, container_id, stdin_str=None):
+        self.cold_runs.append(container_id)
+        return "cold"
+
+
+class TestWarmInvoke(unittest.TestCase):
+    def _invoke(self, runtime: WarmInvokeContainerRuntime) -> str:
+        dock = ContainerDock()
+        dock.runtime = runtime
+        dock.pool_manager = ContainerPoolManager(runtime, WarmPoolSettings(enabled=True, min_size=1))
+        tool = dock.dock_locked(ToolLock(request_tool_path="test", tool_source="local", name="test",
+                                         json_schema={"type": "object", "properties": {}},
+                                         image_tag="hyperpocket:test", run_command="python -m test"))
+        try:
+            dock.pool_manager.get_pool("hyperpocket:test").maintain()
+            return tool.func(body={}, envs={})
+        finally:
+            dock.pool_manager.close()
+
+    def test_not_sent_falls_back_to_cold_container(self):
+        runtime = WarmInvokeContainerRuntime(RequestNotSentError("container is gone"))
+
+        self.assertEqual(self._invoke(runtime), "cold")
+        self.assertEqual(len(runtime.cold_runs), 1)
+
+    def test_failure_after_sent_is_raised(self):
+        runtime = WarmInvokeContainerRuntime(RuntimeError("tool crashed"))
+
+        with self.assertRaises(RuntimeError):
+            self._invoke(runtime)
+        self.assertEqual(runtime.cold_runs, [])
@@ -0,0 +1,160 @@
+import concurrent.futures
+import json
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+
+from hyperdock_container.dock import ContainerDock, DockArguments
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.settings import WarmPoolSettings
+from hyperpocket.tool.dock import ToolLoader
+from tests.test_container_pool import FakeContainerRuntime
+
+
+class BuildingContainerRuntime(FakeContainerRuntime):
+    def __init__(self):
+        super().__init__()
+        self.images: set[str] = set()
+        self.pulled: list[str] = []
+        self.committed: list[str] = []
+        self._lock = threading.Lock()
+
+    def list_image(self, name=None):
+        return [(name, [name])] if name in self.images else []
+
+    def pull(self, image_tag):
+        time.sleep(0.05)
+        with self._lock:
+            self.pulled.append(image_tag)
+            self.images.add(image_tag)
+        return image_tag
+
+    def put_archive(self, container_id, source, dest):
+        pass
+
+    def run(self, container_id, stdin_str=None):
+        time.sleep(0.05)
+        return ""
+
+    def commit(self, container_id, repository, tag):
+        with self._lock:
+            self.committed.append(tag)
+            self.images.add(f"{repository}:{tag}")
+        return tag
+
+
+class TestContentHash(unittest.TestCase):
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tool_dir.name)
+        self.pocket_config = {
+            "tool": {"name": "test_tool"},
+            "language": "python",
+            "entrypoint": {"build": "pip install .", "run": "python -m test_tool"},
+        }
+        self._write_pocket_config()
+        (self.tool_path / "main.py").write_text("print('hello')")
+
+    def tearDown(self):
+        self.tool_dir.cleanup()
+
+    def _write_pocket_config(self):
+        (self.tool_path / "pocket.json").write_text(json.dumps(self.pocket_config))
+
+    def test_same_content_same_tag(self):
+        postfix = ContainerDock.get_image_tag_postfix(self.tool_path)
+
+        self.assertEqual(postfix, ContainerDock.get_image_tag_postfix(self.tool_path))
+
+    def test_edited_code_changes_tag(self):
+        postfix = ContainerDock.get_image_tag_postfix(self.tool_path)
+
+        (self.tool_path / "main.py").write_text("print('hello world')")
+
+        self.assertNotEqual(postfix, ContainerDock.get_image_tag_postfix(self.tool_path))
+
+    def test_build_config_changes_tag(self):
+        postfix = ContainerDock.get_image_tag_postfix(self.tool_path)
+
+        self.pocket_config["baseImage"] = "python:3.12-slim"
+        self._write_pocket_config()
+
+        self.assertNotEqual(postfix, ContainerDock.get_image_tag_postfix(self.tool_path))
+
+    def test_excluded_directories_are_ignored(self):
+        postfix = ContainerDock.get_image_tag_postfix(self.tool_path)
+
+        (self.tool_path / "__pycache__").mkdir()
+        (self.tool_path / "__pycache__" / "main.pyc").write_bytes(b"\0")
+
+        self.assertEqual(postfix, ContainerDock.get_image_tag_postfix(self.tool_path))
+
+
+class TestBuildDeduplication(unittest.TestCase):
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tool_dir.name)
+        (self.tool_path / "pocket.json").write_text(json.dumps({
+            "tool": {"name": "test_tool"},
+            "baseImage": f"test-base-image-{id(self)}",
+            "entrypoint": {"build": "pip install .", "run": "python -m test_tool"},
+        }))
+        self.dock = ContainerDock()
+        self.dock.runtime = BuildingContainerRuntime()
+
+    def tearDown(self):
+        self.tool_dir.cleanup()
+
+    def test_concurrent_builds_of_same_tool(self):
+        dock_args = DockArguments(
+            request_tool_path=str(self.tool_path),
+            tool_path=self.tool_path,
+            tool_vars={},
+            runtime_arguments={},
+            tool_source="local",
+            image_tag_postfix=ContainerDock.get_image_tag_postfix(self.tool_path),
+        )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            images = list(executor.map(lambda _: self.dock.build(dock_args), range(8)))
+
+        self.assertEqual(len(set(images)), 1)
+        self.assertEqual(len(self.dock.runtime.committed), 1)
+        self.assertEqual(len(self.dock.runtime.pulled), 1)
+
+
+class TestLoadStages(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.tool_paths = []
+        for name in ["tool_a", "tool_b", "tool_c"]:
+            tool_path = pathlib.Path(self.work_dir.name) / name
+            tool_path.mkdir()
+            (tool_path / "pocket.json").write_text(json.dumps({
+                "tool": {"name": name, "inputSchema": {"type": "object"}},
+                "baseImage": f"test-stage-base-image-{id(self)}",
+                "entrypoint": {"build": "pip install .", "run": f"python -m {name}"},
+            }))
+            self.tool_paths.append(str(tool_path))
+        self.dock = ContainerDock()
+        self.dock.runtime = BuildingContainerRuntime()
+        self.dock.pool_manager = ContainerPoolManager(self.dock.runtime, WarmPoolSettings(enabled=False))
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_pipelined_load(self):
+        events = []
+        loader = ToolLoader(self.dock.load_stages(), on_progress=lambda progress: events.append(progress))
+
+        tools = loader.load(self.tool_paths)
+
+        self.assertEqual([tool.name for tool in tools], ["tool_a", "tool_b", "tool_c"])
+        self.assertEqual(self.dock.runtime.pulled, [f"test-stage-base-image-{id(self)}"])
+        self.assertEqual(len(self.dock.runtime.committed), 3)
+        self.assertEqual(
+            [progress.stage for progress in events if progress.index == 0 and progress.status == "finished"],
+            ["resolve", "fetch", "pull", "build", "register"],
+        )
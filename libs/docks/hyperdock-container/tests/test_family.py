@@ -0,0 +1,122 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.family import ToolFamilyRegistry, read_dependencies
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.settings import FamilySettings, WarmPoolSettings
+from tests.test_dock_build import BuildingContainerRuntime
+
+UV_LOCK = """
+version = 1
+
+[[package]]
+name = "get-message"
+version = "0.1.0"
+source = { editable = "." }
+
+[[package]]
+name = "pywin32"
+version = "308"
+source = { registry = "https://pypi.org/simple" }
+wheels = [
+    { url = "https://files.pythonhosted.org/packages/ab/cd/pywin32-308-cp311-cp311-win_amd64.whl" },
+]
+
+[[package]]
+name = "slack-sdk"
+version = "3.33.4"
+source = { registry = "https://pypi.org/simple" }
+sdist = { url = "https://files.pythonhosted.org/packages/ab/cd/slack_sdk-3.33.4.tar.gz" }
+"""
+
+
+class RecordingContainerRuntime(BuildingContainerRuntime):
+    def __init__(self):
+        super().__init__()
+        self.created: list[tuple[str, str]] = []
+
+    def create(self, image_tag, workdir, command, envs, **kwargs):
+        self.created.append((image_tag, command))
+        return super().create(image_tag, workdir, command, envs, **kwargs)
+
+
+class TestToolFamilyRegistry(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.registry = ToolFamilyRegistry(FamilySettings(enabled=True), path=pathlib.Path(self.work_dir.name) / "families.json")
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_group_by_overlap(self):
+        members = {
+            "github_create_issue": {"base_image": "python:3.11-slim", "installer": "pip",
+                                    "dependencies": ["pygithub==2.5.0", "requests==2.32.3", "pydantic==2.10.3"]},
+            "github_list_issues": {"base_image": "python:3.11-slim", "installer": "pip",
+                                   "dependencies": ["pygithub==2.5.0", "requests==2.32.3", "pydantic==2.10.4"]},
+            "slack_get_messages": {"base_image": "python:3.11-slim", "installer": "pip",
+                                   "dependencies": ["slack-sdk==3.33.4"]},
+            "github_on_uv": {"base_image": "python:3.11-slim", "installer": "uv",
+                             "dependencies": ["pygithub==2.5.0", "requests==2.32.3", "pydantic==2.10.3"]},
+        }
+
+        families = self.registry.group(members)
+
+        self.assertEqual(len(families), 1)
+        self.assertEqual(families[0].members, ["github_create_issue", "github_list_issues"])
+        self.assertEqual(families[0].dependencies, ["pygithub==2.5.0", "requests==2.32.3"])
+
+    def test_assign(self):
+        dependencies = {"slack-sdk==3.33.4", "pydantic==2.10.3"}
+
+        self.assertIsNone(self.registry.assign("slack_get_messages", "python:3.11-slim", "pip", dependencies))
+        family = self.registry.assign("slack_post_message", "python:3.11-slim", "pip", dependencies)
+
+        self.assertEqual(family.members, ["slack_get_messages", "slack_post_message"])
+        self.assertEqual(family.image_tag, self.registry.assign("slack_get_messages", "python:3.11-slim", "pip",
+                                                                dependencies).image_tag)
+
+    def test_read_dependencies(self):
+        tool_path = pathlib.Path(self.work_dir.name)
+        (tool_path / "uv.lock").write_text(UV_LOCK)
+
+        self.assertEqual(read_dependencies(tool_path), {"slack-sdk==3.33.4"})
+
+
+class TestFamilyBuild(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.work_path = pathlib.Path(self.work_dir.name)
+        self.dock = ContainerDock()
+        self.dock.runtime = RecordingContainerRuntime()
+        self.dock.pool_manager = ContainerPoolManager(self.dock.runtime, WarmPoolSettings(enabled=False))
+        self.dock.families = ToolFamilyRegistry(FamilySettings(enabled=True), path=self.work_path / "families.json")
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def _tool(self, name: str) -> pathlib.Path:
+        tool_path = self.work_path / name
+        tool_path.mkdir()
+        (tool_path / "pocket.json").write_text(json.dumps({
+            "tool": {"name": name, "description": name, "inputSchema": {"type": "object"}},
+            "baseImage": "test-family-base-image",
+            "entrypoint": {"build": "pip install .", "run": f"python -m {name}"},
+        }))
+        (tool_path / "pyproject.toml").write_text(
+            f'[project]\nname = "{name}"\ndependencies = ["slack-sdk>=3.33.4", "pydantic>=2.10"]\n'
+        )
+        return tool_path
+
+    def test_tools_built_on_family_image(self):
+        for name in ["slack_get_messages", "slack_post_message", "slack_list_channels"]:
+            self.dock.build(self.dock.load(str(self._tool(name))))
+
+        family_builds = [tag for tag in self.dock.runtime.committed if tag.startswith("family-")]
+        self.assertEqual(len(family_builds), 1)
+        base_images = [image_tag for image_tag, command in self.dock.runtime.created if command == "pip install ."]
+        # the first tool has no family yet.
+        self.assertEqual(base_images, ["test-family-base-image"] + [f"hyperpocket:{family_builds[0]}"] * 2)
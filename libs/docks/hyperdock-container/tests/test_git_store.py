@@ -0,0 +1,94 @@
+import concurrent.futures
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import git
+
+from hyperdock_container.git_store import GitToolStore
+
+
+class TestGitToolStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.tmp_dir.name)
+
+        self.repo_path = root / "repo"
+        self.repo = git.Repo.init(self.repo_path, initial_branch="main")
+        for tool in ["echo", "ping"]:
+            (self.repo_path / "tools" / tool).mkdir(parents=True)
+            (self.repo_path / "tools" / tool / "pocket.json").write_text(f'{{"name": "{tool}"}}')
+        self.sha = self._commit()
+        self.repo_url = f"file://{self.repo_path}"
+
+        self.store = GitToolStore(root / "git")
+        self.toolpkg = root / "toolpkg"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _commit(self) -> str:
+        self.repo.git.add(all=True)
+        author = git.Actor("test", "test@test.com")
+        return self.repo.index.commit("commit", author=author, committer=author).hexsha
+
+    def test_tools_share_one_clone(self):
+        tools = ["tools/echo", "tools/ping"] * 4
+
+        with patch.object(git.Repo, "clone_from", wraps=git.Repo.clone_from) as clone_from, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            tool_paths = list(executor.map(
+                lambda directory_path: self.store.checkout(
+                    self.repo_url, "main", self.sha, directory_path,
+                    self.toolpkg / directory_path.split("/")[-1] / self.sha,
+                ),
+                tools,
+            ))
+
+        self.assertEqual(clone_from.call_count, 1)
+        self.assertEqual(len(list(self.store.root.rglob("*.git"))), 1)
+        for tool_path in set(tool_paths):
+            self.assertTrue((tool_path / "pocket.json").exists())
+            # the store is shared, tool directories don't have their own repository.
+            self.assertFalse((tool_path.parents[1] / ".git").exists())
+
+    def test_store_cloned_by_another_process(self):
+        # the store of another process doesn't share the locks.
+        other_store = GitToolStore(self.store.root)
+        clone_from = git.Repo.clone_from
+
+        def clone_from_while_other_process_clones(*args, **kwargs):
+            if clone_from_mock.call_count == 1:
+                other_store.fetch(self.repo_url, "main", self.sha)
+            return clone_from(*args, **kwargs)
+
+        with patch.object(git.Repo, "clone_from", side_effect=clone_from_while_other_process_clones) as clone_from_mock:
+            tool_path = self.store.checkout(self.repo_url, "main", self.sha, "tools/echo",
+                                            self.toolpkg / "echo" / self.sha)
+
+        self.assertTrue((tool_path / "pocket.json").exists())
+        self.assertEqual(list(self.store.root.rglob("*.git")), [self.store.store_path(self.repo_url)])
+
+    def test_directories_of_same_dest(self):
+        dest = self.toolpkg / "tools" / self.sha
+
+        echo = self.store.checkout(self.repo_url, "main", self.sha, "tools/echo", dest)
+        ping = self.store.checkout(self.repo_url, "main", self.sha, "tools/ping", dest)
+
+        self.assertEqual(echo, dest / "tools/echo")
+        self.assertEqual(ping, dest / "tools/ping")
+        self.assertTrue((echo / "pocket.json").exists())
+        self.assertTrue((ping / "pocket.json").exists())
+
+    def test_new_sha_is_fetched_into_same_store(self):
+        self.store.checkout(self.repo_url, "main", self.sha, "tools/echo", self.toolpkg / "echo" / self.sha)
+        (self.repo_path / "tools" / "echo" / "pocket.json").write_text('{"name": "echo2"}')
+        new_sha = self._commit()
+
+        tool_path = self.store.checkout(
+            self.repo_url, "main", new_sha, "tools/echo", self.toolpkg / "echo" / new_sha
+        )
+
+        self.assertEqual((tool_path / "pocket.json").read_text(), '{"name": "echo2"}')
+        self.assertEqual(len(list(self.store.root.rglob("*.git"))), 1)
@@ -0,0 +1,122 @@
+import pathlib
+import tempfile
+import unittest
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.image_gc import ImageLifecycleManager, ImageUsageStore
+from hyperdock_container.lockfile import ToolLock
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.settings import ImageGCSettings, WarmPoolSettings
+from tests.test_container_pool import FakeContainerRuntime
+
+
+class ImageContainerRuntime(FakeContainerRuntime):
+    def __init__(self, images: dict[str, int]):
+        super().__init__()
+        self.images = images
+        self.busy: set[str] = set()
+
+    def image_disk_usage(self, repository):
+        return {tag: size for tag, size in self.images.items() if tag.startswith(f"{repository}:")}
+
+    def remove_image(self, image_tag):
+        if image_tag in self.busy:
+            raise RuntimeError(f"image {image_tag} is used by a running container")
+        del self.images[image_tag]
+
+
+class TestImageLifecycleManager(unittest.TestCase):
+    def setUp(self):
+        self.usage_dir = tempfile.TemporaryDirectory()
+        self.usage_path = pathlib.Path(self.usage_dir.name) / "image_usage.json"
+        self.runtime = ImageContainerRuntime({
+            "hyperpocket:a": 100,
+            "hyperpocket:b": 100,
+            "hyperpocket:c": 100,
+            "hyperpocket:d": 100,
+            "python:3.11-slim": 1000,
+        })
+        self.in_use: set[str] = set()
+
+    def tearDown(self):
+        self.usage_dir.cleanup()
+
+    def _manager(self, **kwargs) -> ImageLifecycleManager:
+        gc_settings = ImageGCSettings(**({"enabled": False, "max_images": 0, "max_disk_bytes": 0} | kwargs))
+        return ImageLifecycleManager(self.runtime, gc_settings, in_use=lambda: self.in_use,
+                                     usage_path=self.usage_path)
+
+    def _touch_in_order(self, manager: ImageLifecycleManager, image_tags: list[str]):
+        for image_tag in image_tags:
+            manager.touch(image_tag)
+            # distinct timestamps
+            manager.usage._pending[image_tag] += image_tags.index(image_tag)
+
+    def test_evict_least_recently_used_over_image_count(self):
+        manager = self._manager(max_images=2)
+        self._touch_in_order(manager, ["hyperpocket:c", "hyperpocket:a", "hyperpocket:d", "hyperpocket:b"])
+
+        evicted = manager.collect()
+
+        self.assertEqual(evicted, ["hyperpocket:c", "hyperpocket:a"])
+        self.assertEqual(set(self.runtime.images), {"hyperpocket:d", "hyperpocket:b", "python:3.11-slim"})
+        self.assertNotIn("hyperpocket:c", manager.usage.load())
+
+    def test_evict_over_disk_budget(self):
+        manager = self._manager(max_disk_bytes=250)
+        self._touch_in_order(manager, ["hyperpocket:a", "hyperpocket:b", "hyperpocket:c", "hyperpocket:d"])
+
+        self.assertEqual(manager.collect(), ["hyperpocket:a", "hyperpocket:b"])
+
+    def test_never_evict_warm_pool_or_busy_images(self):
+        manager = self._manager(max_images=2)
+        self._touch_in_order(manager, ["hyperpocket:a", "hyperpocket:b", "hyperpocket:c", "hyperpocket:d"])
+        self.in_use = {"hyperpocket:a"}
+        self.runtime.busy = {"hyperpocket:b"}
+
+        self.assertEqual(manager.collect(), ["hyperpocket:c", "hyperpocket:d"])
+
+    def test_never_evict_pinned_images(self):
+        manager = self._manager(max_images=2)
+        self._touch_in_order(manager, ["hyperpocket:a", "hyperpocket:b", "hyperpocket:c", "hyperpocket:d"])
+        manager.pin("hyperpocket:a")
+        manager.pin("hyperpocket:b")
+        manager.pin("hyperpocket:b")
+        manager.unpin("hyperpocket:b")
+        manager.unpin("hyperpocket:a")
+
+        self.assertEqual(manager.collect(), ["hyperpocket:a", "hyperpocket:c"])
+
+    def test_never_evict_docked_tools_without_warm_pool(self):
+        dock = ContainerDock()
+        dock.runtime = self.runtime
+        dock.pool_manager = ContainerPoolManager(self.runtime, WarmPoolSettings(enabled=False))
+        dock.image_lifecycle = self._manager(max_images=1)
+        for image_tag in ["hyperpocket:a", "hyperpocket:b", "hyperpocket:c"]:
+            dock.dock_locked(ToolLock(request_tool_path=image_tag, tool_source="local", name=image_tag[-1],
+                                      json_schema={"type": "object", "properties": {}},
+                                      image_tag=image_tag, run_command="python -m tool"))
+
+        self.assertEqual(dock.image_lifecycle.collect(), ["hyperpocket:d"])
+        self.assertEqual(set(self.runtime.images), {"hyperpocket:a", "hyperpocket:b", "hyperpocket:c",
+                                                    "python:3.11-slim"})
+
+    def test_dry_run(self):
+        manager = self._manager(max_images=3)
+
+        self.assertEqual(len(manager.collect(dry_run=True)), 1)
+        self.assertEqual(len(self.runtime.images), 5)
+
+
+class TestImageUsageStore(unittest.TestCase):
+    def test_flush_merges_latest_use(self):
+        with tempfile.TemporaryDirectory() as usage_dir:
+            path = pathlib.Path(usage_dir) / "image_usage.json"
+            store, other_process_store = ImageUsageStore(path), ImageUsageStore(path)
+
+            store.touch("hyperpocket:a")
+            store.flush()
+            other_process_store.touch("hyperpocket:b")
+            usage = other_process_store.flush()
+
+            self.assertEqual(set(usage), {"hyperpocket:a", "hyperpocket:b"})
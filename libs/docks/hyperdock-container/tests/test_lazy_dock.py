@@ -0,0 +1,75 @@
+import asyncio
+import concurrent.futures
+import json
+import pathlib
+import tempfile
+import unittest
+
+import git
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.git_store import GitToolStore
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.runtime import AsyncContainerRuntime
+from hyperdock_container.settings import WarmPoolSettings
+from tests.test_dock_build import BuildingContainerRuntime
+
+
+class TestLazyDock(unittest.TestCase):
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tool_dir.name)
+        (self.tool_path / "pocket.json").write_text(json.dumps({
+            "tool": {"name": "lazy_tool", "description": "lazy", "inputSchema": {"type": "object"}},
+            "baseImage": f"test-lazy-base-image-{id(self)}",
+            "variables": {"region": "us"},
+            "entrypoint": {"build": "pip install .", "run": "python -m lazy_tool"},
+        }))
+        self.dock = ContainerDock()
+        self.dock.runtime = BuildingContainerRuntime()
+        self.dock.async_runtime = AsyncContainerRuntime(self.dock.runtime, max_workers=4)
+        self.dock.pool_manager = ContainerPoolManager(self.dock.runtime, WarmPoolSettings(enabled=False))
+        self.source = self.dock.resolve((str(self.tool_path), {"region": "eu"}))
+
+    def tearDown(self):
+        self.tool_dir.cleanup()
+
+    def test_register_without_build(self):
+        tool = self.dock.dock_lazy_source(self.source, background_build=False)
+
+        self.assertEqual(tool.name, "lazy_tool")
+        self.assertEqual(tool.description, "lazy")
+        self.assertEqual(tool.tool_vars, {"region": "eu"})
+        self.assertEqual(self.dock.runtime.committed, [])
+
+    def test_concurrent_first_calls_build_once(self):
+        tool = self.dock.dock_lazy_source(self.source, background_build=False)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: tool.func(body={}, envs={}), range(4)))
+
+        self.assertEqual(results, [""] * 4)
+        self.assertEqual(len(self.dock.runtime.committed), 1)
+
+    def test_background_build(self):
+        tool = self.dock.dock_lazy_source(self.source, background_build=True)
+
+        self.assertEqual(asyncio.run(tool.afunc(body={}, envs={})), "")
+        self.assertEqual(len(self.dock.runtime.committed), 1)
+
+
+class TestReadFile(unittest.TestCase):
+    def test_read_file_without_checkout(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            repo_path = pathlib.Path(tmp_dir) / "repo"
+            repo = git.Repo.init(repo_path, initial_branch="main")
+            (repo_path / "tools" / "echo").mkdir(parents=True)
+            (repo_path / "tools" / "echo" / "pocket.json").write_text('{"tool": {"name": "echo"}}')
+            repo.git.add(all=True)
+            author = git.Actor("test", "test@test.com")
+            sha = repo.index.commit("commit", author=author, committer=author).hexsha
+
+            store = GitToolStore(pathlib.Path(tmp_dir) / "git")
+            content = store.read_file(f"file://{repo_path}", "main", sha, "tools/echo/pocket.json")
+
+            self.assertEqual(json.loads(content), {"tool": {"name": "echo"}})
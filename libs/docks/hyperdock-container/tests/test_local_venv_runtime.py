@@ -0,0 +1,121 @@
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.runtime.local_venv import LocalVenvContainerRuntime
+from hyperdock_container.settings import LocalVenvRuntimeSettings, WarmPoolSettings
+
+TOOL_MAIN = """
+import json
+import os
+import sys
+
+req = json.load(sys.stdin)
+print(f"{req['greeting']}, {os.environ['TEST_NAME']}. {open('built.txt').read().strip()} in {os.environ['VIRTUAL_ENV']}")
+"""
+
+
+class TestLocalVenvContainerRuntime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root_dir = tempfile.TemporaryDirectory()
+        cls.runtime = LocalVenvContainerRuntime(LocalVenvRuntimeSettings(root=cls.root_dir.name))
+
+        # a single venv for every test, creating one takes a few seconds.
+        cls.build_container_id = cls.runtime.create("python:3-slim", workdir="/tool", command="true", envs={})
+        cls.runtime.commit(cls.build_container_id, "test-base", "latest")
+        cls.runtime.remove(cls.build_container_id)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.root_dir.cleanup()
+
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tool_dir.name)
+        (self.tool_path / "pocket.json").write_text(json.dumps({
+            "tool": {"name": "local_tool", "inputSchema": {"properties": {"greeting": {"type": "string"}}}},
+            "language": "python",
+            "entrypoint": {"build": "echo built > built.txt", "run": "python main.py"},
+        }))
+        (self.tool_path / "main.py").write_text(TOOL_MAIN)
+
+    def tearDown(self):
+        self.tool_dir.cleanup()
+
+    def test_build_commit_run(self):
+        container_id = self.runtime.create("test-base:latest", workdir="/tool", command="python main.py",
+                                           envs={"TEST_NAME": "pocket"})
+        self.addCleanup(self.runtime.remove, container_id)
+        self.assertTrue(self.runtime.list_image("test-base:latest"))
+
+        self.runtime.put_archive(container_id, self.tool_path, "/tool")
+        self.runtime.exec(container_id, "echo built > built.txt", envs={}, workdir="/tool")
+        result = self.runtime.run(container_id, stdin_str=json.dumps({"greeting": "hello"}))
+
+        self.assertTrue(result.startswith("hello, pocket. built in "))
+        self.assertIn(self.root_dir.name, result)
+
+    def test_failed_command_returns_stderr(self):
+        container_id = self.runtime.create("test-base:latest", workdir="/tool", command="echo oops >&2; exit 3",
+                                           envs={})
+        self.addCleanup(self.runtime.remove, container_id)
+
+        self.assertEqual(self.runtime.run(container_id), "oops\n")
+        self.assertEqual(self.runtime.wait(container_id), 3)
+
+    def test_host_envs_are_isolated(self):
+        container_id = self.runtime.create("test-base:latest", workdir="/tool", command="env",
+                                           envs={"TEST_NAME": "pocket"})
+        self.addCleanup(self.runtime.remove, container_id)
+
+        with unittest.mock.patch.dict(os.environ, {"TEST_HOST_SECRET": "secret"}):
+            result = self.runtime.run(container_id)
+
+        self.assertIn("TEST_NAME=pocket", result)
+        self.assertIn("VIRTUAL_ENV=", result)
+        self.assertNotIn("TEST_HOST_SECRET", result)
+
+    def test_image_names_with_slash(self):
+        container_id = self.runtime.create("test-base:latest", workdir="/tool", command="true", envs={})
+        self.addCleanup(self.runtime.remove, container_id)
+
+        self.runtime.commit(container_id, "test/slash", "v1")
+        self.addCleanup(self.runtime.remove_image, "test/slash:v1")
+
+        self.assertIn(["test/slash:v1"], [names for _, names in self.runtime.list_image()])
+        self.assertEqual(self.runtime.list_image("test/slash:v1")[0][1], ["test/slash:v1"])
+        self.assertEqual(self.runtime.list_image("test_slash:v1"), [])
+
+    def test_attach_exec(self):
+        container_id = self.runtime.create("test-base:latest", workdir="/tool", command="exec tail -f /dev/null",
+                                           envs={})
+        self.addCleanup(self.runtime.remove, container_id)
+        self.runtime.start(container_id)
+        self.assertTrue(self.runtime.is_running(container_id))
+
+        process = self.runtime.attach_exec(container_id, "cat", envs={}, workdir="/tool")
+        process.write(b"ping")
+        self.assertEqual(process.read(), b"ping")
+        process.close()
+
+        self.runtime.stop(container_id)
+        self.assertFalse(self.runtime.is_running(container_id))
+
+    def test_dock_with_local_runtime(self):
+        dock = ContainerDock()
+        dock.runtime = self.runtime
+        dock.pool_manager = ContainerPoolManager(self.runtime, WarmPoolSettings(enabled=False))
+        # no base image to pull, the virtualenv is created from the local python.
+        tool = dock.dock(str(self.tool_path))
+
+        result = tool.func(body={"greeting": "hi"}, envs={"TEST_NAME": "local"})
+
+        self.assertTrue(result.startswith("hi, local. built in "))
+        image_tag = f"hyperpocket:local_tool-{ContainerDock.get_image_tag_postfix(self.tool_path)}"
+        self.assertEqual(len(self.runtime.list_image(image_tag)), 1)
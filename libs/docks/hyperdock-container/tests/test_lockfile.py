@@ -0,0 +1,67 @@
+import json
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.lockfile import ToolLockfile
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.settings import WarmPoolSettings
+from tests.test_dock_build import BuildingContainerRuntime
+
+
+class TestPrebuild(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.work_path = pathlib.Path(self.work_dir.name)
+        self.tool_paths = []
+        for name in ["tool_a", "tool_b"]:
+            tool_path = self.work_path / name
+            tool_path.mkdir()
+            (tool_path / "pocket.json").write_text(json.dumps({
+                "tool": {"name": name, "description": f"{name} tool", "inputSchema": {"type": "object"}},
+                "language": "python",
+                "variables": {"region": "us"},
+                "resources": {"memory": "256m"},
+                "entrypoint": {"build": "pip install .", "run": f"python -m {name}"},
+            }))
+            self.tool_paths.append(tool_path)
+
+        self.dock = ContainerDock()
+        self.dock.runtime = BuildingContainerRuntime()
+        self.dock.pool_manager = ContainerPoolManager(self.dock.runtime, WarmPoolSettings(enabled=False))
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_prebuild_and_dock_lockfile(self):
+        tool_likes = [str(self.tool_paths[0]), (str(self.tool_paths[1]), {"region": "eu"})]
+        lockfile_path = self.work_path / "pocket.lock.json"
+
+        self.dock.prebuild(tool_likes).dump(lockfile_path)
+
+        lockfile = ToolLockfile.load(lockfile_path)
+        self.assertEqual([tool_lock.name for tool_lock in lockfile.tools], ["tool_a", "tool_b"])
+        self.assertEqual(len(self.dock.runtime.committed), 2)
+        tool_lock = lockfile.tools[1]
+        self.assertEqual(tool_lock.tool_vars, {"region": "eu"})
+        self.assertEqual(tool_lock.runtime_arguments, {"mem_limit": "256m"})
+        self.assertTrue(tool_lock.image_tag.startswith("hyperpocket:tool_b-"))
+
+        # docked from the lockfile only, the tool directories aren't needed anymore.
+        for tool_path in self.tool_paths:
+            shutil.rmtree(tool_path)
+        tools = self.dock.dock_lockfile(lockfile_path)
+
+        self.assertEqual([tool.name for tool in tools], ["tool_a", "tool_b"])
+        self.assertEqual(tools[0].description, "tool_a tool")
+        self.assertEqual(tools[0].tool_vars, {"region": "us"})
+        self.assertEqual(len(self.dock.runtime.committed), 2)
+
+    def test_unsupported_version(self):
+        lockfile_path = self.work_path / "pocket.lock.json"
+        lockfile_path.write_text(json.dumps({"version": 0, "tools": []}))
+
+        with self.assertRaises(ValueError):
+            ToolLockfile.load(lockfile_path)
@@ -0,0 +1,53 @@
+import os
+import unittest
+
+from hyperdock_container.output import STDERR, STDOUT, BoundedStream, OutputCapture
+from hyperdock_container.settings import OutputOverflow, OutputSettings
+
+
+class TestBoundedStream(unittest.TestCase):
+    def test_decode_split_multibyte_characters(self):
+        stream = BoundedStream("stdout", 1024, OutputOverflow.TRUNCATE)
+        encoded = "안녕".encode("utf-8")
+        for i in range(len(encoded)):
+            stream.write(encoded[i:i + 1])
+
+        self.assertEqual(stream.getvalue(), "안녕")
+
+    def test_truncate(self):
+        stream = BoundedStream("stdout", 10, OutputOverflow.TRUNCATE)
+        stream.write(b"0123456")
+        stream.write(b"789abcdef")
+
+        value = stream.getvalue()
+        self.assertTrue(value.startswith("0123456789\n"))
+        self.assertIn("6 bytes over the 10 bytes limit", value)
+        self.assertIsNone(stream.spill_path)
+
+    def test_spill(self):
+        stream = BoundedStream("stdout", 4, OutputOverflow.SPILL)
+        stream.write(b"0123")
+        stream.write(b"4567")
+        stream.write(b"89")
+
+        value = stream.getvalue()
+        self.addCleanup(os.remove, stream.spill_path)
+        self.assertTrue(value.startswith("0123\n"))
+        self.assertIn(stream.spill_path, value)
+        with open(stream.spill_path, "rb") as f:
+            self.assertEqual(f.read(), b"456789")
+
+
+class TestOutputCapture(unittest.TestCase):
+    def test_stderr_only_on_failure(self):
+        for exit_code, expected in [(0, "out"), (1, "outerr")]:
+            capture = OutputCapture(OutputSettings())
+            capture.feed_frames([(STDOUT, b"out"), (STDERR, b"err")])
+            self.assertEqual(capture.result(exit_code), expected)
+
+    def test_demuxed_streams_are_bounded_separately(self):
+        capture = OutputCapture(OutputSettings(max_bytes=3))
+        capture.feed_demuxed([(b"abc", None), (None, b"x"), (b"def", b"yz")])
+
+        self.assertTrue(capture.stdout.getvalue().startswith("abc\n"))
+        self.assertEqual(capture.stderr.getvalue(), "xyz")
@@ -0,0 +1,125 @@
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from hyperdock_container.runtime import ContainerProcess
+from hyperdock_container.serve import RequestNotSentError, ToolServeProcess
+from hyperpocket.cli.codegen.tool import get_tool_main_template
+
+
+class SubprocessContainerProcess(ContainerProcess):
+    def __init__(self, args: list[str]):
+        self.proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def write(self, data: bytes) -> None:
+        self.proc.stdin.write(data)
+        self.proc.stdin.flush()
+
+    def read(self) -> bytes:
+        return self.proc.stdout.read1(4096)
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        self.proc.wait(timeout=10)
+        self.proc.stdout.close()
+
+
+class HangingContainerProcess(ContainerProcess):
+    def __init__(self, write_error: Exception = None):
+        self.write_error = write_error
+        self.closed = threading.Event()
+
+    def write(self, data: bytes) -> None:
+        if self.write_error is not None:
+            raise self.write_error
+
+    def read(self) -> bytes:
+        self.closed.wait()
+        return b""
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class TestToolServeProcess(unittest.TestCase):
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        tool_main = get_tool_main_template().render(
+            capitalized_tool_name="EchoTool", tool_name="echo_tool"
+        )
+        # echo the request and the credential, and print to stdout like one-shot tools do.
+        tool_main = tool_main.replace(
+            "    return\n\n\ndef handle",
+            "    print('noise')\n"
+            "    return f\"{req.param_1}:{os.getenv('ECHO_TOKEN')}\"\n\n\ndef handle",
+        )
+        self.tool_main = Path(self.tool_dir.name) / "echo_tool.py"
+        self.tool_main.write_text(tool_main)
+
+    def tearDown(self):
+        self.tool_dir.cleanup()
+
+    def test_serve_many_requests(self):
+        process = ToolServeProcess(
+            SubprocessContainerProcess([sys.executable, str(self.tool_main), "--serve"])
+        )
+
+        try:
+            first = process.call({"param_1": "first"}, {"ECHO_TOKEN": "token-1"})
+            second = process.call({"param_1": "second"}, {})
+        finally:
+            process.close()
+
+        self.assertEqual(first, "first:token-1")
+        self.assertEqual(second, "second:None")
+
+    def test_tool_error_is_returned(self):
+        process = ToolServeProcess(
+            SubprocessContainerProcess([sys.executable, str(self.tool_main), "--serve"])
+        )
+
+        try:
+            result = process.call({}, {})
+            recovered = process.call({"param_1": "ok"}, {})
+        finally:
+            process.close()
+
+        self.assertIn("ValidationError", result)
+        self.assertEqual(recovered, "ok:None")
+
+    def test_exited_process(self):
+        process = ToolServeProcess(
+            SubprocessContainerProcess([sys.executable, "-c", "pass"])
+        )
+
+        with self.assertRaises(ConnectionError):
+            process.call({"param_1": "first"}, {})
+        self.assertTrue(process.closed)
+
+    def test_one_shot_fallback(self):
+        result = subprocess.run(
+            [sys.executable, str(self.tool_main)],
+            input=b'{"param_1": "one-shot"}',
+            capture_output=True,
+            env={"ECHO_TOKEN": "token"},
+        )
+
+        self.assertEqual(result.stdout.decode().splitlines(), ["noise", "one-shot:token"])
+
+    def test_timeout(self):
+        process = ToolServeProcess(HangingContainerProcess(), timeout_seconds=0.1)
+
+        with self.assertRaises(TimeoutError):
+            process.call({"param_1": "hang"}, {})
+        self.assertTrue(process.closed)
+
+    def test_request_not_sent(self):
+        process = ToolServeProcess(HangingContainerProcess(write_error=BrokenPipeError()))
+
+        with self.assertRaises(RequestNotSentError):
+            process.call({"param_1": "first"}, {})
+        with self.assertRaises(RequestNotSentError):
+            process.call({"param_1": "second"}, {})
@@ -0,0 +1,88 @@
+import json
+import pathlib
+import tempfile
+import threading
+import unittest
+
+from hyperdock_container.dock import ContainerDock
+from hyperdock_container.pool import ContainerPoolManager
+from hyperdock_container.settings import WarmPoolSettings, WatchSettings
+from hyperdock_container.watch import ToolWatcher
+from tests.test_family import RecordingContainerRuntime
+
+
+class TestToolWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tool_dir.name)
+        (self.tool_path / ".gitignore").write_text("*.log\n")
+        (self.tool_path / "main.py").write_text("print('hello')")
+        (self.tool_path / "util.py").write_text("")
+
+    def tearDown(self):
+        self.tool_dir.cleanup()
+
+    def test_poll(self):
+        watcher = ToolWatcher(self.tool_path, lambda changes: None, WatchSettings())
+
+        (self.tool_path / "main.py").write_text("print('hello world')")
+        (self.tool_path / "pyproject.toml").write_text("[project]")
+        (self.tool_path / "util.py").unlink()
+        (self.tool_path / "debug.log").write_text("ignored")
+        changes = watcher.poll()
+
+        self.assertEqual(changes.modified, {"main.py", "pyproject.toml"})
+        self.assertEqual(changes.deleted, {"util.py"})
+        self.assertTrue(changes.dependencies_changed)
+        self.assertFalse(watcher.poll())
+
+
+class TestDockWatch(unittest.TestCase):
+    def setUp(self):
+        self.tool_dir = tempfile.TemporaryDirectory()
+        self.tool_path = pathlib.Path(self.tool_dir.name)
+        self.pocket_config = {
+            "tool": {"name": "watched_tool", "description": "watched", "inputSchema": {"type": "object"}},
+            "baseImage": "test-watch-base-image",
+            "entrypoint": {"build": "pip install .", "run": "python -m watched_tool"},
+        }
+        (self.tool_path / "pocket.json").write_text(json.dumps(self.pocket_config))
+        (self.tool_path / "pyproject.toml").write_text('[project]\nname = "watched_tool"\n')
+        (self.tool_path / "main.py").write_text("print('hello')")
+
+        self.dock = ContainerDock()
+        self.dock.runtime = RecordingContainerRuntime()
+        self.dock.pool_manager = ContainerPoolManager(self.dock.runtime, WarmPoolSettings(enabled=False))
+        self.reloaded = threading.Event()
+
+    def tearDown(self):
+        self.dock.stop_watching()
+        self.tool_dir.cleanup()
+
+    def _wait_reload(self):
+        self.assertTrue(self.reloaded.wait(timeout=10))
+        self.reloaded.clear()
+
+    def test_reload(self):
+        tool = self.dock.dock_watch(str(self.tool_path), on_reload=lambda _: self.reloaded.set())
+        full_image = f"hyperpocket:{self.dock.runtime.committed[0]}"
+
+        # source only, copied onto the image of the full build.
+        (self.tool_path / "main.py").write_text("print('hello world')")
+        self._wait_reload()
+        self.assertTrue(self.dock.runtime.committed[-1].endswith("-dev"))
+        self.assertEqual(self.dock.runtime.created[-1], (full_image, "true"))
+
+        # pocket.json edits without the build config only re-register the tool.
+        self.pocket_config["tool"]["description"] = "watched and reloaded"
+        (self.tool_path / "pocket.json").write_text(json.dumps(self.pocket_config))
+        self._wait_reload()
+        self.assertEqual(tool.description, "watched and reloaded")
+
+        # dependency changes rebuild the tool.
+        (self.tool_path / "pyproject.toml").write_text('[project]\nname = "watched_tool"\nversion = "0.2.0"\n')
+        self._wait_reload()
+        self.assertFalse(self.dock.runtime.committed[-1].endswith("-dev"))
+        self.assertEqual(self.dock.runtime.created[-1], ("test-watch-base-image", "pip install ."))
+
+        self.assertEqual(tool.func(body={}, envs={}), "")
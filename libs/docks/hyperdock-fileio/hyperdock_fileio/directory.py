@@ -1,9 +1,11 @@
+import contextlib
 import os
 import pathlib
+import re
 import stat
 from datetime import datetime
 
-from chardet import detect
+from hyperdock_fileio.grep import iter_grep_matches
 
 
 def current_working_directory() -> str:
@@ -83,25 +85,47 @@ def find_file_in_directory(
 def grep_recursive_in_directory(
     path: str,
     regex_pattern: str,
+    max_results: int = 1000,
+    max_bytes: int = 1024 * 1024,
+    respect_gitignore: bool = True,
 ) -> str:
     """
-    Recursively search for a string in all files within a directory.
+    Recursively search for a regex pattern in all files within a directory.
+    Binary files, `.git` directories, and files ignored by `.gitignore` are skipped.
+    The search stops as soon as one of the limits is reached.
     :param path: str, The directory to search in.
-    :param regex_pattern: str, The pattern to search for.
+    :param regex_pattern: str, The regex pattern to search for, matched line by line.
+    :param max_results: int, maximum number of matched lines to return
+    :param max_bytes: int, maximum size of the result in bytes
+    :param respect_gitignore: bool, if true, skip files ignored by `.gitignore`
     :return: list of tuple consists with file path, matched line number, and line contents,
     delimited by newline
     """
+    try:
+        pattern = re.compile(regex_pattern.encode("utf-8"), re.MULTILINE)
+    except re.error as e:
+        raise ValueError(f"Invalid regex pattern {regex_pattern}: {e}")
+
     matches = []
-    for root, _, files in os.walk(path):
-        for file in files:
-            file_path = pathlib.Path(root) / file
-            with open(str(file_path), mode="rb") as fp:
-                encoding = detect(fp.read(1024)).get("encoding")
-            try:
-                with open(str(file_path), encoding=encoding, mode="r") as fp:
-                    for line_num, line in enumerate(fp, 1):
-                        if regex_pattern in line:
-                            matches.append(f"{file_path}:{line_num}:{line.strip()}")
-            except UnicodeDecodeError:
-                pass
+    size = 0
+    truncated = False
+    with contextlib.closing(
+        iter_grep_matches(
+            path,
+            pattern,
+            respect_gitignore=respect_gitignore,
+            max_matches_per_file=max_results,
+        )
+    ) as grep_matches:
+        for file_path, line_num, line in grep_matches:
+            match = f"{file_path}:{line_num}:{line}"
+            size += len(match.encode("utf-8")) + 1
+            if len(matches) >= max_results or size > max_bytes:
+                truncated = True
+                break
+            matches.append(match)
+    if truncated:
+        matches.append(
+            f"... more matches are omitted. limits: {max_results} results, {max_bytes} bytes"
+        )
     return "\n".join(matches) if matches else ""
@@ -0,0 +1,226 @@
+import collections
+import concurrent.futures
+import mmap
+import os
+import pathlib
+import re
+import threading
+from typing import Iterator, Optional
+
+# a file with a NUL byte in its first block is considered binary, like `grep -I`.
+BINARY_SNIFF_SIZE = 8192
+
+
+class GitIgnore(object):
+    """
+    Ignore rules of the `.gitignore` files in a directory tree.
+    Paths are relative to the root of the tree, delimited by "/".
+    The last matching rule wins, and rules of a nested `.gitignore` come after its parents'.
+    """
+
+    def __init__(self, rules: Optional[list[tuple[re.Pattern, bool, bool]]] = None):
+        # (pattern, negate, directory only)
+        self.rules = rules or []
+
+    def extend(self, base: str, lines: list[str]) -> "GitIgnore":
+        """
+        Rules of a `.gitignore` file in the directory `base` added to these rules.
+        :param base: str, relative path of the directory of the `.gitignore`, "" for the root
+        :param lines: list[str], lines of the `.gitignore`
+        :return: new GitIgnore
+        """
+        rules = list(self.rules)
+        for line in lines:
+            rule = _parse_rule(base, line)
+            if rule is not None:
+                rules.append(rule)
+        return GitIgnore(rules)
+
+    def ignored(self, relative_path: str, is_dir: bool) -> bool:
+        ignored = False
+        for pattern, negate, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if pattern.fullmatch(relative_path):
+                ignored = not negate
+        return ignored
+
+
+def iter_files(path: str, respect_gitignore: bool = True) -> Iterator[pathlib.Path]:
+    """
+    Regular files in a directory tree, in walk order.
+    `.git` directories, and files ignored by `.gitignore` if respect_gitignore is True, are skipped.
+    """
+    gitignores = {path: GitIgnore()}
+    for root, dirs, files in os.walk(path):
+        gitignore = gitignores.pop(root)
+        relative_root = os.path.relpath(root, path).replace(os.sep, "/")
+        relative_root = "" if relative_root == "." else relative_root + "/"
+        if respect_gitignore and ".gitignore" in files:
+            try:
+                with open(os.path.join(root, ".gitignore"), encoding="utf-8") as fp:
+                    gitignore = gitignore.extend(relative_root, fp.read().splitlines())
+            except (OSError, UnicodeDecodeError):
+                pass
+
+        dirs[:] = sorted(
+            directory
+            for directory in dirs
+            if directory != ".git"
+            and not gitignore.ignored(relative_root + directory, is_dir=True)
+        )
+        for directory in dirs:
+            gitignores[os.path.join(root, directory)] = gitignore
+        for file in sorted(files):
+            if gitignore.ignored(relative_root + file, is_dir=False):
+                continue
+            file_path = pathlib.Path(root) / file
+            if file_path.is_file():
+                yield file_path
+
+
+def iter_grep_matches(
+    path: str,
+    pattern: re.Pattern,
+    respect_gitignore: bool = True,
+    max_matches_per_file: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[tuple[pathlib.Path, int, str]]:
+    """
+    Lines matching a compiled bytes pattern in a directory tree, as (file path, line number, line).
+
+    Files are memory-mapped and searched in a thread pool, and matches are yielded in walk order
+    as soon as the files before them are done. Closing the iterator stops the search.
+    """
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+    stop = threading.Event()
+    pending = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for file_path in iter_files(path, respect_gitignore):
+                pending.append(
+                    executor.submit(
+                        _grep_file, file_path, pattern, max_matches_per_file, stop
+                    )
+                )
+                # files searched ahead of the consumer are bounded.
+                if len(pending) >= max_workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            stop.set()
+            for future in pending:
+                future.cancel()
+
+
+def _grep_file(
+    file_path: pathlib.Path,
+    pattern: re.Pattern,
+    max_matches: Optional[int],
+    stop: threading.Event,
+) -> list[tuple[pathlib.Path, int, str]]:
+    if stop.is_set():
+        return []
+    try:
+        with open(file_path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"\0", 0, BINARY_SNIFF_SIZE) != -1:
+                    return []
+                return _grep_mmap(file_path, mm, pattern, max_matches, stop)
+    except (OSError, ValueError):
+        return []
+
+
+def _grep_mmap(
+    file_path: pathlib.Path,
+    mm: mmap.mmap,
+    pattern: re.Pattern,
+    max_matches: Optional[int],
+    stop: threading.Event,
+) -> list[tuple[pathlib.Path, int, str]]:
+    matches = []
+    line_start = 0
+    # newlines are counted only up to the matched lines, a file without a match isn't copied at all.
+    counted_position, line_num = 0, 1
+    while line_start < len(mm) and not stop.is_set():
+        # a match over the rest of the file only finds the next line that may match,
+        # e.g. "\s" also matches a newline, so the line is searched again on its own.
+        candidate = pattern.search(mm, line_start)
+        if candidate is None:
+            break
+        if (newline := mm.rfind(b"\n", line_start, candidate.start())) != -1:
+            line_start = newline + 1
+        if line_start == len(mm):
+            # past the trailing newline of the file.
+            break
+        line_end = mm.find(b"\n", line_start)
+        if line_end == -1:
+            line_end = len(mm)
+
+        if pattern.search(mm, line_start, line_end) is not None:
+            line_num += mm[counted_position:line_start].count(b"\n")
+            counted_position = line_start
+            line = mm[line_start:line_end].decode("utf-8", errors="replace")
+            matches.append((file_path, line_num, line.strip()))
+            if max_matches is not None and len(matches) >= max_matches:
+                break
+        line_start = line_end + 1
+    return matches
+
+
+def _parse_rule(base: str, line: str) -> Optional[tuple[re.Pattern, bool, bool]]:
+    line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\"):
+        # escaped "#" or "!"
+        line = line[1:]
+    directory_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # a pattern with a "/" other than a trailing one is relative to the `.gitignore`,
+    # otherwise it matches in any depth.
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    regex = re.escape(base) + ("" if anchored else "(?:.*/)?") + _translate(line)
+    return re.compile(regex, re.DOTALL), negate, directory_only
+
+
+def _translate(pattern: str) -> str:
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and (close := pattern.find("]", i + 2)) != -1:
+            chars = pattern[i + 1 : close]
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            regex.append(f"[{chars}]")
+            i = close + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(regex)
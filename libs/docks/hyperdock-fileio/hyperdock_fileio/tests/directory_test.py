@@ -98,3 +98,37 @@ def test_grep_recursive_in_directory():
             assert line == "1"
         else:
             assert False
+
+
+def test_grep_recursive_in_directory_regex():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(f"{tmpdir}/faker.txt", "w") as file:
+            file.write("Galio is Faker's best friend.\n")
+            file.write("Azir is also Faker's best friend.\n")
+        with open(f"{tmpdir}/faker.bin", "wb") as file:
+            file.write(b"Azir\0is binary.\n")
+        grep_result = directory_functions.grep_recursive_in_directory(
+            tmpdir, r"^(Azir|Galio) is"
+        )
+
+    assert grep_result.split("\n") == [
+        f"{tmpdir}/faker.txt:1:Galio is Faker's best friend.",
+        f"{tmpdir}/faker.txt:2:Azir is also Faker's best friend.",
+    ]
+
+
+def test_grep_recursive_in_directory_limits():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(10):
+            with open(f"{tmpdir}/{i}.txt", "w") as file:
+                file.write("Faker\n" * 10)
+        max_results = directory_functions.grep_recursive_in_directory(
+            tmpdir, "Faker", max_results=15
+        )
+        max_bytes = directory_functions.grep_recursive_in_directory(
+            tmpdir, "Faker", max_bytes=100
+        )
+
+    assert len(max_results.split("\n")) == 16
+    assert max_results.split("\n")[-1].startswith("... more matches are omitted.")
+    assert len(max_bytes.split("\n")[:-1]) == 100 // len(f"{tmpdir}/0.txt:1:Faker\n")
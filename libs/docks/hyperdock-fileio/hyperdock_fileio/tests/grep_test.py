@@ -0,0 +1,70 @@
+import os
+import pathlib
+import re
+import tempfile
+
+from hyperdock_fileio.grep import GitIgnore, iter_files, iter_grep_matches
+
+
+def test_gitignore():
+    gitignore = GitIgnore().extend(
+        "", ["# comment", "*.log", "/build", "dist/", "!keep.log", "docs/**/*.tmp"]
+    )
+    gitignore = gitignore.extend("src/", ["generated.py"])
+
+    assert gitignore.ignored("a.log", is_dir=False)
+    assert gitignore.ignored("src/a.log", is_dir=False)
+    assert not gitignore.ignored("keep.log", is_dir=False)
+    assert gitignore.ignored("build", is_dir=True)
+    assert not gitignore.ignored("src/build", is_dir=True)
+    assert gitignore.ignored("src/dist", is_dir=True)
+    assert not gitignore.ignored("dist", is_dir=False)
+    assert gitignore.ignored("docs/a/b/c.tmp", is_dir=False)
+    assert gitignore.ignored("src/lib/generated.py", is_dir=False)
+    assert not gitignore.ignored("generated.py", is_dir=False)
+
+
+def test_iter_files():
+    fileset = [".gitignore", "a.py", "a.log", "build/b.py", ".git/HEAD", "src/c.py"]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for filename in fileset:
+            path = pathlib.Path(tmpdir) / filename
+            os.makedirs(path.parent, exist_ok=True)
+            path.write_text("*.log\nbuild/\n" if filename == ".gitignore" else "")
+        files = [
+            str(file.relative_to(tmpdir)) for file in iter_files(tmpdir, True)
+        ]
+        all_files = [
+            str(file.relative_to(tmpdir)) for file in iter_files(tmpdir, False)
+        ]
+
+    assert files == [".gitignore", "a.py", "src/c.py"]
+    assert all_files == [".gitignore", "a.log", "a.py", "build/b.py", "src/c.py"]
+
+
+def test_iter_grep_matches_stops_on_close():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(100):
+            with open(f"{tmpdir}/{i:03}.txt", "w") as file:
+                file.write("Faker\nBDD\r\nFaker\n")
+        matches = iter_grep_matches(tmpdir, re.compile(b"^B.*$", re.MULTILINE))
+        first = next(matches)
+        matches.close()
+
+    assert first == (pathlib.Path(tmpdir) / "000.txt", 2, "BDD")
+
+
+def test_iter_grep_matches_line_by_line():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(f"{tmpdir}/faker.txt", "w") as file:
+            file.write("x\ny\nxy\n")
+
+        def _grep(regex: bytes) -> list[tuple[int, str]]:
+            pattern = re.compile(regex, re.MULTILINE)
+            return [(line_num, line) for _, line_num, line in iter_grep_matches(tmpdir, pattern)]
+
+        assert _grep(rb"\s") == []
+        assert _grep(rb"[^a]y") == [(3, "xy")]
+        assert _grep(rb"x\ny") == []
+        assert _grep(b"^") == [(1, "x"), (2, "y"), (3, "xy")]
+        assert _grep(b"y$") == [(2, "y"), (3, "xy")]
@@ -6,6 +6,10 @@ import multiprocess
 from langchain.tools import BaseTool
 
 from hyperdock_langchain.dictionary import EnvDict
+from hyperpocket.tool.dock import WorkerPool
+
+# warm workers shared by every langchain tool. tools are imported and constructed once per worker.
+worker_pool = WorkerPool(context=multiprocess, name="hyperdock-langchain")
 
 
 class LangchainToolRequest(object):
@@ -14,6 +18,7 @@ class LangchainToolRequest(object):
     env_dict_extends: dict[str, str]
     auth: Optional[dict[str, Any]]
     tool_vars: dict[str, str]
+    timeout: Optional[float]
 
     def __init__(
         self,
@@ -22,6 +27,7 @@ class LangchainToolRequest(object):
         env_dict_extends: Optional[dict[str, str]] = None,
         auth: Optional[dict[str, Any]] = None,
         tool_vars: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
     ):
         self.tool_type = tool_type
         self.tool_args = {}
@@ -34,6 +40,8 @@ class LangchainToolRequest(object):
         self.tool_vars = {}
         if tool_vars is not None:
             self.tool_vars = tool_vars
+        # seconds to wait for a call. the worker is replaced after a timeout.
+        self.timeout = timeout
 
 
 ToolType = Type[BaseTool] | LangchainToolRequest
@@ -57,23 +65,32 @@ def modify_environment(
     return environ
 
 
-def _run(
-    tool_type: Type[BaseTool],
-    envs: dict[str, str],
-    tool_kwargs: dict[str, Any],
-    pipe: multiprocess.Pipe,
-    **kwargs,
-) -> None:
-    # must be called in a child process
-    for key, value in envs.items():
-        os.environ[key] = value
-    tool = tool_type(**tool_kwargs)
-    config = {}
-    if "config" in kwargs:
-        config = kwargs.pop("config")
-    result = tool.invoke(input=kwargs, config=config)
-    _, conn = pipe
-    conn.send(result)
+class _ToolInvoker(object):
+    """
+    Invokes a langchain tool in a worker process, and is kept there between the calls.
+    Tools usually read their credentials from the environment when constructed, so an instance is built
+    per environment.
+    """
+
+    MAX_INSTANCES = 8
+
+    def __init__(self, tool_type: Type[BaseTool], tool_kwargs: dict[str, Any]):
+        self.tool_type = tool_type
+        self.tool_kwargs = tool_kwargs
+        self._tools: dict[int, BaseTool] = {}
+
+    def __call__(self, **kwargs) -> Any:
+        # must be called in a worker process
+        env_key = hash(frozenset(os.environ.items()))
+        if (tool := self._tools.get(env_key)) is None:
+            if len(self._tools) >= self.MAX_INSTANCES:
+                self._tools.pop(next(iter(self._tools)))
+            tool = self._tools[env_key] = self.tool_type(**self.tool_kwargs)
+        config = {}
+        if "config" in kwargs:
+            config = kwargs.pop("config")
+        return tool.invoke(input=kwargs, config=config)
+
 
 # @moon: will be refactored
 def connect(
@@ -83,6 +100,9 @@ def connect(
     if isinstance(tool_type, type):
         tool_req = LangchainToolRequest(tool_type)
 
+    invoker = _ToolInvoker(tool_req.tool_type, tool_req.tool_args)
+    invoker_key = f"{tool_req.tool_type.__module__}.{tool_req.tool_type.__qualname__}:{id(invoker)}"
+
     def wrapper(**kwargs) -> str:
         try:
             # replacement only happens when user uses pocket native auth
@@ -92,21 +112,10 @@ def connect(
                 )
             else:
                 child_env = os.environ.copy()
-            pipe = multiprocess.Pipe()
-            process = multiprocess.Process(
-                target=_run,
-                args=(tool_req.tool_type, child_env, tool_req.tool_args, pipe),
-                kwargs=kwargs,
+            # a large output is decoded straight from the shared memory, once the tool's result is read.
+            return worker_pool.call(
+                invoker, kwargs=kwargs, key=invoker_key, envs=child_env, timeout=tool_req.timeout, lazy=True
             )
-            process.start()
-            conn, _ = pipe
-            while True:
-                if conn.poll():
-                    result = conn.recv()
-                    break
-            process.terminate()
-            process.join()
-            return result
         except Exception as e:
             return "\n".join(traceback.format_exception(e))
 
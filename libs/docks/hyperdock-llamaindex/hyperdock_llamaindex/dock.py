@@ -2,7 +2,7 @@ import os
 import inspect
 import traceback
 import multiprocess
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Callable, Optional, Tuple, Type, Union, List
 from types import MethodType
 from hyperpocket.tool.function.tool import FunctionTool as PocketFunctionTool
@@ -10,29 +10,26 @@ from hyperpocket.tool.tool import ToolAuth
 from llama_index.core.tools.function_tool import FunctionTool
 from hyperpocket.util.flatten_json_schema import flatten_json_schema
 from hyperpocket.util.function_to_model import function_to_model
-from hyperpocket.tool.dock import Dock
+from hyperpocket.tool.dock import Dock, WorkerPool
 from hyperpocket.config import pocket_logger
 class LlamaIndexDock(Dock):
+    # warm workers shared by every docked tool. a tool is sent to a worker once, and kept there.
+    worker_pool = WorkerPool(context=multiprocess, name="hyperdock-llamaindex")
+
     @staticmethod
     def _run(
         tool_func: FunctionTool,
-        envs: dict[str, str],
-        llamaindex_tool_args: dict[str, Any],
-        pipe: multiprocess.Pipe,
+        llamaindex_tool_args: Optional[dict[str, Any]],
         **kwargs,
-    ) -> None:
-        for key, value in envs.items():
-            os.environ[key] = value
-            
+    ) -> Any:
+        # must be called in a worker process
         merged_args = kwargs.copy()
         for key in kwargs:
-            if key in llamaindex_tool_args:
+            if llamaindex_tool_args and key in llamaindex_tool_args:
                 merged_args[key] = llamaindex_tool_args[key]
         pocket_logger.info(f"Argument overried: {merged_args}")
 
-        result = tool_func(**merged_args)
-        _, conn = pipe
-        conn.send(result)
+        return tool_func(**merged_args)
     
     @classmethod
     def dock_list(
@@ -40,11 +37,12 @@ class LlamaIndexDock(Dock):
         tool_func: List[FunctionTool],
         auth: Optional[dict[str, str]] = None,
         tool_vars: Optional[dict[str, str]] = None,
-        llamaindex_tool_args: Optional[dict[str, str]] = None
+        llamaindex_tool_args: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
     ) -> List[PocketFunctionTool]:
         return [
             cls.dock(
-                tool, auth, tool_vars, llamaindex_tool_args
+                tool, auth, tool_vars, llamaindex_tool_args, timeout
             )
             for tool in tool_func
         ]
@@ -55,13 +53,14 @@ class LlamaIndexDock(Dock):
         tool_func: FunctionTool,
         auth: Optional[dict[str, str]] = None,
         tool_vars: Optional[dict[str, str]] = None,
-        llamaindex_tool_args: Optional[dict[str, str]] = None
+        llamaindex_tool_args: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
     ) -> PocketFunctionTool:
         if isinstance(tool_func, list):
             if isinstance(tool_func[0], list):
                 raise ValueError("Nested list is not supported")
             return cls.dock_list(
-                tool_func, auth, tool_vars, llamaindex_tool_args
+                tool_func, auth, tool_vars, llamaindex_tool_args, timeout
             )
             
         if inspect.ismethod(tool_func):
@@ -69,33 +68,32 @@ class LlamaIndexDock(Dock):
         else:
             original_func = tool_func._fn.__func__
         
+        run = partial(LlamaIndexDock._run, tool_func, llamaindex_tool_args)
+        run_key = f"{original_func.__qualname__}:{id(run)}"
+
         @wraps(original_func)
-        async def wrapper(*args, **kwargs) -> str:
+        def wrapper(*args, **kwargs) -> str:
             try:
-                child_env = os.environ.copy()
-                pipe = multiprocess.Pipe()
-                process = multiprocess.Process(
-                    target=LlamaIndexDock._run,
-                    args=(tool_func, child_env, llamaindex_tool_args, pipe),
-                    kwargs=kwargs,
+                return cls.worker_pool.call(
+                    run, kwargs=kwargs, key=run_key, envs=os.environ.copy(), timeout=timeout, lazy=True
                 )
-                process.start()
-                conn, _ = pipe
-                while True:
-                    if conn.poll():
-                        result = conn.recv()
-                        break
-                process.terminate()
-                process.join()
-                return result
             except Exception as e:
                 return "\n".join(traceback.format_exception(e))
-        
+
+        @wraps(original_func)
+        async def awrapper(*args, **kwargs) -> str:
+            try:
+                return await cls.worker_pool.acall(
+                    run, kwargs=kwargs, key=run_key, envs=os.environ.copy(), timeout=timeout, lazy=True
+                )
+            except Exception as e:
+                return "\n".join(traceback.format_exception(e))
+
         schema = function_to_model(original_func).model_json_schema()                 
         argument_json_schema = flatten_json_schema(schema)
         return PocketFunctionTool(
             func=wrapper,
-            afunc=wrapper,
+            afunc=awrapper,
             name=original_func.__name__,
             description=original_func.__doc__,
             argument_json_schema=argument_json_schema,
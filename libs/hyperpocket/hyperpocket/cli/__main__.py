@@ -2,8 +2,10 @@ import click
 
 from hyperpocket.cli.auth_oauth2 import create_oauth2_auth_template
 from hyperpocket.cli.auth_token import create_token_auth_template
+from hyperpocket.cli.image_gc import gc_images
 from hyperpocket.cli.tool_create import create_tool_template, build_tool
 from hyperpocket.cli.tool_export import export_tool
+from hyperpocket.cli.tool_prebuild import prebuild
 
 
 @click.group()
@@ -22,5 +24,7 @@ devtool.add_command(create_oauth2_auth_template)
 devtool.add_command(create_tool_template)
 devtool.add_command(build_tool)
 devtool.add_command(export_tool)
+devtool.add_command(prebuild)
+devtool.add_command(gc_images)
 
 cli()
@@ -4,11 +4,14 @@ from jinja2 import Template
 def get_tool_main_template() -> Template:
     return Template('''import json
 import os
+import struct
 import sys
 
 from pydantic import BaseModel, Field
 
-token = os.getenv('AUTH_PROVIDER_TOKEN')
+# NOTE: read credentials inside the tool function, the process serves many requests in `--serve` mode.
+
+_FRAME_HEADER = struct.Struct(">I")
 
 
 class {{ capitalized_tool_name }}Request(BaseModel):
@@ -18,6 +21,7 @@ class {{ capitalized_tool_name }}Request(BaseModel):
 def {{ tool_name }}(req: {{ capitalized_tool_name }}Request):
     """
     Example of tool function
+    token = os.getenv('AUTH_PROVIDER_TOKEN')
     response = requests.delete(
         url=f"https://www.googleapis.com/calendar/v3/calendars/{req.calendar_id}/events/{req.event_id}",
         params={
@@ -36,12 +40,49 @@ def {{ tool_name }}(req: {{ capitalized_tool_name }}Request):
     return
 
 
-def main():
-    req = json.load(sys.stdin.buffer)
+def handle(req: dict) -> str:
     req_typed = {{ capitalized_tool_name }}Request.model_validate(req)
     response = {{ tool_name }}(req_typed)
+    return str(response)
+
+
+def serve():
+    """
+    Persistent mode, declared as `entrypoint.serve` in pocket.json.
+    Handles length-prefixed json requests(`{"body": ..., "envs": ...}`) from stdin
+    and writes length-prefixed json responses(`{"result": ...}` or `{"error": ...}`) to stdout.
+    """
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    # keep prints of the tool out of the response stream.
+    sys.stdout = sys.stderr
+    while True:
+        header = stdin.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        req = json.loads(stdin.read(_FRAME_HEADER.unpack(header)[0]))
 
-    print(response)
+        environ = os.environ.copy()
+        os.environ.update(req.get("envs") or {})
+        try:
+            response = {"result": handle(req["body"])}
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+
+        payload = json.dumps(response).encode()
+        stdout.write(_FRAME_HEADER.pack(len(payload)) + payload)
+        stdout.flush()
+
+
+def main():
+    if "--serve" in sys.argv[1:]:
+        serve()
+        return
+
+    req = json.load(sys.stdin.buffer)
+    print(handle(req))
 
 
 if __name__ == '__main__':
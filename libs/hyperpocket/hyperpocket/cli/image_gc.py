@@ -0,0 +1,24 @@
+import click
+
+
+@click.command()
+@click.option("--max-images", type=int, default=None, help="Maximum number of tool images to keep.")
+@click.option("--max-disk-bytes", type=int, default=None, help="Maximum disk usage of tool images.")
+@click.option("--dry-run", is_flag=True, default=False, help="Only print the images to evict.")
+def gc_images(max_images, max_disk_bytes, dry_run):
+    """Evict least recently used tool images over the budget."""
+    try:
+        from hyperdock_container.dock import ContainerDock
+    except ImportError:
+        raise ImportError("You need to install hyperdock-container to collect tool images.")
+
+    lifecycle = ContainerDock.image_lifecycle
+    overrides = {"max_images": max_images, "max_disk_bytes": max_disk_bytes}
+    lifecycle.settings = lifecycle.settings.model_copy(
+        update={key: value for key, value in overrides.items() if value is not None}
+    )
+
+    evicted = lifecycle.collect(dry_run=dry_run)
+    for image_tag in evicted:
+        print(f"{'would evict' if dry_run else 'evicted'} {image_tag}")
+    print(f"{len(evicted)} images {'would be ' if dry_run else ''}evicted.")
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import click
+
+
+@click.command()
+@click.argument("tools", type=str, nargs=-1)
+@click.option("-f", "--tools-file", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="File of tool urls or paths, one per line.")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default="pocket.lock.json",
+              help="Lockfile path.")
+@click.option("--max-workers", type=int, default=8, help="Tools built in parallel.")
+def prebuild(tools, tools_file, output, max_workers):
+    """Build the tools ahead of time and write a lockfile for `Pocket(lockfile=...)`."""
+    try:
+        from hyperdock_container.dock import ContainerDock
+    except ImportError:
+        raise ImportError("You need to install hyperdock-container to prebuild tools.")
+
+    tools = list(tools)
+    if tools_file is not None:
+        for line in Path(tools_file).read_text().splitlines():
+            if (line := line.strip()) and not line.startswith("#"):
+                tools.append(line)
+    if not tools:
+        raise ValueError("No tools to prebuild")
+
+    lockfile = ContainerDock().prebuild(tools, max_workers=max_workers)
+    lockfile.dump(output)
+
+    for tool_lock in lockfile.tools:
+        print(f"{tool_lock.name}: {tool_lock.image_tag} ({tool_lock.git_sha or tool_lock.request_tool_path})")
+    print(f"Wrote {len(lockfile.tools)} tools to {output}")
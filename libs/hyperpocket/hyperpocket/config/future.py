@@ -0,0 +1,52 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class FutureStoreType(Enum):
+    IN_MEMORY = "in_memory"
+    REDIS = "redis"
+
+
+class FutureStoreConfigInMemory(BaseModel):
+    pass
+
+
+class FutureStoreConfigRedis(BaseModel):
+    class Config:
+        extra = "allow"
+
+    host: str = Field(default="localhost")
+    port: int = Field(default=6379)
+    db: int = Field(default=0)
+    key_prefix: str = Field(
+        default="pocket:future", description="prefix of the keys and the channel"
+    )
+    ttl_seconds: int = Field(
+        default=600, description="seconds to keep pending futures and their results"
+    )
+
+
+class FutureStoreConfig(BaseModel):
+    future_store_type: FutureStoreType
+    max_size: Optional[int] = Field(
+        default=10000,
+        description="the maximum number of live futures, the oldest one is evicted when it's full",
+    )
+    ttl_seconds: Optional[int] = Field(
+        default=600, description="seconds until a future is expired"
+    )
+    in_memory: Optional[FutureStoreConfigInMemory] = Field(
+        default_factory=FutureStoreConfigInMemory
+    )
+    redis: Optional[FutureStoreConfigRedis] = Field(
+        default_factory=FutureStoreConfigRedis
+    )
+
+
+DefaultFutureStoreConfig = FutureStoreConfig(
+    future_store_type=FutureStoreType.IN_MEMORY,
+    in_memory=FutureStoreConfigInMemory(),
+    redis=FutureStoreConfigRedis(),
+)
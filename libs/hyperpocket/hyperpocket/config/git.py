@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class GithubConfig(BaseModel):
@@ -11,7 +11,14 @@ class GithubConfig(BaseModel):
 
 
 class GitConfig(BaseModel):
-    github: GithubConfig
+    github: GithubConfig = Field(default_factory=GithubConfig)
+    ref_cache_ttl_seconds: int = Field(
+        default=600, description="seconds until the on-disk git ref cache of a repository is refreshed"
+    )
+    offline: bool = Field(
+        default=False,
+        description="resolve git refs only from the ref cache and local clones, without ls-remote",
+    )
 
 
 DefaultGitConfig = GitConfig(github=GithubConfig())
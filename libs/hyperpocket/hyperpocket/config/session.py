@@ -1,4 +1,5 @@
 from enum import Enum
+from pathlib import Path
 from typing import Optional
 
 from pydantic import BaseModel, Field
@@ -7,6 +8,7 @@ from pydantic import BaseModel, Field
 class SessionType(Enum):
     IN_MEMORY = "in_memory"
     REDIS = "redis"
+    SQLITE = "sqlite"
 
 
 class SessionConfigInMemory(BaseModel):
@@ -20,6 +22,34 @@ class SessionConfigRedis(BaseModel):
     host: str = Field(default="localhost")
     port: int = Field(default=6379)
     db: int = Field(default=0)
+    codec: str = Field(default="json", description="session codec name, json or msgpack")
+    codec_compress_threshold: Optional[int] = Field(
+        default=1024,
+        description="auth context details larger than this size(bytes) are zlib-compressed, None disables compression",
+    )
+
+
+class SessionConfigSqlite(BaseModel):
+    path: str = Field(default=str(Path.home() / ".pocket" / "session.db"))
+    timeout: float = Field(
+        default=5.0, description="seconds to wait for a locked database"
+    )
+    pending_session_ttl_seconds: int = Field(
+        default=300,
+        description="pending sessions older than this are regarded as expired",
+    )
+    session_ttl_seconds: Optional[int] = Field(
+        default=None,
+        description="active sessions older than this are regarded as expired, None keeps them until deleted",
+    )
+    vacuum_interval_seconds: int = Field(
+        default=600, description="interval to delete expired sessions"
+    )
+    codec: str = Field(default="json", description="session codec name, json or msgpack")
+    codec_compress_threshold: Optional[int] = Field(
+        default=1024,
+        description="auth context details larger than this size(bytes) are zlib-compressed, None disables compression",
+    )
 
 
 class SessionConfig(BaseModel):
@@ -28,10 +58,12 @@ class SessionConfig(BaseModel):
         default_factory=SessionConfigInMemory
     )
     redis: Optional[SessionConfigRedis] = Field(default_factory=SessionConfigRedis)
+    sqlite: Optional[SessionConfigSqlite] = Field(default_factory=SessionConfigSqlite)
 
 
 DefaultSessionConfig = SessionConfig(
     session_type=SessionType.IN_MEMORY,
     in_memory=SessionConfigInMemory(),
     redis=SessionConfigRedis(),
+    sqlite=SessionConfigSqlite(),
 )
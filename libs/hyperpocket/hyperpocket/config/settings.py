@@ -5,6 +5,8 @@ from dynaconf import Dynaconf
 from pydantic import BaseModel, Field, Extra
 
 from hyperpocket.config.auth import AuthConfig, DefaultAuthConfig
+from hyperpocket.config.future import DefaultFutureStoreConfig, FutureStoreConfig
+from hyperpocket.config.git import DefaultGitConfig, GitConfig
 from hyperpocket.config.session import DefaultSessionConfig, SessionConfig
 
 POCKET_ROOT = Path.home() / ".pocket"
@@ -26,6 +28,9 @@ toolpkg_path = POCKET_ROOT / "toolpkg"
 if not toolpkg_path.exists():
     os.makedirs(toolpkg_path)
 
+# shared bare clones of tool repositories
+git_store_path = POCKET_ROOT / "git"
+
 settings = Dynaconf(
     envvar_prefix="POCKET",
     settings_files=[settings_path, secret_path],
@@ -46,6 +51,8 @@ class Config(BaseModel):
     log_level: str = "info"
     auth: AuthConfig = DefaultAuthConfig
     session: SessionConfig = DefaultSessionConfig
+    future_store: FutureStoreConfig = DefaultFutureStoreConfig
+    git: GitConfig = DefaultGitConfig
     tool_vars: dict[str, str] = Field(default_factory=dict)
     docks: dict[str, dict] = Field(default_factory=dict)
 
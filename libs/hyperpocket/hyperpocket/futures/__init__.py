@@ -1,7 +1,30 @@
+from hyperpocket.config import config
+from hyperpocket.config.future import FutureStoreType
 from hyperpocket.futures.futurestore import FutureStore as _FutureStore
+from hyperpocket.futures.reaper import ExpiryReaper as _ExpiryReaper
 
-FutureStore = _FutureStore()
+# a single reaper expires both the futures and the pending sessions.
+Reaper = _ExpiryReaper()
+
+
+def _make_future_store() -> _FutureStore:
+    future_store_config = config().future_store
+    kwargs = {
+        "max_size": future_store_config.max_size,
+        "ttl_seconds": future_store_config.ttl_seconds,
+        "reaper": Reaper,
+    }
+    if future_store_config.future_store_type == FutureStoreType.REDIS:
+        from hyperpocket.futures.redis import RedisFutureStore
+
+        return RedisFutureStore(future_store_config.redis, **kwargs)
+
+    return _FutureStore(**kwargs)
+
+
+FutureStore = _make_future_store()
 
 __all__ = [
     "FutureStore",
+    "Reaper",
 ]
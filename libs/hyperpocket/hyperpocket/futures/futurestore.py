@@ -1,53 +1,136 @@
 import asyncio
-from typing import Any
+import threading
+import time
+from typing import Any, Optional
 
 from hyperpocket.config import pocket_logger
+from hyperpocket.futures.reaper import ExpiryReaper
 
 
 class FutureData:
     future: asyncio.Future
     data: dict
+    created_at: float
 
     def __init__(self, future: asyncio.Future, data: dict):
         self.future = future
         self.data = data
+        self.created_at = time.monotonic()
 
 
 class FutureStore(object):
     futures: dict[str, FutureData]
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        reaper: Optional[ExpiryReaper] = None,
+    ):
         self.futures = dict()
+        # the futures are expired on the reaper thread, and resolved on the server threads.
+        self._lock = threading.RLock()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.reaper = reaper
+        self.evicted_total = 0
 
     def create_future(self, uid: str, data: dict = None) -> FutureData:
-        if future := self.get_future(uid) is not None:
-            pocket_logger.info(
-                f"the future already exists. the existing future is returned. uid: {uid}"
-            )
-            return future
         loop = asyncio.get_running_loop()
-        future = loop.create_future()
-        future_data = FutureData(future=future, data=data)
+        with self._lock:
+            if (future := self.futures.get(uid)) is not None:
+                pocket_logger.info(
+                    f"the future already exists. the existing future is returned. uid: {uid}"
+                )
+                return future
+            future = loop.create_future()
+            future_data = FutureData(future=future, data=data)
+
+            if self.max_size is not None:
+                while len(self.futures) >= self.max_size:
+                    # futures are kept in creation order, so the first one is the oldest.
+                    oldest_uid = next(iter(self.futures))
+                    pocket_logger.warning(
+                        f"future store is full. evict the oldest future. uid: {oldest_uid}"
+                    )
+                    self.evicted_total += 1
+                    self.expire_future(oldest_uid, reason="evicted")
 
-        self.futures[uid] = future_data
+            self.futures[uid] = future_data
+        if self.ttl_seconds is not None and self.reaper is not None:
+            self.reaper.schedule(
+                ("future", uid), self.ttl_seconds, lambda: self.expire_future(uid)
+            )
 
         return future_data
 
     def get_future(self, uid: str) -> FutureData:
-        return self.futures.get(uid, None)
+        with self._lock:
+            return self.futures.get(uid, None)
 
     def resolve_future(self, uid: str, value: Any):
-        future_data = self.futures.get(uid)
+        future_data = self.get_future(uid)
         if not future_data:
             raise ValueError(f"Future not found for uid={uid}")
+        self._set_result(future_data, value)
+
+    def delete_future(self, uid: str):
+        with self._lock:
+            self.futures.pop(uid, None)
+        if self.reaper is not None:
+            self.reaper.cancel(("future", uid))
+
+    def expire_future(self, uid: str, reason: str = "expired"):
+        """
+        Delete the future, and fail it with asyncio.TimeoutError if it is still pending.
+        """
+        with self._lock:
+            future_data = self.futures.get(uid)
+            self.delete_future(uid)
+        # wake up the coroutine still awaiting the expired future, like its own auth timeout would.
+        # cancelling it would look like the awaiting task itself was cancelled.
+        if future_data is not None and not future_data.future.done():
+            error = asyncio.TimeoutError(f"the future is {reason}. uid: {uid}")
+            loop = future_data.future.get_loop()
+            if loop.is_running():
+                loop.call_soon_threadsafe(_set_exception_if_not_done, future_data.future, error)
+            else:
+                _set_exception_if_not_done(future_data.future, error)
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: the number of live futures, the number of evicted futures by the size limit,
+            and the metrics of the expiry reaper.
+        """
+        metrics = {
+            "live_futures": len(self.futures),
+            "evicted_total": self.evicted_total,
+        }
+        if self.reaper is not None:
+            metrics.update(self.reaper.metrics())
+        return metrics
+
+    @staticmethod
+    def _set_result(future_data: FutureData, value: Any):
         if not future_data.future.done():
             # if the future loop is running, it should be executed in same event loop
             loop = future_data.future.get_loop()
             if loop.is_running():
-                loop.call_soon_threadsafe(future_data.future.set_result, value)
+                loop.call_soon_threadsafe(_set_result_if_not_done, future_data.future, value)
             # if the future loop is not running, it can be executed from anywhere.
             else:
                 future_data.future.set_result(value)
 
-    def delete_future(self, uid: str):
-        self.futures.pop(uid, None)
+
+def _set_result_if_not_done(future: asyncio.Future, value: Any):
+    # the future can be resolved twice, e.g. by both the local callback and the redis listener.
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception_if_not_done(future: asyncio.Future, error: BaseException):
+    if not future.done():
+        future.set_exception(error)
+        # nobody may be awaiting an expired future, don't log it as a never retrieved exception.
+        future.exception()
@@ -0,0 +1,133 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+from hyperpocket.config import pocket_logger
+
+
+class ExpiryReaper(object):
+    """
+    A single heap-driven timer that runs expiry callbacks, instead of one sleeping task per pending item.
+
+    Callbacks are run on a daemon thread in batches: when the earliest deadline is reached,
+    every entry expiring within `coalesce_seconds` is reaped together.
+    Scheduling an existing key replaces its deadline, cancelled entries are dropped lazily when they're popped.
+    """
+
+    def __init__(
+        self,
+        coalesce_seconds: float = 1.0,
+        max_batch_size: int = 1000,
+        rate_window_seconds: float = 60.0,
+    ):
+        self.coalesce_seconds = coalesce_seconds
+        self.max_batch_size = max_batch_size
+        self.rate_window_seconds = rate_window_seconds
+
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._entries: dict[Hashable, tuple[int, Callable[[], None]]] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._reaped_total = 0
+        self._reaped_history: collections.deque[tuple[float, int]] = collections.deque()
+
+    def schedule(self, key: Hashable, delay_seconds: float, callback: Callable[[], None]):
+        """
+        Schedule the callback to be run after delay_seconds. An existing schedule of the same key is replaced.
+
+        Args:
+            key (Hashable): key of the schedule
+            delay_seconds (float): seconds until the callback is run
+            callback (Callable[[], None]): expiry callback
+        """
+        deadline = time.monotonic() + delay_seconds
+        with self._cond:
+            seq = next(self._seq)
+            self._entries[key] = (seq, callback)
+            heapq.heappush(self._heap, (deadline, seq, key))
+            self._ensure_thread()
+            if self._heap[0][1] == seq:
+                self._cond.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        with self._cond:
+            cancelled = self._entries.pop(key, None) is not None
+            # drop the cancelled entries from the heap, if they take most of it.
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [
+                    item
+                    for item in self._heap
+                    if self._entries.get(item[2], (None,))[0] == item[1]
+                ]
+                heapq.heapify(self._heap)
+            return cancelled
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: the number of scheduled entries, the total number of reaped entries,
+            and the reap rate(entries per second) over the recent window.
+        """
+        with self._cond:
+            self._trim_history(time.monotonic())
+            reaped_recently = sum(count for _, count in self._reaped_history)
+            return {
+                "scheduled": len(self._entries),
+                "reaped_total": self._reaped_total,
+                "reap_rate": reaped_recently / self.rate_window_seconds,
+            }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._wait_batch()
+            for callback in batch:
+                try:
+                    callback()
+                except Exception as e:
+                    pocket_logger.warning(f"failed to run expiry callback. {e}")
+
+    def _wait_batch(self) -> list[Callable[[], None]]:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    break
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(timeout)
+
+            batch = []
+            horizon = now + self.coalesce_seconds
+            while (
+                self._heap
+                and self._heap[0][0] <= horizon
+                and len(batch) < self.max_batch_size
+            ):
+                _, seq, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                # the entry was cancelled or rescheduled.
+                if entry is None or entry[0] != seq:
+                    continue
+                del self._entries[key]
+                batch.append(entry[1])
+
+            if batch:
+                self._reaped_total += len(batch)
+                self._reaped_history.append((now, len(batch)))
+                self._trim_history(now)
+            return batch
+
+    def _trim_history(self, now: float):
+        while (
+            self._reaped_history
+            and now - self._reaped_history[0][0] > self.rate_window_seconds
+        ):
+            self._reaped_history.popleft()
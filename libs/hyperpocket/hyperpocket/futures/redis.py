@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+import redis
+
+from hyperpocket.config import pocket_logger
+from hyperpocket.config.future import FutureStoreConfigRedis
+from hyperpocket.futures.futurestore import FutureData, FutureStore
+from hyperpocket.futures.reaper import ExpiryReaper
+
+# store the result only if the future is pending on some node, and notify the nodes.
+_RESOLVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[2], 'NX')
+redis.call('PUBLISH', ARGV[3], ARGV[4])
+return 1
+"""
+
+
+class RedisFutureStore(FutureStore):
+    """
+    FutureStore shared by multiple pocket replicas.
+
+    Futures are still awaited on the node that created them, but they can be resolved on any node.
+    The resolved value is stored under a keyed result and published to the other nodes.
+    The node awaiting the future wakes on the message, or picks the stored result up when it (re)subscribes late.
+    """
+
+    def __init__(
+        self,
+        config: FutureStoreConfigRedis,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        reaper: Optional[ExpiryReaper] = None,
+    ):
+        super().__init__(max_size=max_size, ttl_seconds=ttl_seconds, reaper=reaper)
+        args = config.model_dump(exclude={"key_prefix", "ttl_seconds"})
+        self.client = redis.StrictRedis(**args)
+        self.key_prefix = config.key_prefix
+        self.key_ttl_seconds = config.ttl_seconds
+        self.channel = f"{self.key_prefix}:resolved"
+        self._resolve_script = self.client.register_script(_RESOLVE_SCRIPT)
+        self._listener: Optional[threading.Thread] = None
+        self._listener_lock = threading.Lock()
+        self._subscribed = threading.Event()
+
+    def create_future(self, uid: str, data: dict = None) -> FutureData:
+        future_data = super().create_future(uid, data)
+        self.client.set(self._pending_key(uid), 1, ex=self.key_ttl_seconds)
+        self._ensure_listener()
+
+        # the result could be resolved before this node subscribed.
+        self.sync([uid])
+        return future_data
+
+    def resolve_future(self, uid: str, value: Any):
+        resolved = self._resolve_script(
+            keys=[self._pending_key(uid), self._result_key(uid)],
+            args=[json.dumps(value), self.key_ttl_seconds, self.channel, uid],
+        )
+        if not resolved:
+            raise ValueError(f"Future not found for uid={uid}")
+
+        # the future created on this node doesn't need to wait for the message.
+        if (future_data := self.get_future(uid)) is not None:
+            self._set_result(future_data, value)
+
+    def delete_future(self, uid: str):
+        super().delete_future(uid)
+        self.client.delete(self._pending_key(uid), self._result_key(uid))
+
+    def sync(self, uids: Optional[Iterable[str]] = None):
+        """
+        Resolve the local pending futures whose results are already stored.
+
+        Args:
+            uids (Optional[Iterable[str]]): future uids to check, all local pending futures if None
+        """
+        if uids is None:
+            with self._lock:
+                uids = list(self.futures)
+
+        pending = []
+        for uid in uids:
+            future_data = self.get_future(uid)
+            if future_data is not None and not future_data.future.done():
+                pending.append((uid, future_data))
+        if not pending:
+            return
+
+        results = self.client.mget([self._result_key(uid) for uid, _ in pending])
+        for (uid, future_data), raw in zip(pending, results):
+            if raw is not None:
+                self._set_result(future_data, json.loads(raw))
+
+    def wait_subscribed(self, timeout: Optional[float] = None) -> bool:
+        return self._subscribed.wait(timeout)
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                with self.client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    pubsub.subscribe(self.channel)
+                    self._subscribed.set()
+                    # catch up the results published while (re)subscribing.
+                    self.sync()
+                    for message in pubsub.listen():
+                        uid = message["data"]
+                        if isinstance(uid, bytes):
+                            uid = uid.decode()
+                        self.sync([uid])
+            except redis.ConnectionError as e:
+                self._subscribed.clear()
+                pocket_logger.warning(
+                    f"future store lost redis subscription. retry subscribing. {e}"
+                )
+                time.sleep(1)
+
+    def _pending_key(self, uid: str) -> str:
+        return f"{self.key_prefix}:{uid}:pending"
+
+    def _result_key(self, uid: str) -> str:
+        return f"{self.key_prefix}:{uid}:result"
@@ -7,11 +7,14 @@ from hyperpocket.auth import PREBUILT_AUTH_HANDLERS, AuthProvider
 from hyperpocket.auth.context import AuthContext
 from hyperpocket.auth.handler import AuthenticateRequest, AuthHandlerInterface
 from hyperpocket.config import config, pocket_logger
-from hyperpocket.futures import FutureStore
+from hyperpocket.futures import FutureStore, Reaper
 from hyperpocket.session import SESSION_STORAGE_LIST
 from hyperpocket.session.interface import BaseSessionValue, SessionStorageInterface
 
 
+PENDING_SESSION_TIMEOUT_SECONDS = 300
+
+
 class AuthState(enum.Enum):
     SKIP_AUTH = "skip_auth"
     DO_AUTH = "do_auth"
@@ -189,42 +192,34 @@ class PocketAuth(object):
 
         handler = self.find_handler_instance(auth_handler_name, auth_provider)
         scope = handler.recommended_scopes().union(auth_req.auth_scopes)
-        session = self.session_storage.get(handler.provider(), thread_id, profile)
-        if session:
-            scope = scope.union(session.auth_scopes)
 
-        modified_req = auth_req.model_copy(update={"auth_scopes": scope})
+        # the storage keeps the uid of an existing pending session and merges its scopes,
+        # in case of requesting new scopes before session pending resolved.
+        new_future_uid = str(uuid.uuid4())
+        session = self._upsert_pending_session(
+            auth_handler=handler,
+            future_uid=new_future_uid,
+            profile=profile,
+            thread_id=thread_id,
+            scope=scope,
+        )
+        future_uid = session.auth_resolve_uid
+        modified_req = auth_req.model_copy(update={"auth_scopes": session.auth_scopes})
 
-        # session in pending
-        if session and session.auth_resolve_uid:
+        if future_uid != new_future_uid:  # session in pending
             pocket_logger.debug(
-                f"[thread_id({thread_id}):profile({profile})] already exists pending session(auth_resolve_uid:{session.auth_resolve_uid})."
-            )
-            future_uid = session.auth_resolve_uid
-
-            # update session, in case of requesting new scopes before session pending resolved.
-            self._upsert_pending_session(
-                auth_handler=handler,
-                future_uid=session.auth_resolve_uid,
-                profile=profile,
-                thread_id=thread_id,
-                scope=scope,
+                f"[thread_id({thread_id}):profile({profile})] already exists pending session(auth_resolve_uid:{future_uid})."
             )
-        else:  # create new pending session
-            future_uid = str(uuid.uuid4())
-            self._upsert_pending_session(
-                auth_handler=handler,
-                future_uid=future_uid,
-                profile=profile,
-                thread_id=thread_id,
-                scope=scope,
-            )
-
+        else:  # new pending session
             pocket_logger.debug(
                 f"[thread_id({thread_id}):profile({profile})] create new pending session(auth_resolve_uid:{future_uid})."
             )
-            asyncio.create_task(
-                self._check_session_pending_resolved(handler, thread_id, profile)
+            Reaper.schedule(
+                ("pending_session", future_uid),
+                PENDING_SESSION_TIMEOUT_SECONDS,
+                lambda: self._expire_pending_session(
+                    handler, thread_id, profile, future_uid
+                ),
             )
 
         prepare_url = handler.prepare(
@@ -289,7 +284,8 @@ class PocketAuth(object):
         )
         try:
             if auth_state == AuthState.SKIP_AUTH:
-                context = session.auth_context
+                # the session is already active with this context.
+                return session.auth_context
             elif auth_state == AuthState.DO_REFRESH:
                 try:
                     context = await asyncio.wait_for(
@@ -299,7 +295,9 @@ class PocketAuth(object):
                         timeout=300,
                     )
                 except Exception as e:
-                    self.session_storage.delete(handler.provider(), thread_id, profile)
+                    self.session_storage.delete_if_resolve_uid_matches(
+                        handler.provider(), thread_id, profile, session.auth_resolve_uid
+                    )
                     FutureStore.delete_future(session.auth_resolve_uid)
 
                     pocket_logger.warning(
@@ -328,17 +326,29 @@ class PocketAuth(object):
                     f"[thread_id({thread_id}):profile({profile})] Invalid State. 'authenticate' cannot be reached while in state {auth_state}"
                 )
 
-            session = await self._set_session_active(
+            active_session = await self._set_session_active(
                 context=context,
                 provider=handler.provider(),
                 profile=profile,
                 thread_id=thread_id,
+                session=session,
             )
+            if active_session is None:
+                # another caller awaiting the same pending session may have activated it first.
+                active_session = self.session_storage.get(
+                    handler.provider(), thread_id, profile
+                )
+            if active_session is None or active_session.auth_resolve_uid is not None:
+                raise RuntimeError(
+                    f"[thread_id({thread_id}):profile({profile})] the session has been changed while authenticating. Please re-authenticate."
+                )
 
-            return session.auth_context
+            return active_session.auth_context
         except asyncio.TimeoutError as e:
             pocket_logger.warning(f"Authentication Timeout. {session.auth_resolve_uid}")
-            self.delete_session(handler.provider(), thread_id, profile)
+            self.session_storage.delete_if_resolve_uid_matches(
+                handler.provider(), thread_id, profile, session.auth_resolve_uid
+            )
             FutureStore.delete_future(session.auth_resolve_uid)
             raise e
 
@@ -394,26 +404,23 @@ class PocketAuth(object):
                     return handler
         raise ValueError("No handler found")
 
-    async def _check_session_pending_resolved(
+    def _expire_pending_session(
         self,
         auth_handler: AuthHandlerInterface,
-        thread_id: str = "default",
-        profile: str = "default",
-        timeout_seconds=300,
+        thread_id: str,
+        profile: str,
+        future_uid: str,
         **kwargs,
     ):
-        await asyncio.sleep(timeout_seconds)
-        session = self.session_storage.get(
-            auth_handler.provider(), thread_id, profile, **kwargs
-        )
-        if session.auth_resolve_uid is not None:
+        # only the session still pending on the same uid is removed.
+        if self.session_storage.delete_if_resolve_uid_matches(
+            auth_handler.provider(), thread_id, profile, future_uid, **kwargs
+        ):
             pocket_logger.info(
-                f"session({session.auth_resolve_uid}) is not resolved yet and timeout. remove session"
+                f"session({future_uid}) is not resolved yet and timeout. remove session"
             )
-            self.delete_session(auth_handler.provider(), thread_id, profile)
-            FutureStore.delete_future(session.auth_resolve_uid)
-
-        return
+        # the coroutine awaiting the session's future fails with timeout instead of waiting forever.
+        FutureStore.expire_future(future_uid)
 
     def _upsert_pending_session(
         self,
@@ -423,31 +430,38 @@ class PocketAuth(object):
         thread_id: str,
         scope: set[str],
     ):
-        return self.session_storage.set(
+        return self.session_storage.upsert_pending(
             auth_provider=auth_handler.provider(),
             thread_id=thread_id,
             profile=profile,
             auth_scopes=list(scope),
-            auth_context=None,
             is_auth_scope_universal=auth_handler.scoped,
             auth_resolve_uid=future_uid,
         )
 
     async def _set_session_active(
-        self, context: AuthContext, provider: AuthProvider, profile: str, thread_id: str
+        self,
+        context: AuthContext,
+        provider: AuthProvider,
+        profile: str,
+        thread_id: str,
+        session: Optional[BaseSessionValue] = None,
     ):
-        session = self.session_storage.get(provider, thread_id, profile)
+        if session is None:
+            session = self.session_storage.get(provider, thread_id, profile)
         if session is None:
             pocket_logger.error("the session to be active doesn't exist.")
             return None
 
-        active_session = self.session_storage.set(
+        if session.auth_resolve_uid is not None:
+            Reaper.cancel(("pending_session", session.auth_resolve_uid))
+
+        # it's activated only if the session is still in the state it was read.
+        return self.session_storage.activate(
             auth_provider=provider,
             thread_id=thread_id,
             profile=profile,
-            auth_scopes=list(session.auth_scopes),
-            is_auth_scope_universal=session.scoped,
-            auth_resolve_uid=None,
+            auth_resolve_uid=session.auth_resolve_uid,
             auth_context=context,
+            is_auth_scope_universal=session.scoped,
         )
-        return active_session
@@ -1,5 +1,5 @@
 import asyncio
-import concurrent.futures
+import pathlib
 from threading import Lock
 from typing import Any, List, Union, Callable, Optional
 
@@ -8,7 +8,7 @@ from hyperpocket.config import pocket_logger
 from hyperpocket.pocket_auth import PocketAuth
 from hyperpocket.server.server import PocketServer
 from hyperpocket.tool import Tool, from_func
-from hyperpocket.tool.dock import Dock
+from hyperpocket.tool.dock import Dock, LoadProgress, ToolLoader
 from hyperpocket.tool_like import ToolLike
 
 
@@ -35,6 +35,8 @@ class Pocket(object):
         tools: list[ToolLike] = None,
         auth: PocketAuth = None,
         use_profile: bool = False,
+        lockfile: Union[str, pathlib.Path] = None,
+        on_load_progress: Callable[[LoadProgress], None] = None,
     ):
         try:
             if auth is None:
@@ -46,8 +48,11 @@ class Pocket(object):
             self.use_profile = use_profile
             self.server = PocketServer.get_instance()
             self.tools = {}
+            self._dock = None
 
-            self.load_tools(tools)
+            if lockfile is not None:
+                self.load_lockfile(lockfile)
+            self.load_tools(tools, on_progress=on_load_progress)
             pocket_logger.info(
                 f"All Registered Tools Loaded successfully. total registered tools : {len(self.tools)}"
             )
@@ -472,24 +477,63 @@ class Pocket(object):
                 tool_by_provider[auth_provider_name] = [tool]
         return tool_by_provider
 
-    def load_tools(self, tools: Union[List[ToolLike], ToolLike]) -> List[Tool]:
+    def load_tools(
+        self,
+        tools: Union[List[ToolLike], ToolLike],
+        on_progress: Callable[[LoadProgress], None] = None,
+    ) -> List[Tool]:
         """
         Load a list of tools into the pocket.
 
         This method takes a list of tool identifiers(tool like) and loads them into the
-        pocket for use.
+        pocket for use. Docked tools are loaded through the pipeline stages of the dock,
+        and the tools are registered in the given order.
 
         Args:
             tools (Union[List[ToolLike], ToolLike]): A list of tool identifiers to be loaded.
+            on_progress (Callable[[LoadProgress], None]): called when a tool starts or finishes a loading stage.
         """
         if not isinstance(tools, list):
             tools = [tools]
 
-        loaded_tools = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix="tool-loader") as executor:
-            futures = [executor.submit(self._load_tool, tool_like) for tool_like in tools]
-            loaded_tools = [future.result() for future in concurrent.futures.as_completed(futures)]
+        loaded_tools: list[Optional[Tool]] = [None] * len(tools)
+        dock_indexes = [idx for idx, tool_like in enumerate(tools) if isinstance(tool_like, (str, tuple))]
+        if dock_indexes:
+            loader = ToolLoader(self.dock.load_stages(), on_progress=on_progress)
+            docked_tools = loader.load([tools[idx] for idx in dock_indexes])
+            for idx, tool in zip(dock_indexes, docked_tools):
+                loaded_tools[idx] = tool
+
+        for idx, tool_like in enumerate(tools):
+            if loaded_tools[idx] is None:
+                loaded_tools[idx] = self._load_tool(tool_like)
+
+        for tool in loaded_tools:
+            if tool.name in self.tools:
+                raise RuntimeError(f"{tool.name} already exists. duplicated tool name.")
+            self.tools[tool.name] = tool
+
+        return loaded_tools
 
+    @property
+    def dock(self) -> Dock:
+        """
+        The dock of the pocket, created once on first use.
+        """
+        if getattr(self, "_dock", None) is None:
+            self._dock = self._default_dock()
+        return self._dock
+
+    def load_lockfile(self, lockfile: Union[str, pathlib.Path]) -> List[Tool]:
+        """
+        Load prebuilt tools of a lockfile, made by `hyperpocket devtool prebuild`.
+
+        The tools are registered from the lockfile, without resolving git refs, building images or reading pocket.json.
+
+        Args:
+            lockfile (Union[str, pathlib.Path]): lockfile path
+        """
+        loaded_tools = self.dock.dock_lockfile(lockfile)
         for tool in loaded_tools:
             if tool.name in self.tools:
                 raise RuntimeError(f"{tool.name} already exists. duplicated tool name.")
@@ -499,8 +543,7 @@ class Pocket(object):
 
     def _load_tool(self, tool_like) -> Tool:
         if isinstance(tool_like, str) or isinstance(tool_like, tuple):
-            dock = self._default_dock()
-            return dock(tool_like)
+            return self.dock(tool_like)
         elif isinstance(tool_like, Tool):
             return tool_like
         elif isinstance(tool_like, Callable):
@@ -0,0 +1,307 @@
+import functools
+import importlib
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from hyperpocket.auth import AUTH_CONTEXT_MAP
+from hyperpocket.session.interface import BaseSessionValue
+
+SESSION_CODEC_VERSION = 1
+
+_HEADER = struct.Struct(">BBBI")  # version, codec id, flags, envelope length
+_FLAG_DETAIL_COMPRESSED = 0x01
+_LEGACY_JSON_PREFIX = b"{"[0]
+
+
+class LazySessionDetail(object):
+    """
+    Proxy for `AuthContext.detail` that keeps the encoded payload until it's actually read.
+
+    Most session reads only need the access token, so the (possibly large) provider response stored in `detail`
+    is decoded and turned back into its pydantic model on first access.
+    """
+
+    __slots__ = ("_codec", "_raw", "_compressed", "_type_ref", "_value", "_loaded")
+
+    def __init__(
+        self,
+        codec: "SessionCodec",
+        raw: bytes,
+        compressed: bool,
+        type_ref: Optional[str],
+    ):
+        self._codec = codec
+        self._raw = raw
+        self._compressed = compressed
+        self._type_ref = type_ref
+        self._value = None
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def value(self) -> Any:
+        if not self._loaded:
+            raw = zlib.decompress(self._raw) if self._compressed else self._raw
+            value = self._codec.loads(raw)
+            if self._type_ref is not None:
+                value = _resolve_detail_type(self._type_ref).model_validate(value)
+            self._value = value
+            self._loaded = True
+            self._raw = None
+        return self._value
+
+    def __getattr__(self, item):
+        return getattr(self.value, item)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, LazySessionDetail):
+            other = other.value
+        return self.value == other
+
+    def __repr__(self):
+        if not self._loaded:
+            return f"LazySessionDetail(type={self._type_ref}, loaded=False)"
+        return repr(self._value)
+
+
+class SessionCodec(ABC):
+    """
+    Binary session codec.
+
+    Every encoded session is framed as `[version][codec id][flags][envelope length][envelope][detail]`.
+    The envelope holds the session fields and the auth context without its `detail`, the detail is encoded
+    separately so it can be zlib-compressed and decoded lazily.
+    Sessions written by the previous plain-json serializer are still readable.
+    """
+
+    name: str
+    codec_id: int
+
+    def __init__(self, compress_threshold: Optional[int] = 1024):
+        self.compress_threshold = compress_threshold
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, raw: bytes) -> Any:
+        raise NotImplementedError
+
+    def encode(self, session: BaseSessionValue) -> bytes:
+        context_type, context_value, detail_type = None, None, None
+        detail_raw, flags = b"", 0
+
+        auth_context = session.auth_context
+        if auth_context is not None:
+            context_type = auth_context.__class__.__name__
+            context_value = auth_context.model_dump(mode="json", exclude={"detail"})
+            detail_type, detail_raw, compressed = self._encode_detail(
+                auth_context.detail
+            )
+            if compressed:
+                flags |= _FLAG_DETAIL_COMPRESSED
+
+        auth_scopes = session.auth_scopes
+        if auth_scopes is not None:
+            auth_scopes = list(auth_scopes)
+
+        envelope = self.dumps(
+            [
+                session.auth_provider_name,
+                session.scoped,
+                auth_scopes,
+                session.auth_resolve_uid,
+                context_type,
+                context_value,
+                detail_type,
+            ]
+        )
+
+        header = _HEADER.pack(SESSION_CODEC_VERSION, self.codec_id, flags, len(envelope))
+        return b"".join((header, envelope, detail_raw))
+
+    def decode(self, raw: bytes) -> BaseSessionValue:
+        if isinstance(raw, str):
+            raw = raw.encode()
+        if raw[0] == _LEGACY_JSON_PREFIX:
+            return _decode_legacy_json(raw)
+
+        version, codec_id, flags, envelope_length = _HEADER.unpack_from(raw)
+        if version != SESSION_CODEC_VERSION:
+            raise ValueError(f"Not supported session codec version({version})")
+
+        # sessions can be written by a node configured with another codec.
+        codec = self if codec_id == self.codec_id else _codec_by_id(codec_id)
+        offset = _HEADER.size
+        envelope = codec.loads(raw[offset : offset + envelope_length])
+        (
+            auth_provider_name,
+            scoped,
+            auth_scopes,
+            auth_resolve_uid,
+            context_type,
+            context_value,
+            detail_type,
+        ) = envelope
+
+        auth_context = None
+        if context_type is not None:
+            detail_raw = bytes(raw[offset + envelope_length :])
+            detail = None
+            if detail_raw:
+                detail = LazySessionDetail(
+                    codec=codec,
+                    raw=detail_raw,
+                    compressed=bool(flags & _FLAG_DETAIL_COMPRESSED),
+                    type_ref=detail_type,
+                )
+            auth_context = AUTH_CONTEXT_MAP[context_type](
+                **context_value, detail=detail
+            )
+
+        if auth_scopes is not None:
+            auth_scopes = set(auth_scopes)
+
+        return BaseSessionValue(
+            auth_provider_name=auth_provider_name,
+            auth_scopes=auth_scopes,
+            auth_resolve_uid=auth_resolve_uid,
+            scoped=scoped,
+            auth_context=auth_context,
+        )
+
+    def _encode_detail(self, detail: Any) -> tuple[Optional[str], bytes, bool]:
+        if detail is None:
+            return None, b"", False
+
+        # an untouched lazy detail is written back as it is, without decoding it.
+        if isinstance(detail, LazySessionDetail):
+            if not detail.loaded and detail._codec.codec_id == self.codec_id:
+                return detail._type_ref, detail._raw, detail._compressed
+            detail = detail.value
+
+        detail_type = None
+        if isinstance(detail, BaseModel):
+            detail_type = f"{detail.__class__.__module__}:{detail.__class__.__qualname__}"
+
+        detail_raw = self.dumps(to_jsonable_python(detail))
+        if self.compress_threshold is not None and len(detail_raw) > self.compress_threshold:
+            return detail_type, zlib.compress(detail_raw), True
+
+        return detail_type, detail_raw, False
+
+
+class JsonSessionCodec(SessionCodec):
+    name = "json"
+    codec_id = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+
+class MsgpackSessionCodec(SessionCodec):
+    name = "msgpack"
+    codec_id = 2
+
+    def __init__(self, compress_threshold: Optional[int] = 1024):
+        super().__init__(compress_threshold=compress_threshold)
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("You need to install msgpack to use msgpack session codec.")
+        self._msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, raw: bytes) -> Any:
+        return self._msgpack.unpackb(raw, raw=False)
+
+
+SESSION_CODECS: dict[str, type[SessionCodec]] = {
+    JsonSessionCodec.name: JsonSessionCodec,
+    MsgpackSessionCodec.name: MsgpackSessionCodec,
+}
+
+
+def get_session_codec(
+    name: str = JsonSessionCodec.name, compress_threshold: Optional[int] = 1024
+) -> SessionCodec:
+    codec_type = SESSION_CODECS.get(name)
+    if codec_type is None:
+        raise ValueError(f"Not supported session codec({name})")
+
+    return codec_type(compress_threshold=compress_threshold)
+
+
+@functools.lru_cache(maxsize=None)
+def _codec_by_id(codec_id: int) -> SessionCodec:
+    for codec_type in SESSION_CODECS.values():
+        if codec_type.codec_id == codec_id:
+            return codec_type()
+
+    raise ValueError(f"Not supported session codec id({codec_id})")
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_detail_type(type_ref: str) -> type[BaseModel]:
+    module_name, qualname = type_ref.split(":", 1)
+    detail_type = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        detail_type = getattr(detail_type, attr)
+
+    if not (isinstance(detail_type, type) and issubclass(detail_type, BaseModel)):
+        raise ValueError(f"Session detail type({type_ref}) is not a pydantic model")
+
+    return detail_type
+
+
+def _decode_legacy_json(raw: bytes) -> BaseSessionValue:
+    session_dict = json.loads(raw)
+
+    auth_context = None
+    if auth_context_type_key := session_dict["auth_context_type"]:
+        auth_context_type = AUTH_CONTEXT_MAP[auth_context_type_key]
+        auth_context_value = session_dict["auth_context_value"]
+
+        auth_context = auth_context_type(**auth_context_value)
+
+    auth_scopes = session_dict["auth_scopes"]
+    if auth_scopes:
+        auth_scopes = set(auth_scopes)
+
+    return BaseSessionValue(
+        auth_provider_name=session_dict["auth_provider_name"],
+        auth_scopes=auth_scopes,
+        auth_resolve_uid=session_dict["auth_resolve_uid"],
+        scoped=session_dict["scoped"],
+        auth_context=auth_context,
+    )
@@ -144,6 +144,122 @@ class SessionStorageInterface(ABC, Generic[K, V]):
         """
         raise NotImplementedError
 
+    def upsert_pending(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_scopes: List[str],
+        auth_resolve_uid: str,
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> V:
+        """
+        Upsert pending session.
+        If a pending session already exists, its auth_resolve_uid is kept, otherwise the given auth_resolve_uid is used.
+        The auth scopes are merged with the scopes of the existing session.
+
+        Storages shared by multiple nodes should override this method to make it atomic.
+
+        Args:
+            auth_provider (AuthProvider): auth provider
+            thread_id (str): thread id
+            profile (str): profile name
+            auth_scopes (List[str]): auth scopes to be merged
+            auth_resolve_uid (str): auth resolve uid used when a pending session doesn't exist
+            is_auth_scope_universal(bool): a flag to determine whether the session is scoped or not
+
+        Returns:
+            V(BaseSessionValue): Upserted pending session
+        """
+        session = self.get(auth_provider, thread_id, profile, **kwargs)
+        scopes = set(auth_scopes)
+        if session is not None:
+            scopes = session.make_superset_auth_scope(scopes)
+            if session.auth_resolve_uid is not None:
+                auth_resolve_uid = session.auth_resolve_uid
+
+        return self.set(
+            auth_provider=auth_provider,
+            thread_id=thread_id,
+            profile=profile,
+            auth_scopes=list(scopes),
+            auth_resolve_uid=auth_resolve_uid,
+            auth_context=None,
+            is_auth_scope_universal=is_auth_scope_universal,
+            **kwargs,
+        )
+
+    def activate(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_resolve_uid: Optional[str],
+        auth_context: AuthContext,
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> Optional[V]:
+        """
+        Make session active with the auth context, only if the session's auth_resolve_uid matches the given one.
+        Pass auth_resolve_uid as None to update the auth context of an already active session.
+
+        Storages shared by multiple nodes should override this method to make it atomic.
+
+        Args:
+            auth_provider (AuthProvider): auth provider
+            thread_id (str): thread id
+            profile (str): profile name
+            auth_resolve_uid (Optional[str]): expected auth resolve uid of the session
+            auth_context (AuthContext): authentication context of the active session
+            is_auth_scope_universal(bool): a flag to determine whether the session is scoped or not
+
+        Returns:
+            Optional[V(BaseSessionValue)]: Active session, None if the session doesn't exist or doesn't match
+        """
+        session = self.get(auth_provider, thread_id, profile, **kwargs)
+        if session is None or session.auth_resolve_uid != auth_resolve_uid:
+            return None
+
+        return self.set(
+            auth_provider=auth_provider,
+            thread_id=thread_id,
+            profile=profile,
+            auth_scopes=list(session.auth_scopes or []),
+            auth_resolve_uid=None,
+            auth_context=auth_context,
+            is_auth_scope_universal=is_auth_scope_universal,
+            **kwargs,
+        )
+
+    def delete_if_resolve_uid_matches(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_resolve_uid: Optional[str],
+        **kwargs,
+    ) -> bool:
+        """
+        Delete session, only if the session's auth_resolve_uid matches the given one.
+
+        Storages shared by multiple nodes should override this method to make it atomic.
+
+        Args:
+            auth_provider (AuthProvider): auth provider
+            thread_id (str): thread id
+            profile (str): profile name
+            auth_resolve_uid (Optional[str]): expected auth resolve uid of the session, None for an active session
+
+        Returns:
+            bool: True if the session was deleted, False otherwise
+        """
+        session = self.get(auth_provider, thread_id, profile, **kwargs)
+        if session is None or session.auth_resolve_uid != auth_resolve_uid:
+            return False
+
+        return self.delete(auth_provider, thread_id, profile, **kwargs)
+
     @classmethod
     @abstractmethod
     def session_storage_type(cls) -> SessionType:
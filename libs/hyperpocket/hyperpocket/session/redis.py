@@ -3,9 +3,10 @@ from typing import Any, List, Optional
 
 import redis
 
-from hyperpocket.auth import AUTH_CONTEXT_MAP, AuthProvider
+from hyperpocket.auth import AuthProvider
 from hyperpocket.auth.context import AuthContext
 from hyperpocket.config.session import SessionConfigRedis, SessionType
+from hyperpocket.session.codec import SessionCodec, get_session_codec
 from hyperpocket.session.interface import (
     SESSION_KEY_DELIMITER,
     BaseSessionValue,
@@ -17,12 +18,58 @@ from hyperpocket.session.interface import (
 RedisSessionKey = str
 RedisSessionValue = BaseSessionValue
 
+# A session is stored as a hash of the encoded session(value), the pending auth resolve uid(uid) and the auth scopes(scopes).
+# uid and scopes are kept out of the encoded session, so that the scripts below can compare and merge them on the server.
+_UPSERT_PENDING_SCRIPT = """
+local current = redis.call('HMGET', KEYS[1], 'uid', 'scopes')
+local uid = current[1] or ARGV[1]
+local scopes, seen = {}, {}
+local function merge(list)
+    for _, scope in ipairs(list) do
+        if not seen[scope] then
+            seen[scope] = true
+            scopes[#scopes + 1] = scope
+        end
+    end
+end
+if current[2] then merge(cjson.decode(current[2])) end
+merge(cjson.decode(ARGV[3]))
+local encoded = '[]'
+if #scopes > 0 then encoded = cjson.encode(scopes) end
+redis.call('HSET', KEYS[1], 'value', ARGV[2], 'uid', uid, 'scopes', encoded)
+return {uid, encoded}
+"""
+_ACTIVATE_SCRIPT = """
+local current = redis.call('HMGET', KEYS[1], 'value', 'uid', 'scopes')
+if not current[1] or (current[2] or '') ~= ARGV[1] then return false end
+redis.call('HSET', KEYS[1], 'value', ARGV[2])
+redis.call('HDEL', KEYS[1], 'uid')
+return current[3] or '[]'
+"""
+_DELETE_IF_UID_MATCHES_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 and (redis.call('HGET', KEYS[1], 'uid') or '') == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_SESSION_FIELDS = ("value", "uid", "scopes")
+
 
 class RedisSessionStorage(SessionStorageInterface[RedisSessionKey, RedisSessionValue]):
     def __init__(self, config: SessionConfigRedis):
         super().__init__()
-        args = config.model_dump()
+        args = config.model_dump(exclude={"codec", "codec_compress_threshold"})
         self.client = redis.StrictRedis(**args)
+        self.codec: SessionCodec = get_session_codec(
+            config.codec, compress_threshold=config.codec_compress_threshold
+        )
+        self._upsert_pending_script = self.client.register_script(
+            _UPSERT_PENDING_SCRIPT
+        )
+        self._activate_script = self.client.register_script(_ACTIVATE_SCRIPT)
+        self._delete_if_uid_matches_script = self.client.register_script(
+            _DELETE_IF_UID_MATCHES_SCRIPT
+        )
 
     @classmethod
     def session_storage_type(cls) -> SessionType:
@@ -32,12 +79,12 @@ class RedisSessionStorage(SessionStorageInterface[RedisSessionKey, RedisSessionV
         self, auth_provider: AuthProvider, thread_id: str, profile: str, **kwargs
     ) -> Optional[V]:
         key = self._make_session_key(auth_provider.name, thread_id, profile)
-        raw_session: Any = self.client.get(key)
-        if raw_session is None:
-            return None
+        try:
+            fields = self.client.hmget(key, *_SESSION_FIELDS)
+        except redis.ResponseError:
+            return self._get_legacy(key)
 
-        session = self._deserialize(raw_session)
-        return session
+        return self._deserialize_fields(fields)
 
     def get_by_thread_id(
         self, thread_id: str, auth_provider: Optional[AuthProvider] = None, **kwargs
@@ -58,10 +105,19 @@ class RedisSessionStorage(SessionStorageInterface[RedisSessionKey, RedisSessionV
 
         with self.client.pipeline() as pipe:
             for key in key_list:
-                pipe.get(key)
+                pipe.hmget(key, *_SESSION_FIELDS)
+
+            raw_sessions = pipe.execute(raise_on_error=False)
 
-            raw_sessions = pipe.execute()
-        session_list = [self._deserialize(raw) for raw in raw_sessions]
+        session_list = []
+        for key, fields in zip(key_list, raw_sessions):
+            if isinstance(fields, redis.ResponseError):
+                session = self._get_legacy(key)
+            else:
+                session = self._deserialize_fields(fields)
+
+            if session is not None:
+                session_list.append(session)
 
         return session_list
 
@@ -85,9 +141,100 @@ class RedisSessionStorage(SessionStorageInterface[RedisSessionKey, RedisSessionV
         )
 
         key = self._make_session_key(auth_provider.name, thread_id, profile)
+        mapping = {
+            "value": self._serialize(session),
+            "scopes": json.dumps(list(session.auth_scopes)),
+        }
+        if auth_resolve_uid is not None:
+            mapping["uid"] = auth_resolve_uid
+
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=mapping)
+            pipe.execute()
+        return session
+
+    def upsert_pending(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_scopes: List[str],
+        auth_resolve_uid: str,
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> V:
+        session = self._make_session(
+            auth_provider_name=auth_provider.name,
+            auth_scopes=auth_scopes,
+            auth_context=None,
+            auth_resolve_uid=auth_resolve_uid,
+            is_auth_scope_universal=is_auth_scope_universal,
+        )
+
+        key = self._make_session_key(auth_provider.name, thread_id, profile)
+        try:
+            uid, scopes = self._upsert_pending_script(
+                keys=[key],
+                args=[
+                    auth_resolve_uid,
+                    self._serialize(session),
+                    json.dumps(list(session.auth_scopes)),
+                ],
+            )
+        except redis.ResponseError:
+            return super().upsert_pending(
+                auth_provider,
+                thread_id,
+                profile,
+                auth_scopes,
+                auth_resolve_uid,
+                is_auth_scope_universal,
+                **kwargs,
+            )
+
+        session.auth_resolve_uid = self._to_str(uid)
+        session.auth_scopes = set(json.loads(scopes))
+        return session
+
+    def activate(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_resolve_uid: Optional[str],
+        auth_context: AuthContext,
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> Optional[V]:
+        session = self._make_session(
+            auth_provider_name=auth_provider.name,
+            auth_scopes=[],
+            auth_context=auth_context,
+            auth_resolve_uid=None,
+            is_auth_scope_universal=is_auth_scope_universal,
+        )
+
+        key = self._make_session_key(auth_provider.name, thread_id, profile)
+        try:
+            scopes = self._activate_script(
+                keys=[key], args=[auth_resolve_uid or "", self._serialize(session)]
+            )
+        except redis.ResponseError:
+            return super().activate(
+                auth_provider,
+                thread_id,
+                profile,
+                auth_resolve_uid,
+                auth_context,
+                is_auth_scope_universal,
+                **kwargs,
+            )
 
-        raw_session = self._serialize(session)
-        self.client.set(key, raw_session)
+        if scopes is None:
+            return None
+
+        session.auth_scopes = set(json.loads(scopes))
         return session
 
     def delete(
@@ -96,6 +243,26 @@ class RedisSessionStorage(SessionStorageInterface[RedisSessionKey, RedisSessionV
         key = self._make_session_key(auth_provider.name, thread_id, profile)
         return self.client.delete(key) == 1
 
+    def delete_if_resolve_uid_matches(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_resolve_uid: Optional[str],
+        **kwargs,
+    ) -> bool:
+        key = self._make_session_key(auth_provider.name, thread_id, profile)
+        try:
+            deleted = self._delete_if_uid_matches_script(
+                keys=[key], args=[auth_resolve_uid or ""]
+            )
+        except redis.ResponseError:
+            return super().delete_if_resolve_uid_matches(
+                auth_provider, thread_id, profile, auth_resolve_uid, **kwargs
+            )
+
+        return deleted == 1
+
     @staticmethod
     def _make_session_key(auth_provider_name: str, thread_id: str, profile: str) -> K:
         return "{auth_provider}{delimiter}{thread_id}{delimiter}{profile}".format(
@@ -121,47 +288,33 @@ class RedisSessionStorage(SessionStorageInterface[RedisSessionKey, RedisSessionV
             scoped=is_auth_scope_universal,
         )
 
-    @staticmethod
-    def _serialize(session: V) -> str:
-        auth_context_value, auth_context_type = None, None
-        if session.auth_context:
-            auth_context_value = session.auth_context.model_dump()
-            auth_context_type = session.auth_context.__class__.__name__
-
-        auth_scopes = session.auth_scopes
-        if auth_scopes:
-            auth_scopes = list(auth_scopes)
-
-        serialized = {
-            "auth_context_value": auth_context_value,
-            "auth_context_type": auth_context_type,
-            "auth_provider_name": session.auth_provider_name,
-            "scoped": session.scoped,
-            "auth_scopes": auth_scopes,
-            "auth_resolve_uid": session.auth_resolve_uid,
-        }
+    def _serialize(self, session: V) -> bytes:
+        return self.codec.encode(session)
 
-        return json.dumps(serialized)
+    def _deserialize(self, raw_session: bytes) -> V:
+        return self.codec.decode(raw_session)
 
-    @staticmethod
-    def _deserialize(raw_session: str) -> V:
-        session_dict = json.loads(raw_session)
+    def _deserialize_fields(self, fields: list[Any]) -> Optional[V]:
+        raw_session, uid, scopes = fields
+        if raw_session is None:
+            return None
 
-        auth_context = None
-        if auth_context_type_key := session_dict["auth_context_type"]:
-            auth_context_type = AUTH_CONTEXT_MAP[auth_context_type_key]
-            auth_context_value = session_dict["auth_context_value"]
+        session = self._deserialize(raw_session)
+        session.auth_resolve_uid = self._to_str(uid)
+        if scopes is not None:
+            session.auth_scopes = set(json.loads(scopes))
+        return session
 
-            auth_context = auth_context_type(**auth_context_value)
+    def _get_legacy(self, key: str) -> Optional[V]:
+        # sessions written before sessions were stored as a hash.
+        raw_session: Any = self.client.get(key)
+        if raw_session is None:
+            return None
 
-        auth_scopes = session_dict["auth_scopes"]
-        if auth_scopes:
-            auth_scopes = set(auth_scopes)
+        return self._deserialize(raw_session)
 
-        return RedisSessionValue(
-            auth_provider_name=session_dict["auth_provider_name"],
-            auth_scopes=auth_scopes,
-            auth_resolve_uid=session_dict["auth_resolve_uid"],
-            scoped=session_dict["scoped"],
-            auth_context=auth_context,
-        )
+    @staticmethod
+    def _to_str(value: Any) -> Optional[str]:
+        if isinstance(value, bytes):
+            return value.decode()
+        return value
@@ -0,0 +1,262 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from hyperpocket.auth import AuthProvider
+from hyperpocket.auth.context import AuthContext
+from hyperpocket.config.session import SessionConfigSqlite, SessionType
+from hyperpocket.session.codec import SessionCodec, get_session_codec
+from hyperpocket.session.interface import (
+    BaseSessionValue,
+    K,
+    SessionStorageInterface,
+    V,
+)
+
+SqliteSessionKey = tuple[str, str, str]
+SqliteSessionValue = BaseSessionValue
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS pocket_session (
+    provider TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (provider, thread_id, profile)
+) WITHOUT ROWID
+"""
+_CREATE_THREAD_ID_INDEX = (
+    "CREATE INDEX IF NOT EXISTS pocket_session_thread_id ON pocket_session (thread_id)"
+)
+_CREATE_EXPIRES_AT_INDEX = "CREATE INDEX IF NOT EXISTS pocket_session_expires_at ON pocket_session (expires_at) WHERE expires_at IS NOT NULL"
+
+# statements are kept as constants, so sqlite3's per-connection statement cache reuses the prepared statements.
+_SELECT = "SELECT value FROM pocket_session WHERE provider = ? AND thread_id = ? AND profile = ? AND (expires_at IS NULL OR expires_at > ?)"
+_SELECT_BY_THREAD_ID = "SELECT value FROM pocket_session WHERE thread_id = ? AND (expires_at IS NULL OR expires_at > ?)"
+_SELECT_BY_THREAD_ID_AND_PROVIDER = "SELECT value FROM pocket_session WHERE thread_id = ? AND provider = ? AND (expires_at IS NULL OR expires_at > ?)"
+_UPSERT = """
+INSERT INTO pocket_session (provider, thread_id, profile, value, expires_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (provider, thread_id, profile) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+"""
+_DELETE = "DELETE FROM pocket_session WHERE provider = ? AND thread_id = ? AND profile = ? AND (expires_at IS NULL OR expires_at > ?)"
+_DELETE_EXPIRED = "DELETE FROM pocket_session WHERE expires_at IS NOT NULL AND expires_at <= ?"
+
+
+class SqliteSessionStorage(
+    SessionStorageInterface[SqliteSessionKey, SqliteSessionValue]
+):
+    """
+    Persistent session storage for single node deployments.
+
+    The database runs in WAL mode, so readers on the server thread and agent loops don't block each other or the writer.
+    Each thread uses its own connection. Expired rows are filtered on read and deleted periodically on write.
+    The session transitions read and write the row in a single `BEGIN IMMEDIATE` transaction,
+    so they are atomic across the threads and the processes sharing the database.
+    """
+
+    def __init__(self, config: SessionConfigSqlite):
+        super().__init__()
+        self.config = config
+        self.path = os.path.expanduser(config.path)
+        self.codec: SessionCodec = get_session_codec(
+            config.codec, compress_threshold=config.codec_compress_threshold
+        )
+        self._local = threading.local()
+        self._last_vacuumed_at = time.time()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(_CREATE_TABLE)
+        conn.execute(_CREATE_THREAD_ID_INDEX)
+        conn.execute(_CREATE_EXPIRES_AT_INDEX)
+
+    @classmethod
+    def session_storage_type(cls) -> SessionType:
+        return SessionType.SQLITE
+
+    def get(
+        self, auth_provider: AuthProvider, thread_id: str, profile: str, **kwargs
+    ) -> Optional[V]:
+        key = self._make_session_key(auth_provider.name, thread_id, profile)
+        row = self._connection().execute(_SELECT, (*key, time.time())).fetchone()
+        if row is None:
+            return None
+
+        return self.codec.decode(row[0])
+
+    def get_by_thread_id(
+        self, thread_id: str, auth_provider: Optional[AuthProvider] = None, **kwargs
+    ) -> List[V]:
+        conn = self._connection()
+        if auth_provider is None:
+            rows = conn.execute(_SELECT_BY_THREAD_ID, (thread_id, time.time()))
+        else:
+            rows = conn.execute(
+                _SELECT_BY_THREAD_ID_AND_PROVIDER,
+                (thread_id, auth_provider.name, time.time()),
+            )
+
+        return [self.codec.decode(row[0]) for row in rows.fetchall()]
+
+    def set(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_scopes: List[str],
+        auth_resolve_uid: Optional[str],
+        auth_context: Optional[AuthContext],
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> V:
+        session = self._make_session(
+            auth_provider_name=auth_provider.name,
+            auth_scopes=auth_scopes,
+            auth_context=auth_context,
+            auth_resolve_uid=auth_resolve_uid,
+            is_auth_scope_universal=is_auth_scope_universal,
+        )
+
+        now = time.time()
+        key = self._make_session_key(auth_provider.name, thread_id, profile)
+        self._connection().execute(
+            _UPSERT,
+            (*key, self.codec.encode(session), self._make_expires_at(session, now)),
+        )
+
+        if now - self._last_vacuumed_at >= self.config.vacuum_interval_seconds:
+            self.vacuum()
+
+        return session
+
+    def delete(
+        self, auth_provider: AuthProvider, thread_id: str, profile: str, **kwargs
+    ) -> bool:
+        key = self._make_session_key(auth_provider.name, thread_id, profile)
+        cursor = self._connection().execute(_DELETE, (*key, time.time()))
+        return cursor.rowcount == 1
+
+    def upsert_pending(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_scopes: List[str],
+        auth_resolve_uid: str,
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> V:
+        with self._transaction():
+            return super().upsert_pending(
+                auth_provider,
+                thread_id,
+                profile,
+                auth_scopes,
+                auth_resolve_uid,
+                is_auth_scope_universal,
+                **kwargs,
+            )
+
+    def activate(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_resolve_uid: Optional[str],
+        auth_context: AuthContext,
+        is_auth_scope_universal: bool,
+        **kwargs,
+    ) -> Optional[V]:
+        with self._transaction():
+            return super().activate(
+                auth_provider,
+                thread_id,
+                profile,
+                auth_resolve_uid,
+                auth_context,
+                is_auth_scope_universal,
+                **kwargs,
+            )
+
+    def delete_if_resolve_uid_matches(
+        self,
+        auth_provider: AuthProvider,
+        thread_id: str,
+        profile: str,
+        auth_resolve_uid: Optional[str],
+        **kwargs,
+    ) -> bool:
+        with self._transaction():
+            return super().delete_if_resolve_uid_matches(
+                auth_provider, thread_id, profile, auth_resolve_uid, **kwargs
+            )
+
+    def vacuum(self) -> int:
+        """
+        Delete expired sessions.
+
+        Returns:
+            int: the number of deleted sessions
+        """
+        self._last_vacuumed_at = time.time()
+        cursor = self._connection().execute(_DELETE_EXPIRED, (self._last_vacuumed_at,))
+        return cursor.rowcount
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.config.timeout,
+                isolation_level=None,
+                cached_statements=32,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # the write lock is taken before the read, so another writer can't change the row in between.
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _make_expires_at(self, session: V, now: float) -> Optional[float]:
+        if session.auth_resolve_uid is not None:
+            return now + self.config.pending_session_ttl_seconds
+        if self.config.session_ttl_seconds is not None:
+            return now + self.config.session_ttl_seconds
+        return None
+
+    @staticmethod
+    def _make_session_key(auth_provider_name: str, thread_id: str, profile: str) -> K:
+        return auth_provider_name, thread_id, profile
+
+    @staticmethod
+    def _make_session(
+        auth_provider_name: str,
+        auth_scopes: List[str],
+        auth_context: AuthContext,
+        auth_resolve_uid: str,
+        is_auth_scope_universal: bool,
+    ) -> V:
+        return SqliteSessionValue(
+            auth_provider_name=auth_provider_name,
+            auth_scopes=set(auth_scopes),
+            auth_context=auth_context,
+            auth_resolve_uid=auth_resolve_uid,
+            scoped=is_auth_scope_universal,
+        )
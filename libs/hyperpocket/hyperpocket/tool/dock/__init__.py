@@ -1,3 +1,6 @@
 from hyperpocket.tool.dock.dock import Dock
+from hyperpocket.tool.dock.loader import LoadProgress, LoadStage, ToolLoader
+from hyperpocket.tool.dock.shared_result import SharedResult
+from hyperpocket.tool.dock.worker_pool import WorkerCallError, WorkerPool
 
-__all__ = ["Dock"]
\ No newline at end of file
+__all__ = ["Dock", "LoadProgress", "LoadStage", "SharedResult", "ToolLoader", "WorkerCallError", "WorkerPool"]
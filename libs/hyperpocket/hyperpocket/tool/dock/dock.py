@@ -1,6 +1,7 @@
 import abc
 from typing import TypeVar, Generic
 
+from hyperpocket.tool.dock.loader import LoadStage
 from hyperpocket.tool.function import FunctionTool
 
 DockToolLike = TypeVar("DockToolLike")
@@ -11,5 +12,12 @@ class Dock(Generic[DockToolLike], abc.ABC):
     def dock(self, tool_like: DockToolLike, *args, **kwargs) -> FunctionTool:
         raise NotImplementedError
 
+    def load_stages(self) -> list[LoadStage]:
+        """
+        Pipeline stages of `ToolLoader` turning tool likes into tools. The last stage returns the docked tool.
+        Docks override it to split docking into stages with their own concurrency.
+        """
+        return [LoadStage(name="dock", func=self.dock, max_workers=10)]
+
     def __call__(self, *args, **kwargs):
         return self.dock(*args, **kwargs)
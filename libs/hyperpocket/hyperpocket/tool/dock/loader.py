@@ -0,0 +1,169 @@
+import collections
+import concurrent.futures
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from hyperpocket.config import pocket_logger
+
+
+class LoadStage(BaseModel):
+    """
+    A stage of the tool loading pipeline.
+
+    `func` takes the output of the previous stage and returns the input of the next one.
+    Items with the same `key` never run the stage at the same time, the later ones wait without taking a worker
+    and usually hit the cache the first one filled.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    func: Callable[[Any], Any]
+    max_workers: int = 1
+    key: Optional[Callable[[Any], Optional[Hashable]]] = None
+
+
+class LoadProgress(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: int  # index of the item in the loaded list
+    item: Any  # the item as requested
+    stage: str
+    status: str  # "started", "finished" or "failed"
+    elapsed: float = 0.0  # seconds the stage took, when finished or failed
+    error: Optional[BaseException] = None
+
+
+class ToolLoader(object):
+    """
+    Loads items through pipeline stages, each stage on its own thread pool.
+
+    An item moves to the next stage as soon as it's done with the current one, so a tool can be built while
+    others are still being fetched. The results keep the order of the items.
+    """
+
+    def __init__(self, stages: list[LoadStage], on_progress: Optional[Callable[[LoadProgress], None]] = None):
+        self.stages = stages
+        self.on_progress = on_progress
+        self.stage_timings: dict[str, float] = {stage.name: 0.0 for stage in stages}
+
+        self._lock = threading.Lock()
+        self._in_flight: list[set[Hashable]] = []
+        self._parked: list[dict[Hashable, collections.deque]] = []
+        self._executors: list[concurrent.futures.ThreadPoolExecutor] = []
+        self._results: list[Any] = []
+        self._errors: list[Optional[BaseException]] = []
+        self._remaining = 0
+        self._all_done = threading.Event()
+
+    def load(self, items: list[Any]) -> list[Any]:
+        """
+        Returns:
+            list[Any]: the outputs of the last stage, in the order of the items.
+        """
+        if not items:
+            return []
+
+        started_at = time.perf_counter()
+        self._in_flight = [set() for _ in self.stages]
+        self._parked = [{} for _ in self.stages]
+        self._results = [None] * len(items)
+        self._errors = [None] * len(items)
+        self._remaining = len(items)
+        self._all_done.clear()
+        self._executors = [
+            concurrent.futures.ThreadPoolExecutor(max_workers=stage.max_workers,
+                                                  thread_name_prefix=f"tool-loader-{stage.name}")
+            for stage in self.stages
+        ]
+        try:
+            for index, item in enumerate(items):
+                self._submit(0, index, item, item)
+            self._all_done.wait()
+        finally:
+            for executor in self._executors:
+                executor.shutdown(wait=True)
+
+        timings = ", ".join(f"{name}: {elapsed:.2f}s" for name, elapsed in self.stage_timings.items())
+        pocket_logger.info(f"loaded {len(items)} tools in {time.perf_counter() - started_at:.2f}s. ({timings})")
+
+        for error in self._errors:
+            if error is not None:
+                raise error
+        return self._results
+
+    def _submit(self, stage_index: int, index: int, item: Any, value: Any):
+        if stage_index == len(self.stages):
+            self._results[index] = value
+            self._finish()
+            return
+
+        stage = self.stages[stage_index]
+        try:
+            key = stage.key(value) if stage.key is not None else None
+        except BaseException as e:
+            # fails the item like the stage itself, otherwise `load` waits for it forever.
+            self._report(LoadProgress(index=index, item=item, stage=stage.name, status="failed", error=e))
+            self._errors[index] = e
+            self._finish()
+            return
+        if key is not None:
+            with self._lock:
+                if key in self._in_flight[stage_index]:
+                    self._parked[stage_index].setdefault(key, collections.deque()).append((index, item, value))
+                    return
+                self._in_flight[stage_index].add(key)
+        self._executors[stage_index].submit(self._run, stage_index, index, item, value, key)
+
+    def _run(self, stage_index: int, index: int, item: Any, value: Any, key: Optional[Hashable]):
+        stage = self.stages[stage_index]
+        self._report(LoadProgress(index=index, item=item, stage=stage.name, status="started"))
+        started_at = time.perf_counter()
+        try:
+            output = stage.func(value)
+        except BaseException as e:
+            elapsed = time.perf_counter() - started_at
+            self._add_timing(stage.name, elapsed)
+            self._report(LoadProgress(index=index, item=item, stage=stage.name, status="failed",
+                                      elapsed=elapsed, error=e))
+            self._errors[index] = e
+            self._finish()
+        else:
+            elapsed = time.perf_counter() - started_at
+            self._add_timing(stage.name, elapsed)
+            self._report(LoadProgress(index=index, item=item, stage=stage.name, status="finished", elapsed=elapsed))
+            self._submit(stage_index + 1, index, item, output)
+        finally:
+            if key is not None:
+                self._release(stage_index, key)
+
+    def _release(self, stage_index: int, key: Hashable):
+        with self._lock:
+            parked = self._parked[stage_index].get(key)
+            if not parked:
+                self._parked[stage_index].pop(key, None)
+                self._in_flight[stage_index].discard(key)
+                return
+            index, item, value = parked.popleft()
+        # the key stays in flight for the next parked item.
+        self._executors[stage_index].submit(self._run, stage_index, index, item, value, key)
+
+    def _add_timing(self, stage_name: str, elapsed: float):
+        with self._lock:
+            self.stage_timings[stage_name] += elapsed
+
+    def _finish(self):
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining == 0:
+                self._all_done.set()
+
+    def _report(self, progress: LoadProgress):
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(progress)
+        except Exception as e:
+            pocket_logger.warning(f"tool load progress callback failed. {e}")
@@ -0,0 +1,97 @@
+import mmap
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+from typing import Any, Optional
+
+# memory backed on linux, so a spilled result never touches the disk.
+_SHM_ROOT = pathlib.Path("/dev/shm")
+
+_UNSET = object()
+
+
+def spill_root() -> Optional[str]:
+    if _SHM_ROOT.is_dir() and os.access(_SHM_ROOT, os.W_OK):
+        return str(_SHM_ROOT)
+    return None
+
+
+def encode_result(result: Any, spill_dir: Optional[str], threshold: int) -> tuple:
+    """
+    Encode the result of a worker call into a message for the pipe.
+
+    Results of `threshold` bytes or more are written to a file in `spill_dir`, and only its path is sent.
+    Other picklable results are sent pickled already, so they aren't pickled twice.
+    """
+    if isinstance(result, str):
+        # a str is at most 4 bytes per character, short ones don't need to be encoded to be measured.
+        if spill_dir is None or threshold <= 0 or len(result) * 4 < threshold:
+            return "ok", result
+        data, kind = result.encode("utf-8"), "str"
+    elif isinstance(result, (bytes, bytearray)):
+        data, kind = result, "bytes"
+    else:
+        try:
+            data, kind = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), "pickle"
+        except Exception:
+            # needs the pickler of the connection. e.g. dill of `multiprocess`.
+            return "ok", result
+
+    if spill_dir is None or threshold <= 0 or len(data) < threshold:
+        return ("pickled", data) if kind == "pickle" else ("ok", result)
+
+    fd, path = tempfile.mkstemp(dir=spill_dir, suffix=".result")
+    with open(fd, "wb") as f:
+        f.write(data)
+    return "spilled", path, kind
+
+
+class SharedResult(object):
+    """
+    A large result of a worker call, in a memory-mapped file.
+
+    The file is unlinked as soon as it's mapped, so nothing is left behind once the result is dropped.
+    The result is decoded on first access, straight from the mapping.
+    """
+
+    def __init__(self, path: str, kind: str):
+        self.kind = kind
+        with open(path, "rb") as f:
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        os.unlink(path)
+        self.size = len(self._mmap)
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    def value(self) -> Any:
+        with self._lock:
+            if self._value is _UNSET:
+                if self._mmap is None:
+                    raise ValueError("shared result is closed")
+                with memoryview(self._mmap) as view:
+                    if self.kind == "str":
+                        self._value = str(view, "utf-8")
+                    elif self.kind == "bytes":
+                        self._value = view.tobytes()
+                    else:
+                        self._value = pickle.loads(view)
+                self._close()
+            return self._value
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __str__(self):
+        return str(self.value())
+
+    def __del__(self):
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
@@ -0,0 +1,264 @@
+import asyncio
+import atexit
+import collections
+import functools
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+from typing import Any, Callable, Hashable, Optional, Union
+
+from hyperpocket.config import pocket_logger
+from hyperpocket.tool.dock.shared_result import SharedResult, encode_result, spill_root
+
+
+class WorkerCallError(RuntimeError):
+    """
+    The function raised in the worker process. The message is the traceback in the worker.
+    """
+
+
+class _Worker(object):
+    def __init__(self, context, name: str, spill_threshold_bytes: int):
+        # large results of the worker. removed with the worker, even if it crashed in the middle of a call.
+        self.spill_dir = tempfile.mkdtemp(prefix=f"{name}-", dir=spill_root())
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, self.spill_dir, spill_threshold_bytes),
+                                       name=name, daemon=True)
+        try:
+            self.process.start()
+        except Exception:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            raise
+        child_conn.close()
+        self.conn = parent_conn
+        # keys of the functions the worker already has, so they're sent only once.
+        self.function_keys: set[Hashable] = set()
+        self.last_used_at = time.monotonic()
+
+    def close(self, kill: bool = False):
+        try:
+            if not kill and self.process.is_alive():
+                self.conn.send(None)
+                self.process.join(timeout=1)
+        except Exception:
+            pass
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=1)
+            self.conn.close()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of warm worker processes running the calls of a dock.
+
+    Workers are started on demand and reused, so a call doesn't pay for a new process and its imports.
+    A function called with a `key` is sent to a worker once and kept there, with whatever it caches on itself.
+    `envs` replace the environment of the worker for the call only. A worker that crashes or times out
+    is killed and replaced by a new one on the next call.
+
+    Results of `spill_threshold_bytes` or more don't go through the pipe. The worker writes them to
+    a memory-mapped file(in `/dev/shm` if available) and sends only its path.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        idle_timeout_seconds: float = 300,
+        call_timeout_seconds: Optional[float] = None,
+        context=None,
+        name: str = "hyperpocket-worker",
+        spill_threshold_bytes: int = 1024 * 1024,
+    ):
+        self.max_workers = max_workers
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        # `multiprocess` pickles with dill, so tools defined in `__main__` or closures can be sent as well.
+        self.context = context if context is not None else multiprocessing.get_context()
+        self.name = name
+        self.spill_threshold_bytes = spill_threshold_bytes  # never spilled if 0
+
+        self._idle: collections.deque[_Worker] = collections.deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._atexit_registered = False
+
+    def call(self, func: Callable[..., Any], args: tuple = (), kwargs: Optional[dict] = None,
+             key: Optional[Hashable] = None, envs: Optional[dict] = None, timeout: Optional[float] = None,
+             lazy: bool = False) -> Union[Any, SharedResult]:
+        """
+        Call a function in a worker, blocking until it returns.
+
+        Args:
+            func: the function to call. pickled to the worker, or looked up by `key` if the worker already has it.
+            args: positional arguments of the function.
+            kwargs: keyword arguments of the function.
+            key: keep the function in the worker under this key.
+            envs: environment variables of the call. the environment of the worker if None.
+            timeout: seconds to wait for the result. `call_timeout_seconds` if None.
+            lazy: return a spilled result as `SharedResult`, decoded on first access.
+        """
+        if kwargs is None:
+            kwargs = {}
+        if timeout is None:
+            timeout = self.call_timeout_seconds
+
+        worker = self._acquire()
+        healthy = False
+        try:
+            send_func = func if key is None or key not in worker.function_keys else None
+            try:
+                worker.conn.send((key, send_func, args, kwargs, envs))
+            except Exception as e:
+                # a call that failed to be pickled isn't sent at all, so the worker is fine.
+                healthy = not isinstance(e, (OSError, EOFError))
+                raise
+            if key is not None:
+                worker.function_keys.add(key)
+
+            if not worker.conn.poll(timeout):
+                raise TimeoutError(f"worker call timed out after {timeout}s")
+            try:
+                status, result, *extra = worker.conn.recv()
+            except (OSError, EOFError):
+                raise RuntimeError(f"worker process exited during the call. exitcode: {worker.process.exitcode}")
+            if status == "spilled":
+                # mapped before the worker is released, a replaced worker removes its spilled files.
+                result = SharedResult(result, kind=extra[0])
+            healthy = True
+        finally:
+            self._release(worker, healthy)
+
+        if status == "error":
+            raise WorkerCallError(result)
+        if status == "pickled":
+            return pickle.loads(result)
+        if status == "spilled" and not lazy:
+            return result.value()
+        return result
+
+    async def acall(self, func: Callable[..., Any], args: tuple = (), kwargs: Optional[dict] = None,
+                    key: Optional[Hashable] = None, envs: Optional[dict] = None,
+                    timeout: Optional[float] = None, lazy: bool = False) -> Union[Any, SharedResult]:
+        """
+        Call a function in a worker, without blocking the event loop.
+        """
+        return await asyncio.to_thread(
+            functools.partial(self.call, func, args, kwargs, key=key, envs=envs, timeout=timeout, lazy=lazy)
+        )
+
+    def metrics(self) -> dict[str, int]:
+        with self._cond:
+            return {"workers": self._size, "idle": len(self._idle)}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def _acquire(self) -> _Worker:
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"{self.name} pool is closed")
+                    expired += self._expire_idle()
+                    while self._idle:
+                        worker = self._idle.pop()
+                        if worker.process.is_alive():
+                            return worker
+                        self._size -= 1
+                        expired.append(worker)
+                    if self._size < self.max_workers:
+                        self._size += 1
+                        break
+                    self._cond.wait()
+        finally:
+            for worker in expired:
+                worker.close()
+
+        try:
+            worker = _Worker(self.context, name=self.name, spill_threshold_bytes=self.spill_threshold_bytes)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        if not self._atexit_registered:
+            self._atexit_registered = True
+            atexit.register(self.close)
+        pocket_logger.debug(f"{self.name} worker {worker.process.pid} started.")
+        return worker
+
+    def _release(self, worker: _Worker, healthy: bool):
+        worker.last_used_at = time.monotonic()
+        with self._cond:
+            keep = healthy and not self._closed and worker.process.is_alive()
+            if keep:
+                self._idle.append(worker)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not keep:
+            pocket_logger.debug(f"{self.name} worker {worker.process.pid} is replaced.")
+            worker.close(kill=not healthy)
+
+    def _expire_idle(self) -> list[_Worker]:
+        # the oldest idle workers are on the left, the most recently used ones are reused first.
+        expired = []
+        deadline = time.monotonic() - self.idle_timeout_seconds
+        while self._idle and self._idle[0].last_used_at < deadline:
+            expired.append(self._idle.popleft())
+            self._size -= 1
+        return expired
+
+
+def _worker_main(conn, spill_dir: Optional[str] = None, spill_threshold_bytes: int = 0):
+    # must be called in a worker process
+    functions: dict[Hashable, Callable] = {}
+    base_environ = dict(os.environ)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        key, func, args, kwargs, envs = message
+        try:
+            if func is None:
+                func = functions[key]
+            elif key is not None:
+                functions[key] = func
+            if envs is not None:
+                os.environ.clear()
+                os.environ.update(envs)
+            result = encode_result(func(*args, **kwargs), spill_dir, spill_threshold_bytes)
+        except BaseException as e:
+            result = ("error", "".join(traceback.format_exception(e)))
+        finally:
+            if envs is not None:
+                os.environ.clear()
+                os.environ.update(base_environ)
+
+        try:
+            conn.send(result)
+        except (EOFError, OSError):
+            return
+        except Exception as e:
+            conn.send(("error", f"failed to send the result of the call. {e}"))
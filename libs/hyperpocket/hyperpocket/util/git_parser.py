@@ -1,24 +1,82 @@
+import concurrent.futures
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Optional
+
 import git
 
+from hyperpocket.config import config, pocket_logger
+from hyperpocket.config.settings import POCKET_ROOT, git_store_path
+from hyperpocket.util.short_hashing_str import short_hashing_str
+
+SUPPORTED_URL_PREFIXES = ("https://github.com/", "file://")
+
+
+class GitRefCache(object):
+    """
+    On-disk cache of the branches of remote repositories, one json file per repository.
+    It's shared by every process on the machine, so a new process doesn't ls-remote the repositories again.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+
+    def get(self, repo_url: str, ttl_seconds: Optional[float] = None) -> Optional[dict[str, str]]:
+        """
+        Get the cached branches of the repository.
+
+        Args:
+            repo_url (str): repository url
+            ttl_seconds (Optional[float]): maximum age of the cache. any age if None.
+
+        Returns:
+            Optional[dict[str, str]]: branch name to sha, None if it's not cached or expired.
+        """
+        try:
+            with self._path(repo_url).open("r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get("repo_url") != repo_url:
+            return None
+        if ttl_seconds is not None and time.time() - cached["fetched_at"] > ttl_seconds:
+            return None
+        return cached["branches"]
+
+    def set(self, repo_url: str, branches: dict[str, str]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(repo_url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"repo_url": repo_url, "fetched_at": time.time(), "branches": branches}, f)
+        os.replace(tmp_path, path)
+
+    def _path(self, repo_url: str) -> pathlib.Path:
+        return self.root / f"{short_hashing_str(repo_url, length=16)}.json"
+
 
 class GitParser:
     git_branches_cache: dict[str, dict[str, str]] = {}
+    ref_cache: GitRefCache = GitRefCache(POCKET_ROOT / "git_refs")
+
+    _repo_locks: dict[str, threading.Lock] = {}
+    _repo_locks_lock = threading.Lock()
 
     @classmethod
     def get_git_branches(cls, repo_url) -> dict[str, str]:
-        if cls.git_branches_cache.get(repo_url) is None:
-            ls_lists = git.cmd.Git().ls_remote(repo_url)
+        if (branches := cls.git_branches_cache.get(repo_url)) is not None:
+            return branches
 
-            branches = {}
-            for line in ls_lists.split("\n"):
-                sha, ref = line.split("\t")
-                if ref == "HEAD":
-                    branches["HEAD"] = sha
-                elif ref.startswith("refs/heads/"):
-                    branch_name = ref.replace("refs/heads/", "")
-                    branches[branch_name] = sha
-            cls.git_branches_cache[repo_url] = branches
-        return cls.git_branches_cache[repo_url]
+        # concurrent resolutions of the same repository share a single ls-remote.
+        with cls._repo_lock(repo_url):
+            if (branches := cls.git_branches_cache.get(repo_url)) is None:
+                branches = cls._resolve_git_branches(repo_url)
+                cls.git_branches_cache[repo_url] = branches
+        return branches
 
     @classmethod
     def parse_repo_url(cls, repo_url: str) -> tuple[str, str, str, str]:
@@ -28,24 +86,15 @@ class GitParser:
         Returns:
             Tuple[str, str, str, str]: base_repo, branch_name, directory_path, git_sha
         """
-        if not repo_url.startswith("https://github.com/"):
-            raise AttributeError("Only GitHub URLs are supported")
-
-        # Remove the base URL and split the path
-        repo_path = repo_url.removeprefix("https://github.com/")
-        repo_path_list = repo_path.split("/")
+        base_repo, sub_path = cls._split_repo_url(repo_url)
 
-        # Check if the URL contains 'tree' (indicating branch and sub-path information)
-        if "tree" not in repo_path_list:
-            # If no 'tree', return the full repository URL
-            git_sha = cls.get_git_branches(repo_url)["HEAD"]
+        # If no 'tree', return the full repository URL
+        if sub_path is None:
+            git_sha = cls.get_git_branches(repo_url).get("HEAD")
+            if git_sha is None:
+                raise ValueError(f"HEAD of {repo_url} is not resolved. specify the branch with '/tree/<branch>'")
             return repo_url, "HEAD", "", git_sha
 
-        # Parse base repo URL and remaining path
-        tree_index = repo_path_list.index("tree")
-        base_repo = f"https://github.com/{'/'.join(repo_path_list[:tree_index])}"
-        sub_path = repo_path_list[tree_index + 1:]
-
         # Fetch branch information
         branches = cls.get_git_branches(base_repo)
 
@@ -61,3 +110,111 @@ class GitParser:
 
         # If no valid branch is found, raise an error
         raise ValueError("Branch not found in repository")
+
+    @classmethod
+    def parse_repo_urls(cls, repo_urls: list[str], max_workers: int = 8) -> list[tuple[str, str, str, str]]:
+        """
+        Parses many repository URLs, resolving the refs of each distinct repository once and in parallel.
+
+        Returns:
+            list[Tuple[str, str, str, str]]: base_repo, branch_name, directory_path, git_sha of each url
+        """
+        base_repos = {cls._split_repo_url(repo_url)[0] for repo_url in repo_urls}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="git-ref-resolver"
+        ) as executor:
+            list(executor.map(cls.get_git_branches, base_repos))
+
+        return [cls.parse_repo_url(repo_url) for repo_url in repo_urls]
+
+    @classmethod
+    def _split_repo_url(cls, repo_url: str) -> tuple[str, Optional[list[str]]]:
+        prefix = next((p for p in SUPPORTED_URL_PREFIXES if repo_url.startswith(p)), None)
+        if prefix is None:
+            raise AttributeError("Only GitHub or local file:// URLs are supported")
+
+        # Remove the base URL and split the path
+        repo_path_list = repo_url.removeprefix(prefix).split("/")
+
+        # Check if the URL contains 'tree' (indicating branch and sub-path information)
+        if "tree" not in repo_path_list:
+            return repo_url, None
+
+        # Parse base repo URL and remaining path
+        tree_index = repo_path_list.index("tree")
+        base_repo = f"{prefix}{'/'.join(repo_path_list[:tree_index])}"
+        return base_repo, repo_path_list[tree_index + 1:]
+
+    @classmethod
+    def _resolve_git_branches(cls, repo_url: str) -> dict[str, str]:
+        git_config = config().git
+        if git_config.offline:
+            branches = cls.ref_cache.get(repo_url) or cls._get_git_branches_from_local_clones(repo_url)
+            if not branches:
+                raise RuntimeError(f"failed to resolve git refs of {repo_url} in offline mode. "
+                                   f"there's no cached refs or local clones.")
+            return branches
+
+        if (branches := cls.ref_cache.get(repo_url, ttl_seconds=git_config.ref_cache_ttl_seconds)) is not None:
+            return branches
+
+        try:
+            branches = cls._ls_remote(repo_url)
+        except git.GitCommandError as e:
+            if (branches := cls.ref_cache.get(repo_url)) is None:
+                raise e
+            pocket_logger.warning(f"failed to ls-remote {repo_url}. use the expired ref cache. {e}")
+            return branches
+
+        cls.ref_cache.set(repo_url, branches)
+        return branches
+
+    @classmethod
+    def _ls_remote(cls, repo_url: str) -> dict[str, str]:
+        ls_lists = git.cmd.Git().ls_remote(repo_url)
+
+        branches = {}
+        for line in ls_lists.split("\n"):
+            if not line:
+                continue
+            sha, ref = line.split("\t")
+            if ref == "HEAD":
+                branches["HEAD"] = sha
+            elif ref.startswith("refs/heads/"):
+                branch_name = ref.replace("refs/heads/", "")
+                branches[branch_name] = sha
+        return branches
+
+    @classmethod
+    def _get_git_branches_from_local_clones(cls, repo_url: str) -> dict[str, str]:
+        """
+        Branches fetched into the shared git store(`git/<repo>.git`) of the tool checkouts.
+        """
+        cleaned_repo_url = repo_url.split("://", 1)[-1].strip("/")
+        store = git_store_path / f"{cleaned_repo_url}.git"
+        if not store.exists():
+            return {}
+
+        branches = {}
+        try:
+            repo = git.Repo(store)
+            # HEAD of the bare clone, unless the remote HEAD is fetched below.
+            branches["HEAD"] = repo.git.rev_parse("HEAD")
+            refs = repo.git.for_each_ref(
+                "--format=%(refname) %(objectname)", "refs/heads", "refs/remotes/origin"
+            )
+        except git.GitError as e:
+            pocket_logger.debug(f"skip git store {store}. {e}")
+            return branches
+        # branches fetched later are under refs/remotes/origin, so they take precedence.
+        for line in refs.splitlines():
+            ref, sha = line.split(" ")
+            branches[ref.removeprefix("refs/heads/").removeprefix("refs/remotes/origin/")] = sha
+        return branches
+
+    @classmethod
+    def _repo_lock(cls, repo_url: str) -> threading.Lock:
+        with cls._repo_locks_lock:
+            if (lock := cls._repo_locks.get(repo_url)) is None:
+                lock = cls._repo_locks[repo_url] = threading.Lock()
+            return lock
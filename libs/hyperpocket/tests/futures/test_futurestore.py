@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from hyperpocket.auth.notion.token_handler import NotionTokenAuthHandler
+from hyperpocket.auth.notion.token_schema import NotionTokenRequest
+from hyperpocket.futures.futurestore import FutureStore
+from hyperpocket.futures.reaper import ExpiryReaper
+
+
+class TestExpiryReaper(unittest.TestCase):
+    def test_expired_entries_are_reaped_in_batch(self):
+        # given
+        reaper = ExpiryReaper(coalesce_seconds=0.5)
+        reaped = []
+        done = threading.Event()
+
+        def callback(idx):
+            reaped.append(idx)
+            if len(reaped) == 3:
+                done.set()
+
+        # when
+        for idx in range(3):
+            reaper.schedule(idx, 0.05 + idx * 0.01, lambda idx=idx: callback(idx))
+        done.wait(timeout=5)
+
+        # then
+        self.assertEqual(sorted(reaped), [0, 1, 2])
+        self.assertEqual(reaper.metrics()["reaped_total"], 3)
+        self.assertEqual(reaper.metrics()["scheduled"], 0)
+
+    def test_cancel_and_reschedule(self):
+        # given
+        reaper = ExpiryReaper(coalesce_seconds=0)
+        reaped = []
+
+        # when
+        reaper.schedule("cancelled", 0.05, lambda: reaped.append("cancelled"))
+        reaper.schedule("rescheduled", 0.05, lambda: reaped.append("first"))
+        reaper.schedule("rescheduled", 0.1, lambda: reaped.append("second"))
+        cancelled = reaper.cancel("cancelled")
+        time.sleep(0.3)
+
+        # then
+        self.assertTrue(cancelled)
+        self.assertEqual(reaped, ["second"])
+
+
+class TestFutureStore(IsolatedAsyncioTestCase):
+    async def test_evict_oldest_future_when_full(self):
+        # given
+        store = FutureStore(max_size=2)
+        oldest = store.create_future("uid-1")
+        store.create_future("uid-2")
+
+        # when
+        store.create_future("uid-3")
+        await asyncio.sleep(0)
+
+        # then
+        self.assertIsNone(store.get_future("uid-1"))
+        self.assertIsInstance(oldest.future.exception(), asyncio.TimeoutError)
+        self.assertEqual(list(store.futures), ["uid-2", "uid-3"])
+        self.assertEqual(store.metrics()["evicted_total"], 1)
+
+    async def test_expire_future_after_ttl(self):
+        # given
+        store = FutureStore(
+            ttl_seconds=0.05, reaper=ExpiryReaper(coalesce_seconds=0)
+        )
+        future_data = store.create_future("uid-1")
+
+        # when
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(future_data.future, timeout=5)
+
+        # then
+        self.assertIsNone(store.get_future("uid-1"))
+        self.assertEqual(store.metrics()["live_futures"], 0)
+        self.assertEqual(store.metrics()["reaped_total"], 1)
+
+    async def test_resolved_future_is_expired_after_ttl(self):
+        # given
+        store = FutureStore(
+            ttl_seconds=0.05, reaper=ExpiryReaper(coalesce_seconds=0)
+        )
+        future_data = store.create_future("uid-1")
+
+        # when
+        store.resolve_future("uid-1", "test-code")
+        value = await future_data.future
+        await asyncio.sleep(0.2)
+
+        # then
+        self.assertEqual(value, "test-code")
+        self.assertIsNone(store.get_future("uid-1"))
+
+    async def test_expire_futures_while_creating(self):
+        # given
+        store = FutureStore(max_size=50)
+        created = [store.create_future(f"uid-{idx}") for idx in range(50)]
+
+        # when
+        expirer = threading.Thread(
+            target=lambda: [store.expire_future(f"uid-{idx}") for idx in range(50)]
+        )
+        expirer.start()
+        for idx in range(50, 100):
+            store.create_future(f"uid-{idx}")
+        await asyncio.to_thread(expirer.join)
+        await asyncio.sleep(0)
+
+        # then
+        self.assertTrue(all(isinstance(f.future.exception(), asyncio.TimeoutError) for f in created))
+        self.assertEqual(list(store.futures), [f"uid-{idx}" for idx in range(50, 100)])
+
+    async def test_authenticate_on_evicted_future(self):
+        # given
+        store = FutureStore(max_size=1)
+        handler = NotionTokenAuthHandler()
+        auth_req = NotionTokenRequest()
+
+        with patch("hyperpocket.auth.notion.token_handler.FutureStore", store):
+            handler.prepare(auth_req=auth_req, thread_id="thread-id", profile="profile", future_uid="uid-1")
+            authenticate = asyncio.create_task(handler.authenticate(auth_req=auth_req, future_uid="uid-1"))
+            await asyncio.sleep(0)
+
+            # when
+            store.create_future("uid-2")
+
+            # then
+            with self.assertRaises(asyncio.TimeoutError):
+                await authenticate
+        self.assertFalse(authenticate.cancelled())
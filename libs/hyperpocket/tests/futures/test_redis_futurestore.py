@@ -0,0 +1,64 @@
+import asyncio
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from hyperpocket.config.future import FutureStoreConfigRedis
+from hyperpocket.futures.redis import RedisFutureStore
+
+
+class TestRedisFutureStore(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        config = FutureStoreConfigRedis(host="localhost", port=6379, db=9)
+        # two stores sharing one redis, as if they were on different replicas.
+        self.awaiting_store = RedisFutureStore(config)
+        self.resolving_store = RedisFutureStore(config)
+        self.awaiting_store.client.flushdb()
+
+    async def asyncTearDown(self):
+        self.awaiting_store.client.flushdb()
+
+    async def test_resolve_future_on_another_node(self):
+        # given
+        future_data = self.awaiting_store.create_future(
+            "test-uid", data={"redirect_uri": "test-redirect-uri"}
+        )
+        self.awaiting_store.wait_subscribed(timeout=5)
+
+        # when
+        self.resolving_store.resolve_future("test-uid", "test-code")
+        value = await asyncio.wait_for(future_data.future, timeout=5)
+
+        # then
+        self.assertEqual(value, "test-code")
+        self.assertEqual(future_data.data["redirect_uri"], "test-redirect-uri")
+
+    async def test_late_subscriber_gets_stored_result(self):
+        # given
+        future_data = self.awaiting_store.create_future("test-uid")
+        self.awaiting_store.wait_subscribed(timeout=5)
+        self.resolving_store.resolve_future("test-uid", "test-code")
+        await asyncio.wait_for(future_data.future, timeout=5)
+
+        # when
+        # a replica missing the message still picks the stored result up.
+        self.awaiting_store.futures.clear()
+        late_future_data = self.awaiting_store.create_future("test-uid")
+        value = await asyncio.wait_for(late_future_data.future, timeout=5)
+
+        # then
+        self.assertEqual(value, "test-code")
+
+    async def test_resolve_not_existing_future(self):
+        with self.assertRaises(ValueError):
+            self.resolving_store.resolve_future("not-existing-uid", "test-code")
+
+    async def test_delete_future(self):
+        # given
+        self.awaiting_store.create_future("test-uid")
+
+        # when
+        self.awaiting_store.delete_future("test-uid")
+
+        # then
+        self.assertIsNone(self.awaiting_store.get_future("test-uid"))
+        with self.assertRaises(ValueError):
+            self.resolving_store.resolve_future("test-uid", "test-code")
@@ -0,0 +1,150 @@
+import datetime
+import importlib.util
+import json
+import unittest
+
+from hyperpocket.auth.slack.oauth2_context import SlackOAuth2AuthContext
+from hyperpocket.auth.slack.oauth2_schema import SlackOAuth2Response
+from hyperpocket.auth.slack.token_context import SlackTokenAuthContext
+from hyperpocket.session.codec import (
+    JsonSessionCodec,
+    LazySessionDetail,
+    MsgpackSessionCodec,
+    get_session_codec,
+)
+from hyperpocket.session.interface import BaseSessionValue
+
+# msgpack is an optional extra, not installed by the dev dependencies.
+HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+
+
+class TestSessionCodec(unittest.TestCase):
+    def setUp(self):
+        self.oauth2_response = SlackOAuth2Response(
+            ok=True,
+            authed_user=SlackOAuth2Response.AuthedUser(
+                id="test-user",
+                access_token="test-access-token",
+                refresh_token="test-refresh-token",
+                expires_in=3600,
+            ),
+            team=SlackOAuth2Response.Team(name="test-team", id="test-team-id"),
+        )
+        self.session = BaseSessionValue(
+            auth_provider_name="SLACK",
+            auth_context=SlackOAuth2AuthContext.from_slack_oauth2_response(
+                self.oauth2_response
+            ),
+            scoped=True,
+            auth_scopes={"scope1", "scope2"},
+            auth_resolve_uid=None,
+        )
+
+    def test_round_trip_json(self):
+        self._assert_round_trip(JsonSessionCodec())
+
+    @unittest.skipUnless(HAS_MSGPACK, "msgpack is not installed")
+    def test_round_trip_msgpack(self):
+        self._assert_round_trip(MsgpackSessionCodec())
+
+    def _assert_round_trip(self, codec):
+        decoded = codec.decode(codec.encode(self.session))
+
+        self.assertIsInstance(decoded.auth_context, SlackOAuth2AuthContext)
+        self.assertEqual(decoded.auth_provider_name, "SLACK")
+        self.assertEqual(decoded.auth_scopes, {"scope1", "scope2"})
+        self.assertTrue(decoded.scoped)
+        self.assertEqual(decoded.auth_context.access_token, "test-access-token")
+        self.assertEqual(
+            decoded.auth_context.expires_at,
+            self.session.auth_context.expires_at,
+        )
+
+    def test_detail_is_decoded_lazily_as_its_model(self):
+        codec = JsonSessionCodec()
+        decoded = codec.decode(codec.encode(self.session))
+
+        detail = decoded.auth_context.detail
+        self.assertIsInstance(detail, LazySessionDetail)
+        self.assertFalse(detail.loaded)
+
+        self.assertEqual(detail.authed_user.refresh_token, "test-refresh-token")
+        self.assertTrue(detail.loaded)
+        self.assertIsInstance(detail.value, SlackOAuth2Response)
+
+    def test_untouched_detail_is_reencoded_as_it_is(self):
+        codec = JsonSessionCodec()
+        encoded = codec.encode(self.session)
+
+        reencoded = codec.encode(codec.decode(encoded))
+
+        self.assertEqual(encoded, reencoded)
+
+    def test_large_detail_is_compressed(self):
+        self.session.auth_context.detail = {"payload": "x" * 10000}
+        compressed = JsonSessionCodec(compress_threshold=1024).encode(self.session)
+        uncompressed = JsonSessionCodec(compress_threshold=None).encode(self.session)
+
+        decoded = JsonSessionCodec().decode(compressed)
+
+        self.assertLess(len(compressed), len(uncompressed))
+        self.assertEqual(decoded.auth_context.detail["payload"], "x" * 10000)
+
+    @unittest.skipUnless(HAS_MSGPACK, "msgpack is not installed")
+    def test_decode_other_codec(self):
+        encoded = MsgpackSessionCodec().encode(self.session)
+
+        decoded = JsonSessionCodec().decode(encoded)
+
+        self.assertEqual(decoded.auth_context.access_token, "test-access-token")
+        self.assertEqual(decoded.auth_context.detail.team.name, "test-team")
+
+    def test_decode_legacy_json(self):
+        legacy = json.dumps(
+            {
+                "auth_context_value": {
+                    "access_token": "test",
+                    "description": "test-description",
+                    "expires_at": None,
+                    "detail": None,
+                },
+                "auth_context_type": SlackTokenAuthContext.__name__,
+                "auth_provider_name": "SLACK",
+                "scoped": False,
+                "auth_scopes": ["scope1"],
+                "auth_resolve_uid": "test-resolve-uid",
+            }
+        ).encode()
+
+        decoded = JsonSessionCodec().decode(legacy)
+
+        self.assertIsInstance(decoded.auth_context, SlackTokenAuthContext)
+        self.assertEqual(decoded.auth_resolve_uid, "test-resolve-uid")
+        self.assertEqual(decoded.auth_scopes, {"scope1"})
+
+    def test_pending_session(self):
+        pending = BaseSessionValue(
+            auth_provider_name="SLACK",
+            scoped=True,
+            auth_scopes={"scope1"},
+            auth_resolve_uid="test-resolve-uid",
+        )
+        codec = JsonSessionCodec()
+
+        decoded = codec.decode(codec.encode(pending))
+
+        self.assertIsNone(decoded.auth_context)
+        self.assertEqual(decoded.auth_resolve_uid, "test-resolve-uid")
+
+    def test_expires_at_is_preserved(self):
+        expires_at = datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+        self.session.auth_context.expires_at = expires_at
+        codec = JsonSessionCodec()
+
+        decoded = codec.decode(codec.encode(self.session))
+
+        self.assertEqual(decoded.auth_context.expires_at, expires_at)
+
+    def test_get_not_supported_codec(self):
+        with self.assertRaises(ValueError):
+            get_session_codec("pickle")
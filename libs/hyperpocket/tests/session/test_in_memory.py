@@ -148,3 +148,62 @@ class TestInMemorySessionStorage(unittest.TestCase):
 
         # then
         self.assertFalse(deleted)
+
+    def test_upsert_pending_keeps_uid_and_merges_scopes(self):
+        # given
+        self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1"],
+            auth_resolve_uid="first-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        session = self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope2"],
+            auth_resolve_uid="second-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # then
+        self.assertEqual(session.auth_resolve_uid, "first-resolve-uid")
+        self.assertEqual(session.auth_scopes, {"scope1", "scope2"})
+
+    def test_activate_only_if_resolve_uid_matches(self):
+        # given
+        self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1"],
+            auth_resolve_uid="test-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        mismatched = self.storage.activate(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_resolve_uid="other-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+        activated = self.storage.activate(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_resolve_uid="test-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+
+        # then
+        self.assertIsNone(mismatched)
+        self.assertIsNone(activated.auth_resolve_uid)
+        self.assertEqual(activated.auth_scopes, {"scope1"})
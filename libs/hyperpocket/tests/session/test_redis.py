@@ -152,3 +152,105 @@ class TestRedisSessionStorage(unittest.TestCase):
 
         # then
         self.assertFalse(deleted)
+
+    def test_upsert_pending_keeps_uid_and_merges_scopes(self):
+        # given
+        self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1"],
+            auth_resolve_uid="first-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        session = self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope2"],
+            auth_resolve_uid="second-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+        stored = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertEqual(session.auth_resolve_uid, "first-resolve-uid")
+        self.assertEqual(session.auth_scopes, {"scope1", "scope2"})
+        self.assertEqual(stored.auth_resolve_uid, "first-resolve-uid")
+        self.assertEqual(stored.auth_scopes, {"scope1", "scope2"})
+
+    def test_activate_only_if_resolve_uid_matches(self):
+        # given
+        self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1"],
+            auth_resolve_uid="test-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        mismatched = self.storage.activate(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_resolve_uid="other-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+        activated = self.storage.activate(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_resolve_uid="test-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+        stored = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertIsNone(mismatched)
+        self.assertIsNotNone(activated)
+        self.assertIsNone(stored.auth_resolve_uid)
+        self.assertEqual(stored.auth_scopes, {"scope1"})
+        self.assertEqual(stored.auth_context.access_token, "test")
+
+    def test_delete_if_resolve_uid_matches(self):
+        # given
+        self.storage.upsert_pending(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1"],
+            auth_resolve_uid="test-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        mismatched = self.storage.delete_if_resolve_uid_matches(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_resolve_uid="other-resolve-uid",
+        )
+        deleted = self.storage.delete_if_resolve_uid_matches(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_resolve_uid="test-resolve-uid",
+        )
+
+        # then
+        self.assertFalse(mismatched)
+        self.assertTrue(deleted)
@@ -0,0 +1,306 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from hyperpocket.auth import AuthProvider
+from hyperpocket.auth.slack.token_context import SlackTokenAuthContext
+from hyperpocket.config.session import SessionConfigSqlite
+from hyperpocket.session.sqlite import SqliteSessionStorage, SqliteSessionValue
+
+
+class TestSqliteSessionStorage(unittest.TestCase):
+    storage: SqliteSessionStorage
+    context: SlackTokenAuthContext
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = SqliteSessionStorage(
+            SessionConfigSqlite(path=os.path.join(self.tmp_dir.name, "session.db"))
+        )
+        self.auth_context = SlackTokenAuthContext(
+            access_token="test",
+            description="test-description",
+            expires_at=None,
+            detail=None,
+        )
+
+    def tearDown(self):
+        del self.auth_context
+        self.tmp_dir.cleanup()
+
+    def test_make_session_key(self):
+        key = self.storage._make_session_key(
+            auth_provider_name=AuthProvider.SLACK.name,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        self.assertEqual(key, ("SLACK", "default_thread_id", "default_profile"))
+
+    def test_make_session(self):
+        session = self.storage._make_session(
+            auth_provider_name=AuthProvider.SLACK.name,
+            auth_scopes=["scope1", "scope2"],
+            auth_context=self.auth_context,
+            auth_resolve_uid="test-resolve-uid",
+            is_auth_scope_universal=True,
+        )
+
+        # then
+        self.assertIsInstance(session, SqliteSessionValue)
+        self.assertEqual(session.auth_provider_name, AuthProvider.SLACK.name)
+        self.assertEqual(session.auth_context.access_token, "test")
+        self.assertEqual(session.auth_context.description, "test-description")
+
+    def test_set(self):
+        session = self.storage.set(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1", "scope2"],
+            auth_resolve_uid="test-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+
+        self.assertIsInstance(session, SqliteSessionValue)
+        self.assertEqual(session.auth_provider_name, AuthProvider.SLACK.name)
+        self.assertEqual(
+            session.auth_context.access_token, self.auth_context.access_token
+        )
+        self.assertEqual(
+            session.auth_context.description, self.auth_context.description
+        )
+
+    def test_get_existing_data(self):
+        # given
+        self.storage.set(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1", "scope2"],
+            auth_resolve_uid="test-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        session = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertIsInstance(session, SqliteSessionValue)
+        self.assertEqual(session.auth_provider_name, AuthProvider.SLACK.name)
+        self.assertEqual(session.auth_context.access_token, "test")
+        self.assertEqual(session.auth_context.description, "test-description")
+
+    def test_get_not_existing_data(self):
+        # when
+        session = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertIsNone(session)
+
+    def test_delete_existing_data(self):
+        # given
+        self.storage.set(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1", "scope2"],
+            auth_resolve_uid="test-resolve-uid",
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        before_session = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        deleted = self.storage.delete(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        after_session = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertTrue(deleted)
+        self.assertIsNotNone(before_session)
+        self.assertIsNone(after_session)
+
+    def test_delete_not_existing_data(self):
+        deleted = self.storage.delete(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertFalse(deleted)
+
+    def test_get_by_thread_id(self):
+        # given
+        for thread_id, profile in [
+            ("thread1", "profile1"),
+            ("thread1", "profile2"),
+            ("thread2", "profile1"),
+        ]:
+            self.storage.set(
+                auth_provider=AuthProvider.SLACK,
+                thread_id=thread_id,
+                profile=profile,
+                auth_scopes=["scope1"],
+                auth_resolve_uid=None,
+                auth_context=self.auth_context,
+                is_auth_scope_universal=True,
+            )
+
+        # when
+        sessions = self.storage.get_by_thread_id(thread_id="thread1")
+        github_sessions = self.storage.get_by_thread_id(
+            thread_id="thread1", auth_provider=AuthProvider.GITHUB
+        )
+
+        # then
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(len(github_sessions), 0)
+
+    def test_persist_across_instances(self):
+        # given
+        self.storage.set(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1", "scope2"],
+            auth_resolve_uid=None,
+            auth_context=self.auth_context,
+            is_auth_scope_universal=True,
+        )
+
+        # when
+        reopened = SqliteSessionStorage(self.storage.config)
+        session = reopened.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+
+        # then
+        self.assertEqual(session.auth_context.access_token, "test")
+        self.assertEqual(session.auth_scopes, {"scope1", "scope2"})
+
+    def test_expired_pending_session_is_vacuumed(self):
+        # given
+        self.storage.config.pending_session_ttl_seconds = 0
+        self.storage.set(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+            auth_scopes=["scope1"],
+            auth_resolve_uid="test-resolve-uid",
+            auth_context=None,
+            is_auth_scope_universal=True,
+        )
+        time.sleep(0.01)
+
+        # when
+        session = self.storage.get(
+            auth_provider=AuthProvider.SLACK,
+            thread_id="default_thread_id",
+            profile="default_profile",
+        )
+        vacuumed = self.storage.vacuum()
+
+        # then
+        self.assertIsNone(session)
+        self.assertEqual(vacuumed, 1)
+
+    def test_concurrent_access(self):
+        errors = []
+
+        def worker(idx: int):
+            try:
+                for i in range(20):
+                    self.storage.set(
+                        auth_provider=AuthProvider.SLACK,
+                        thread_id=f"thread{idx}",
+                        profile=f"profile{i}",
+                        auth_scopes=["scope1"],
+                        auth_resolve_uid=None,
+                        auth_context=self.auth_context,
+                        is_auth_scope_universal=True,
+                    )
+                    self.storage.get_by_thread_id(thread_id=f"thread{idx}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.storage.get_by_thread_id(thread_id="thread0")), 20)
+
+    def test_concurrent_session_transitions(self):
+        pending, activated, errors = [], [], []
+        barrier = threading.Barrier(8)
+
+        def worker(idx: int):
+            try:
+                barrier.wait()
+                session = self.storage.upsert_pending(
+                    auth_provider=AuthProvider.SLACK,
+                    thread_id="default_thread_id",
+                    profile="default_profile",
+                    auth_scopes=[f"scope{idx}"],
+                    auth_resolve_uid=f"uid{idx}",
+                    is_auth_scope_universal=True,
+                )
+                pending.append(session.auth_resolve_uid)
+                barrier.wait()
+                activated.append(
+                    self.storage.activate(
+                        auth_provider=AuthProvider.SLACK,
+                        thread_id="default_thread_id",
+                        profile="default_profile",
+                        auth_resolve_uid=session.auth_resolve_uid,
+                        auth_context=self.auth_context,
+                        is_auth_scope_universal=True,
+                    )
+                )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        # every caller joins the first pending session, and only one of them activates it.
+        self.assertEqual(len(set(pending)), 1)
+        self.assertEqual(len([session for session in activated if session is not None]), 1)
+        session = self.storage.get(AuthProvider.SLACK, "default_thread_id", "default_profile")
+        self.assertIsNone(session.auth_resolve_uid)
+        self.assertEqual(session.auth_scopes, {f"scope{idx}" for idx in range(8)})
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
 from unittest.async_case import IsolatedAsyncioTestCase
@@ -97,6 +98,39 @@ class TestPocketAuth(IsolatedAsyncioTestCase):
         self.assertEqual(session.auth_provider_name, self.auth_provider.name)
         self.assertEqual(session.scoped, handler.scoped)
 
+    async def test_expire_pending_session(self):
+        """
+        Test that an expired pending session is removed, and its awaiting future fails with timeout.
+        """
+        # given
+        future_uid = str(uuid.uuid4())
+        handler = self.pocket_auth.find_handler_instance(
+            name=self.auth_handler_name, auth_provider=self.auth_provider
+        )
+        self.pocket_auth._upsert_pending_session(
+            auth_handler=handler,
+            future_uid=future_uid,
+            profile=self.profile,
+            thread_id=self.thread_id,
+            scope=set(self.scope),
+        )
+        future_data = FutureStore.create_future(future_uid)
+
+        # when
+        self.pocket_auth._expire_pending_session(
+            handler, self.thread_id, self.profile, future_uid
+        )
+
+        # then
+        with self.assertRaises(asyncio.TimeoutError):
+            await future_data.future
+        self.assertIsNone(FutureStore.get_future(future_uid))
+        self.assertIsNone(
+            self.pocket_auth.session_storage.get(
+                self.auth_provider, self.thread_id, self.profile
+            )
+        )
+
     async def test_set_session_active(self):
         """
         Test that a session is correctly set to active with a valid auth context.
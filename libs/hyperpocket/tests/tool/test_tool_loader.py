@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+
+from hyperpocket.tool.dock import LoadStage, ToolLoader
+
+
+class TestToolLoader(unittest.TestCase):
+    def test_keep_order(self):
+        def _slow_first(item: int) -> int:
+            time.sleep(0.05 if item == 0 else 0)
+            return item * 10
+
+        loader = ToolLoader([
+            LoadStage(name="first", func=_slow_first, max_workers=4),
+            LoadStage(name="second", func=lambda item: item + 1, max_workers=4),
+        ])
+
+        self.assertEqual(loader.load([0, 1, 2, 3]), [1, 11, 21, 31])
+        self.assertEqual(set(loader.stage_timings), {"first", "second"})
+
+    def test_same_key_never_runs_concurrently(self):
+        running: dict[str, int] = {}
+        max_running: dict[str, int] = {}
+        lock = threading.Lock()
+
+        def _pull(item: str) -> str:
+            with lock:
+                running[item] = running.get(item, 0) + 1
+                max_running[item] = max(max_running.get(item, 0), running[item])
+            time.sleep(0.02)
+            with lock:
+                running[item] -= 1
+            return item
+
+        loader = ToolLoader([LoadStage(name="pull", func=_pull, max_workers=8, key=lambda item: item)])
+        items = ["python", "node", "python", "python", "node"]
+
+        self.assertEqual(loader.load(items), items)
+        self.assertEqual(max_running, {"python": 1, "node": 1})
+
+    def test_stage_concurrency(self):
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def _build(item: int) -> int:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return item
+
+        loader = ToolLoader([LoadStage(name="build", func=_build, max_workers=2)])
+        loader.load(list(range(8)))
+
+        self.assertEqual(max_running, 2)
+
+    def test_progress_and_failure(self):
+        events = []
+
+        def _fail_on_two(item: int) -> int:
+            if item == 2:
+                raise ValueError("failed to build 2")
+            return item
+
+        loader = ToolLoader(
+            [
+                LoadStage(name="build", func=_fail_on_two, max_workers=2),
+                LoadStage(name="register", func=lambda item: item, max_workers=2),
+            ],
+            on_progress=lambda progress: events.append((progress.index, progress.stage, progress.status)),
+        )
+
+        with self.assertRaises(ValueError):
+            loader.load([1, 2, 3])
+
+        self.assertIn((0, "register", "finished"), events)
+        self.assertIn((1, "build", "failed"), events)
+        self.assertNotIn((1, "register", "started"), events)
+        self.assertEqual(len([event for event in events if event[2] == "started"]), 5)
+
+    def test_key_failure(self):
+        def _key(item: int) -> int:
+            if item == 2:
+                raise ValueError("failed to determine base image")
+            return item
+
+        loader = ToolLoader([
+            LoadStage(name="fetch", func=lambda item: item, max_workers=2),
+            LoadStage(name="pull", func=lambda item: item, max_workers=2, key=_key),
+        ])
+        errors = []
+
+        def _load():
+            try:
+                loader.load([1, 2, 3])
+            except ValueError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=_load, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([str(error) for error in errors], ["failed to determine base image"])
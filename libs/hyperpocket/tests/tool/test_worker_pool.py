@@ -0,0 +1,138 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import time
+import unittest
+
+from hyperpocket.tool.dock import SharedResult, WorkerCallError, WorkerPool
+
+
+class Counter(object):
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self) -> int:
+        self.count += 1
+        return self.count
+
+
+def _pid(sleep: float = 0) -> int:
+    time.sleep(sleep)
+    return os.getpid()
+
+
+def _env(key: str):
+    return os.environ.get(key)
+
+
+def _fail():
+    raise ValueError("tool failed")
+
+
+def _crash():
+    os._exit(1)
+
+
+def _large(size: int, kind: str = "str"):
+    if kind == "bytes":
+        return b"x" * size
+    if kind == "list":
+        return list(range(size))
+    return "x" * size
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(max_workers=2, context=multiprocessing.get_context("fork"))
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuse_worker(self):
+        pid = self.pool.call(_pid)
+
+        self.assertEqual(self.pool.call(_pid), pid)
+        self.assertNotEqual(pid, os.getpid())
+
+    def test_keyed_function_kept_in_worker(self):
+        counter = Counter()
+
+        self.assertEqual(self.pool.call(counter, key="counter"), 1)
+        self.assertEqual(self.pool.call(counter, key="counter"), 2)
+        self.assertEqual(self.pool.call(counter), 1)
+
+    def test_envs_per_call(self):
+        envs = {"HYPERPOCKET_TEST_ENV": "value"}
+
+        self.assertEqual(self.pool.call(_env, ("HYPERPOCKET_TEST_ENV",), envs=envs), "value")
+        self.assertIsNone(self.pool.call(_env, ("HYPERPOCKET_TEST_ENV",)))
+
+    def test_bounded(self):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            pids = list(executor.map(lambda _: self.pool.call(_pid, (0.1,)), range(4)))
+
+        self.assertLessEqual(len(set(pids)), 2)
+        self.assertEqual(self.pool.metrics(), {"workers": 2, "idle": 2})
+
+    def test_error(self):
+        with self.assertRaises(WorkerCallError) as context:
+            self.pool.call(_fail)
+
+        self.assertIn("ValueError: tool failed", str(context.exception))
+        self.assertEqual(self.pool.metrics()["workers"], 1)
+
+    def test_crashed_worker_replaced(self):
+        pid = self.pool.call(_pid)
+
+        with self.assertRaises(RuntimeError):
+            self.pool.call(_crash)
+
+        self.assertNotEqual(self.pool.call(_pid), pid)
+
+    def test_timed_out_worker_replaced(self):
+        pid = self.pool.call(_pid)
+
+        with self.assertRaises(TimeoutError):
+            self.pool.call(_pid, kwargs={"sleep": 5}, timeout=0.1)
+
+        self.assertNotEqual(self.pool.call(_pid), pid)
+        self.assertEqual(self.pool.metrics()["workers"], 1)
+
+    def test_acall(self):
+        self.assertNotEqual(asyncio.run(self.pool.acall(_pid)), os.getpid())
+
+
+class TestWorkerPoolSharedResult(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(max_workers=1, context=multiprocessing.get_context("fork"), spill_threshold_bytes=1024)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_large_result_spilled(self):
+        self.assertEqual(self.pool.call(_large, (4096,)), "x" * 4096)
+        self.assertEqual(self.pool.call(_large, (4096, "bytes")), b"x" * 4096)
+        self.assertEqual(self.pool.call(_large, (4096, "list")), list(range(4096)))
+        self.assertEqual(self.pool.call(_large, (16,)), "x" * 16)
+        self.assertEqual(self.pool.call(_large, (16, "list")), list(range(16)))
+
+    def test_lazy(self):
+        result = self.pool.call(_large, (4096,), lazy=True)
+        spill_dir = self.pool._idle[0].spill_dir
+
+        self.assertIsInstance(result, SharedResult)
+        self.assertEqual(result.size, 4096)
+        # unlinked as soon as it's mapped.
+        self.assertEqual(os.listdir(spill_dir), [])
+        self.assertEqual(str(result), "x" * 4096)
+        self.assertEqual(self.pool.call(_large, (16,), lazy=True), "x" * 16)
+
+    def test_spill_dir_removed_with_worker(self):
+        self.pool.call(_pid)
+        spill_dir = self.pool._idle[0].spill_dir
+
+        with self.assertRaises(RuntimeError):
+            self.pool.call(_crash)
+
+        self.assertFalse(os.path.exists(spill_dir))
@@ -1,7 +1,13 @@
+import pathlib
+import tempfile
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
-from hyperpocket.util.git_parser import GitParser
+import git
+
+from hyperpocket.config import config
+from hyperpocket.util.git_parser import GitParser, GitRefCache
 
 
 class TestGitParser(unittest.TestCase):
@@ -51,6 +57,7 @@ class TestGitParser(unittest.TestCase):
         with self.assertRaises(AttributeError):
             GitParser.parse_repo_url(non_github_url)
 
+    @patch('hyperpocket.util.git_parser.GitParser.ref_cache', new=GitRefCache(pathlib.Path(tempfile.mkdtemp())))
     @patch('hyperpocket.util.git_parser.GitParser.git_branches_cache', new_callable=dict)
     @patch('git.cmd.Git')
     def test_get_git_branches_uses_cache(self, mock_git, mock_cache):
@@ -84,3 +91,120 @@ class TestGitParser(unittest.TestCase):
 
         # Check that the cache was accessed
         self.assertIn(repo_url, mock_cache)
+
+
+class TestGitParserRefCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.tmp_dir.name)
+
+        # local repository with a main branch
+        self.repo_path = root / "repo"
+        repo = git.Repo.init(self.repo_path, initial_branch="main")
+        (self.repo_path / "tools" / "echo").mkdir(parents=True)
+        (self.repo_path / "tools" / "echo" / "pocket.json").write_text("{}")
+        repo.index.add(["tools/echo/pocket.json"])
+        author = git.Actor("test", "test@test.com")
+        self.sha = repo.index.commit("init", author=author, committer=author).hexsha
+        self.repo_url = f"file://{self.repo_path}"
+
+        self.patches = [
+            patch.object(GitParser, "git_branches_cache", new={}),
+            patch.object(GitParser, "ref_cache", new=GitRefCache(root / "git_refs")),
+            patch.object(config().git, "offline", new=False),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp_dir.cleanup()
+
+    def _new_process(self):
+        GitParser.git_branches_cache.clear()
+
+    def test_parse_file_repo_url(self):
+        repo_url, branch, directory_path, git_sha = GitParser.parse_repo_url(
+            f"{self.repo_url}/tree/main/tools/echo"
+        )
+
+        self.assertEqual(repo_url, self.repo_url)
+        self.assertEqual(branch, "main")
+        self.assertEqual(directory_path, "tools/echo")
+        self.assertEqual(git_sha, self.sha)
+
+    def test_ref_cache_is_shared_across_processes(self):
+        GitParser.get_git_branches(self.repo_url)
+        self._new_process()
+
+        with patch.object(GitParser, "_ls_remote") as ls_remote:
+            branches = GitParser.get_git_branches(self.repo_url)
+
+        ls_remote.assert_not_called()
+        self.assertEqual(branches["main"], self.sha)
+
+    def test_expired_ref_cache_is_refreshed(self):
+        GitParser.ref_cache.set(self.repo_url, {"main": "stale-sha"})
+
+        with patch.object(config().git, "ref_cache_ttl_seconds", new=0):
+            time.sleep(0.01)
+            branches = GitParser.get_git_branches(self.repo_url)
+
+        self.assertEqual(branches["main"], self.sha)
+
+    def test_expired_ref_cache_is_used_when_remote_is_unreachable(self):
+        unreachable_url = f"file://{self.tmp_dir.name}/not-exists"
+        GitParser.ref_cache.set(unreachable_url, {"main": "cached-sha"})
+
+        with patch.object(config().git, "ref_cache_ttl_seconds", new=0):
+            time.sleep(0.01)
+            branches = GitParser.get_git_branches(unreachable_url)
+
+        self.assertEqual(branches["main"], "cached-sha")
+
+    def test_offline_mode(self):
+        GitParser.get_git_branches(self.repo_url)
+        self._new_process()
+
+        with patch.object(config().git, "offline", new=True), \
+                patch.object(GitParser, "_ls_remote") as ls_remote:
+            _, _, _, git_sha = GitParser.parse_repo_url(f"{self.repo_url}/tree/main/tools/echo")
+
+            with self.assertRaises(RuntimeError):
+                GitParser.get_git_branches(f"file://{self.tmp_dir.name}/not-cached")
+
+        ls_remote.assert_not_called()
+        self.assertEqual(git_sha, self.sha)
+
+    def test_parse_repo_urls_resolves_each_repo_once(self):
+        urls = [f"{self.repo_url}/tree/main/tools/echo"] * 10 + [self.repo_url]
+
+        with patch.object(GitParser, "_ls_remote", wraps=GitParser._ls_remote) as ls_remote:
+            parsed = GitParser.parse_repo_urls(urls)
+
+        self.assertEqual(ls_remote.call_count, 1)
+        self.assertEqual(len(parsed), 11)
+        self.assertTrue(all(git_sha == self.sha for _, _, _, git_sha in parsed))
+
+    def test_offline_mode_resolves_from_git_store(self):
+        git_store = pathlib.Path(self.tmp_dir.name) / "git"
+        git.Repo.clone_from(self.repo_url, git_store / f"{str(self.repo_path).strip('/')}.git", bare=True)
+
+        with patch("hyperpocket.util.git_parser.git_store_path", new=git_store), \
+                patch.object(config().git, "offline", new=True):
+            branches = GitParser.get_git_branches(self.repo_url)
+
+        self.assertEqual(branches["main"], self.sha)
+        self.assertEqual(branches["HEAD"], self.sha)
+
+    def test_offline_mode_parses_repo_url_without_branch_from_git_store(self):
+        git_store = pathlib.Path(self.tmp_dir.name) / "git"
+        git.Repo.clone_from(self.repo_url, git_store / f"{str(self.repo_path).strip('/')}.git", bare=True)
+
+        with patch("hyperpocket.util.git_parser.git_store_path", new=git_store), \
+                patch.object(config().git, "offline", new=True):
+            _, branch, _, git_sha = GitParser.parse_repo_url(self.repo_url)
+
+        self.assertEqual(branch, "HEAD")
+        self.assertEqual(git_sha, self.sha)
@@ -0,0 +1,63 @@
+import argparse
+import datetime
+import timeit
+
+from hyperpocket.auth import AUTH_CONTEXT_MAP
+from hyperpocket.session.codec import SESSION_CODECS
+from hyperpocket.session.interface import BaseSessionValue
+
+
+def make_sample_session(context_type, detail_size: int) -> BaseSessionValue:
+    values = {
+        "access_token": "access-token",
+        "description": f"{context_type.__name__} benchmark context",
+        "expires_at": datetime.datetime.now(tz=datetime.timezone.utc),
+        "detail": {"payload": "x" * detail_size, "ok": True},
+    }
+    for name, field in context_type.model_fields.items():
+        if name not in values and field.is_required():
+            values[name] = "value"
+
+    return BaseSessionValue(
+        auth_provider_name=context_type.__name__,
+        auth_context=context_type(**values),
+        scoped=True,
+        auth_scopes={"scope1", "scope2"},
+    )
+
+
+def benchmark(codec_names: list[str], detail_size: int, number: int):
+    codecs = {}
+    for name in codec_names:
+        try:
+            codecs[name] = SESSION_CODECS[name]()
+        except ImportError as e:
+            print(f"skip {name} codec. {e}")
+
+    print(f"{'context type':<40}{'codec':<10}{'size':>8}{'encode(us)':>12}{'decode(us)':>12}")
+    for context_name, context_type in sorted(AUTH_CONTEXT_MAP.items()):
+        try:
+            session = make_sample_session(context_type, detail_size)
+        except Exception as e:
+            print(f"skip {context_name}. {e}")
+            continue
+
+        for codec_name, codec in codecs.items():
+            encoded = codec.encode(session)
+            encode_us = timeit.timeit(lambda: codec.encode(session), number=number) / number * 1e6
+            decode_us = timeit.timeit(lambda: codec.decode(encoded), number=number) / number * 1e6
+            print(f"{context_name:<40}{codec_name:<10}{len(encoded):>8}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session codecs per auth context type.")
+    parser.add_argument("--codec", action="append", help="codec name to benchmark. (default: all codecs)")
+    parser.add_argument("--detail-size", type=int, default=4096, help="size of the sample auth context detail.")
+    parser.add_argument("--number", type=int, default=1000, help="number of iterations per measurement.")
+    args = parser.parse_args()
+
+    benchmark(args.codec or list(SESSION_CODECS.keys()), args.detail_size, args.number)
+
+
+if __name__ == "__main__":
+    main()